@@ -0,0 +1,119 @@
+"""
+Benchmark the full auditor graph offline against the fake LLM backend.
+
+Judges and VisionInspector answer from FakeChatModel, so runs are
+deterministic and free; response caches are disabled so every call is made.
+Reports wall time, LLM call throughput and peak in-flight calls per run:
+  python bench_graph.py --repo-url . --pdf-path reports/final_report.pdf \
+      --latency lognormal:-1.2,0.5 --error-rate 0.05 --repeats 3
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+
+def _configure(args) -> None:
+    # Must be set before src.nodes.judges builds its module-level model
+    os.environ.update({
+        "AUDIT_LLM_BACKEND": "fake",
+        "AUDIT_LLM_CACHE": "0",
+        "AUDIT_VISION_CACHE": "0",
+        "AUDIT_FAKE_LATENCY": args.latency,
+        "AUDIT_FAKE_ERROR_RATE": str(args.error_rate),
+        "AUDIT_FAKE_MALFORMED_RATE": str(args.malformed_rate),
+        "AUDIT_FAKE_SEED": str(args.seed),
+        "AUDIT_RETRY_BASE_DELAY": os.getenv("AUDIT_RETRY_BASE_DELAY", "0.05"),
+    })
+    if args.judge_batch_mode:
+        os.environ["AUDIT_JUDGE_BATCH_MODE"] = args.judge_batch_mode
+    if args.fast_path:
+        os.environ["AUDIT_JUDGE_FAST_PATH"] = "1"
+    if args.cascade:
+        os.environ["AUDIT_JUDGE_CASCADE"] = "1"
+    if args.max_concurrency:
+        os.environ["AUDIT_GRAPH_CONCURRENCY"] = str(args.max_concurrency)
+
+
+def bench_run(app, initial_state: dict, output_dir: str) -> dict:
+    from src.fake_llm import fake_call_stats, reset_fake_call_stats
+    from src.graph import graph_run_config
+    from src.llm_usage import reset_usage_ledger
+    from src.tools.pdf_session import close_pdf_sessions
+
+    reset_fake_call_stats()
+    ledger = reset_usage_ledger()
+    os.environ["AUDIT_OUTPUT_DIR"] = output_dir
+    start = time.perf_counter()
+    try:
+        final_state = app.invoke(initial_state, config=graph_run_config())
+    finally:
+        close_pdf_sessions(initial_state["pdf_path"])
+    elapsed = time.perf_counter() - start
+
+    stats = fake_call_stats()
+    calls = sum(s["calls"] for s in stats.values())
+    return {
+        "wall_s": round(elapsed, 3),
+        "llm_calls": calls,
+        "llm_errors": sum(s["errors"] for s in stats.values()),
+        "calls_per_s": round(calls / elapsed, 1) if elapsed else None,
+        "peak_in_flight": {name: s["peak_in_flight"] for name, s in stats.items()},
+        "opinions": len(final_state.get("opinions", [])),
+        "repairs": ledger.summary()["totals"]["repairs"],
+        "cascade": ledger.cascade_summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the auditor graph with the offline fake LLM.")
+    parser.add_argument("--repo-url", required=True, help="Repository URL or local path to audit")
+    parser.add_argument("--pdf-path", required=True, help="PDF report to audit")
+    parser.add_argument("--rubric", default="rubric.json", help="Rubric JSON file")
+    parser.add_argument("--repeats", type=int, default=3, help="Graph runs to time")
+    parser.add_argument("--latency", default="uniform:0.2,0.8", help="Fake latency distribution (see parse_latency)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake calls failing with a 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of judge answers returned almost valid")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and error injection")
+    parser.add_argument("--judge-batch-mode", choices=["dimension", "persona", "panel"], default=None)
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Global cap on graph tasks in flight")
+    parser.add_argument("--cascade", action="store_true", help="Judge on the cheap model first, escalating disagreements")
+    parser.add_argument("--fast-path", action="store_true", help="Enable the evidence-decisive judge fast path")
+    parser.add_argument("--output-dir", default="audit/bench_graph", help="Where ChiefJustice writes reports")
+    args = parser.parse_args()
+
+    _configure(args)
+    from src.graph import create_graph
+
+    with open(args.rubric, "r") as f:
+        dimensions = json.load(f)["dimensions"]
+
+    app = create_graph()
+    rows = []
+    for run in range(args.repeats):
+        initial_state = {
+            "repo_url": args.repo_url,
+            "pdf_path": args.pdf_path,
+            "rubric_dimensions": dimensions,
+            "available_artifacts": [],
+            "evidences": {},
+            "opinions": [],
+            "final_report": None,
+        }
+        row = {"run": run, **bench_run(app, initial_state, args.output_dir)}
+        rows.append(row)
+        print(json.dumps(row))
+
+    print(json.dumps({
+        "summary": True,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "malformed_rate": args.malformed_rate,
+        "wall_median_s": round(statistics.median(r["wall_s"] for r in rows), 3),
+        "calls_per_s_median": statistics.median(r["calls_per_s"] or 0 for r in rows),
+    }))
+
+
+if __name__ == "__main__":
+    main()
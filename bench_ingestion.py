@@ -0,0 +1,86 @@
+"""
+Benchmark DocAnalyst ingestion backends (PyMuPDF vs. Docling warm pool).
+
+Reports cold start, warm throughput and chunk-quality proxies for each backend:
+  python bench_ingestion.py --pdf-path reports/final_report.pdf --repeats 5
+"""
+import argparse
+import json
+import statistics
+import time
+
+from src.tools.doc_tools import DocAnalyst
+from src.tools.ingestion_backends import DoclingBackend, DoclingWorkerPool, get_ingestion_backend
+from src.tools.pdf_session import PdfSession
+
+CONCEPTS = ["Dialectical Synthesis", "Fan-In / Fan-Out", "Metacognition", "State Synchronization"]
+
+
+def _chunk_quality(analyst: DocAnalyst, dimensions: list) -> dict:
+    chunks = analyst._chunks
+    lengths = [len(c["content"]) for c in chunks] or [0]
+    structured = [c for c in chunks if not c["heading"].startswith("Page ")]
+    concepts = analyst.query_chunks(CONCEPTS, top_k=1)
+    routed = analyst.route_dimensions(dimensions, top_k=3)
+    return {
+        "chunks": len(chunks),
+        "mean_chunk_chars": round(statistics.mean(lengths), 1),
+        "heading_chunk_ratio": round(len(structured) / max(1, len(chunks)), 2),
+        "concepts_found": sum(1 for hits in concepts.values() if hits),
+        "dimensions_with_passages": sum(1 for hits in routed.values() if hits),
+    }
+
+
+def bench_backend(name: str, pdf_path: str, dimensions: list, repeats: int) -> dict:
+    backend = get_ingestion_backend(name)
+    if isinstance(backend, DoclingBackend) and not backend.available():
+        return {"backend": name, "skipped": "docling not installed"}
+
+    cold_start = time.perf_counter()
+    if isinstance(backend, DoclingBackend):
+        DoclingWorkerPool.shared().warm()
+    with PdfSession(pdf_path) as session:
+        analyst = DocAnalyst(backend=backend)
+        analyst.ingest_pdf(pdf_path, session=session)
+        cold = time.perf_counter() - cold_start
+
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            analyst = DocAnalyst(backend=backend)
+            analyst.ingest_pdf(pdf_path, session=session)
+            timings.append(time.perf_counter() - start)
+        pages = len(session.pages)
+
+    warm = statistics.median(timings) if timings else cold
+    return {
+        "backend": name,
+        "pages": pages,
+        "cold_s": round(cold, 3),
+        "warm_median_s": round(warm, 3),
+        "pages_per_s": round(pages / warm, 1) if warm else None,
+        **_chunk_quality(analyst, dimensions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DocAnalyst ingestion backends.")
+    parser.add_argument("--pdf-path", required=True, help="PDF report to ingest")
+    parser.add_argument("--rubric", default="rubric.json", help="Rubric used for routing coverage")
+    parser.add_argument("--repeats", type=int, default=5, help="Warm runs per backend")
+    parser.add_argument("--backends", default="pymupdf,docling", help="Comma-separated backend names")
+    args = parser.parse_args()
+
+    with open(args.rubric, "r") as f:
+        dimensions = json.load(f)["dimensions"]
+
+    results = [bench_backend(b.strip(), args.pdf_path, dimensions, args.repeats) for b in args.backends.split(",")]
+    for row in results:
+        print(json.dumps(row))
+
+    if DoclingWorkerPool._instance is not None:
+        DoclingWorkerPool._instance.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from typing import Callable, List
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting prompts (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def pack_batches(items: List, size_of: Callable, max_count: int, max_size: int) -> List[List]:
+    """
+    Greedily groups items, in order, into batches of at most max_count items
+    and max_size total size (bytes, tokens, ...) as measured by size_of.
+    An item larger than max_size gets its own batch.
+    """
+    batches: List[List] = []
+    current: List = []
+    current_size = 0
+    for item in items:
+        size = size_of(item)
+        if current and (len(current) >= max_count or current_size + size > max_size):
+            batches.append(current)
+            current, current_size = [], 0
+        current.append(item)
+        current_size += size
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,341 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Type, get_args, get_origin
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel, PrivateAttr
+
+from src.batching import estimate_tokens
+from src.rate_limits import get_rate_limiter
+from src.state import DiagramBatch, DiagramClassification, JudicialOpinion, JudicialOpinionBatch
+
+logger = logging.getLogger(__name__)
+
+# Persona ranges mirror the judges' scoring policies so fake panels diverge realistically
+PERSONA_SCORES = {"Prosecutor": (1, 3), "Defense": (3, 5), "TechLead": (2, 4)}
+PERSONA_MARKERS = {"PROSECUTOR": "Prosecutor", "DEFENSE ATTORNEY": "Defense", "TECH LEAD": "TechLead"}
+
+
+def llm_backend() -> str:
+    """'live' (default) or 'fake', from AUDIT_LLM_BACKEND (--llm-backend)."""
+    return os.getenv("AUDIT_LLM_BACKEND", "live").lower()
+
+
+class FakeRateLimitError(Exception):
+    """Injected provider error; looks like an HTTP 429 to the retry logic."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float = 0.05):
+        super().__init__(f"Fake rate limit, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def fake_call_stats() -> Dict[str, Dict[str, int]]:
+    """Per fake model: calls, injected errors, and peak calls in flight at once."""
+    with _stats_lock:
+        return {name: {k: v for k, v in stats.items() if k != "in_flight"} for name, stats in _stats.items()}
+
+
+def reset_fake_call_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+@contextmanager
+def _track_call(model_name: str):
+    with _stats_lock:
+        stats = _stats.setdefault(model_name, {"calls": 0, "errors": 0, "peak_in_flight": 0, "in_flight": 0})
+        stats["calls"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+    try:
+        yield stats
+    except FakeRateLimitError:
+        with _stats_lock:
+            stats["errors"] += 1
+        raise
+    finally:
+        with _stats_lock:
+            stats["in_flight"] -= 1
+
+
+def parse_latency(spec: str):
+    """
+    Latency distribution from a spec string, in seconds:
+    "0.2" / "const:0.2", "uniform:0.1,0.5", "normal:0.3,0.05" or
+    "lognormal:mu,sigma" (of the underlying normal). Returns rng -> seconds.
+    """
+    kind, _, params = spec.partition(":") if ":" in spec else ("const", "", spec)
+    values = [float(v) for v in params.split(",") if v.strip()]
+    if kind == "const":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution '{kind}'")
+
+
+def _messages_text(value: Any) -> str:
+    if isinstance(value, PromptValue):
+        value = value.to_messages()
+    if isinstance(value, str):
+        return value
+    parts = []
+    for message in value:
+        content = message.content if isinstance(message, BaseMessage) else message
+        if isinstance(content, list):
+            parts.extend(p.get("text", "") for p in content if isinstance(p, dict))
+        else:
+            parts.append(str(content))
+    return "\n".join(parts)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline, deterministic stand-in for the judge and vision models.
+
+    Answers depend only on the prompt text (and AUDIT_FAKE_SEED), so runs are
+    reproducible. with_structured_output() returns schema-valid
+    JudicialOpinion / JudicialOpinionBatch / DiagramBatch objects (other
+    schemas are filled generically). Latency follows AUDIT_FAKE_LATENCY (see
+    parse_latency) and AUDIT_FAKE_ERROR_RATE of calls raise
+    FakeRateLimitError; AUDIT_FAKE_MALFORMED_RATE of judge answers come
+    back almost valid (see _malformed). Supports rate_limiter= like the
+    real chat models and reports estimated usage_metadata.
+    """
+
+    model_name: str = "fake-model"
+    latency: str = "0"
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, model_name: str, **kwargs) -> "FakeChatModel":
+        """Configured from AUDIT_FAKE_*; paced only when AUDIT_RPS_FAKE is set."""
+        if os.getenv("AUDIT_RPS_FAKE"):
+            kwargs.setdefault("rate_limiter", get_rate_limiter("fake"))
+        return cls(
+            model_name=model_name,
+            latency=os.getenv("AUDIT_FAKE_LATENCY", "0"),
+            error_rate=float(os.getenv("AUDIT_FAKE_ERROR_RATE", "0")),
+            malformed_rate=float(os.getenv("AUDIT_FAKE_MALFORMED_RATE", "0")),
+            seed=int(os.getenv("AUDIT_FAKE_SEED", "0")),
+            **kwargs,
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _draw(self) -> tuple:
+        """(delay, fail) for one call from the shared, seeded RNG."""
+        with self._rng_lock:
+            return parse_latency(self.latency)(self._rng), self._rng.random() < self.error_rate
+
+    def _prompt_rng(self, text: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{self.model_name}:{text}".encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def _before_call_sync(self) -> None:
+        delay, fail = self._draw()
+        with _track_call(self.model_name):
+            time.sleep(delay)
+            if fail:
+                raise FakeRateLimitError()
+
+    async def _before_call_async(self) -> None:
+        delay, fail = self._draw()
+        with _track_call(self.model_name):
+            await asyncio.sleep(delay)
+            if fail:
+                raise FakeRateLimitError()
+
+    def _text_answer(self, text: str) -> str:
+        rng = self._prompt_rng(text)
+        kind = rng.choice(["Flow Diagram", "Component Diagram", "Sequence Diagram"])
+        return (
+            f"{kind}. Fan-out/fan-in parallelism: {'yes' if rng.random() < 0.7 else 'no'}. "
+            f"Components: RepoInvestigator, DocAnalyst, EvidenceAggregator. "
+            f"Data flow: top to bottom. Deterministic offline analysis."
+        )
+
+    def _malformed_draw(self) -> bool:
+        if not self.malformed_rate:
+            return False  # leave the shared RNG sequence untouched
+        with self._rng_lock:
+            return self._rng.random() < self.malformed_rate
+
+    def _result(self, messages: List[BaseMessage], schema: Optional[Type[BaseModel]]) -> ChatResult:
+        text = _messages_text(messages)
+        if schema is None:
+            content = self._text_answer(text)
+        else:
+            content = self.fake_structured(schema, text).model_dump_json()
+            if schema in (JudicialOpinion, JudicialOpinionBatch) and self._malformed_draw():
+                content = _malformed(content, self._prompt_rng(text))
+        usage = {"input_tokens": estimate_tokens(text), "output_tokens": estimate_tokens(content)}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content=content, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._before_call_sync()
+        return self._result(messages, kwargs.get("structured_schema"))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await self._before_call_async()
+        return self._result(messages, kwargs.get("structured_schema"))
+
+    def with_structured_output(self, schema: Type[BaseModel], include_raw: bool = False, **kwargs) -> Runnable:
+        """
+        Answers as JSON through _generate, so callbacks, rate limiting and
+        usage metadata behave as for a real model, then parses it into schema.
+        With include_raw=True, returns {"raw", "parsed", "parsing_error"} and
+        does not raise on a malformed answer, like the real chat models.
+        """
+        def _parse(message: AIMessage):
+            if not include_raw:
+                return schema.model_validate_json(message.content)
+            try:
+                return {"raw": message, "parsed": schema.model_validate_json(message.content), "parsing_error": None}
+            except ValueError as e:
+                return {"raw": message, "parsed": None, "parsing_error": e}
+
+        return self.bind(structured_schema=schema) | RunnableLambda(_parse, name="fake-parser")
+
+    def fake_structured(self, schema: Type[BaseModel], text: str) -> BaseModel:
+        """Schema-valid answer derived deterministically from the prompt text."""
+        rng = self._prompt_rng(text)
+        if schema is JudicialOpinion:
+            return _fake_opinion(rng, _persona(text), _first_dimension(text), text)
+        if schema is JudicialOpinionBatch:
+            if "three-judge panel" in text:
+                dim_id = _first_dimension(text)
+                return schema(opinions=[_fake_opinion(rng, judge, dim_id, text) for judge in PERSONA_SCORES])
+            judge = _persona(text)
+            sections = re.split(r"^### Dimension ", text, flags=re.MULTILINE)[1:]
+            return schema(opinions=[
+                _fake_opinion(rng, judge, section.split(None, 1)[0], section) for section in sections
+            ])
+        if schema is DiagramBatch:
+            count = len(re.findall(r"^Image \d+:", text, flags=re.MULTILINE))
+            return schema(classifications=[
+                DiagramClassification(
+                    image_index=i,
+                    diagram_type=rng.choice(["Flow Diagram", "Component Diagram", "Other"]),
+                    fan_out_fan_in=rng.random() < 0.7,
+                    components=["RepoInvestigator", "EvidenceAggregator"],
+                    data_flow="top to bottom",
+                    summary="Deterministic offline classification.",
+                )
+                for i in range(1, count + 1)
+            ])
+        return _fake_model(schema, rng)
+
+
+def _persona(text: str) -> str:
+    for marker, judge in PERSONA_MARKERS.items():
+        if marker in text:
+            return judge
+    return "TechLead"
+
+
+def _first_dimension(text: str) -> str:
+    match = re.search(r"\bid: (\S+)", text)
+    return match.group(1) if match else "unknown"
+
+
+def _fake_opinion(rng: random.Random, judge: str, dim_id: str, text: str) -> JudicialOpinion:
+    low, high = PERSONA_SCORES.get(judge, (1, 5))
+    cited = list(dict.fromkeys(re.findall(r"\[(E\d+)\]", text)))[:2]
+    return JudicialOpinion(
+        judge=judge,
+        criterion_id=dim_id,
+        score=rng.randint(low, high),
+        argument=f"Offline {judge} assessment of {dim_id} " + " ".join(f"[{e}]" for e in cited),
+        cited_evidence=cited,
+    )
+
+
+def _malformed(content: str, rng: random.Random) -> str:
+    """
+    Almost-valid rendering of a structured answer, the way real models slip:
+    an out-of-range or textual score, a misspelled judge, a missing
+    criterion_id, and prose or a markdown fence around the JSON.
+    """
+    data = json.loads(content)
+    for opinion in data.get("opinions", [data]) if isinstance(data, dict) else []:
+        if "score" not in opinion:
+            continue
+        defect = rng.choice(["score_range", "score_text", "judge", "criterion_id"])
+        if defect == "score_range":
+            opinion["score"] = rng.choice([0, 6, 10])
+        elif defect == "score_text":
+            opinion["score"] = f"{opinion['score']}/5"
+        elif defect == "judge":
+            opinion["judge"] = {"TechLead": "Tech Lead", "Defense": "defense attorney"}.get(opinion["judge"], "prosecutor")
+        else:
+            opinion.pop("criterion_id", None)
+    body = json.dumps(data, indent=2)
+    return rng.choice([
+        f"Here is my ruling:\n```json\n{body}\n```",
+        f"{body}\nLet me know if you need more detail.",
+    ])
+
+
+def _fake_value(annotation, rng: random.Random):
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin is not None and str(origin).endswith("Literal"):
+        return rng.choice(args)
+    if origin in (list, List):
+        return [_fake_value(args[0], rng)] if args else []
+    if origin is not None and type(None) in args:  # Optional[X]
+        return _fake_value(next(a for a in args if a is not type(None)), rng)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _fake_model(annotation, rng)
+    if annotation is bool:
+        return rng.random() < 0.5
+    if annotation is int:
+        return rng.randint(1, 5)
+    if annotation is float:
+        return round(rng.random(), 2)
+    return "offline"
+
+
+def _fake_model(schema: Type[BaseModel], rng: random.Random) -> BaseModel:
+    """Generic filler for schemas without a dedicated fake."""
+    values = {}
+    for name, field in schema.model_fields.items():
+        if not field.is_required():
+            continue
+        values[name] = _fake_value(field.annotation, rng)
+    return schema.model_validate(values)
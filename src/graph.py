@@ -1,20 +1,36 @@
 import logging
+from typing import Dict, List, Optional
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
-from src.state import AgentState, Evidence
+from langgraph.types import Send
+from src.state import AgentState, Evidence, JudgeTask
 from src.nodes.detectives import (
     context_builder_node,
     repo_investigator_node,
     doc_analyst_node,
     vision_inspector_node,
+    avision_inspector_node,
     evidence_aggregator_node,
 )
 from src.nodes.judges import (
+    cascade_enabled,
+    dimensions_to_escalate,
+    get_judge_cache,
+    judge_batch_mode,
+    latest_opinions,
+    reload_llm,
     prosecutor_node,
     defense_node,
     tech_lead_node,
+    aprosecutor_node,
+    adefense_node,
+    atech_lead_node,
     judicial_aggregator_node,
 )
 from src.nodes.justice import chief_justice_node
+from src.tools.pdf_session import close_pdf_sessions
+from src.tools.vision_tools import get_vision_cache
+from src.llm_usage import reset_usage_ledger
 import json
 import argparse
 import os
@@ -22,6 +38,9 @@ from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Graph node that rules for each judge persona
+JUDGE_NODES = {"Prosecutor": "prosecutor", "Defense": "defense", "TechLead": "tech_lead"}
+
 
 # ---------------------------------------------------------------------------
 # Error-Handling Nodes
@@ -63,6 +82,7 @@ def judge_error_handler_node(state: AgentState) -> dict:
 
     opinions = state.get("opinions", [])
     dimensions = state.get("rubric_dimensions", [])
+    fallbacks = []
 
     logger.error(
         f"[JudgeErrorHandler] Triggered. {len(opinions)} opinions present, checking validity."
@@ -80,17 +100,21 @@ def judge_error_handler_node(state: AgentState) -> dict:
                 fallback_arg = FALLBACK_MESSAGES.get(
                     judge_name, f"Graph-level error recovery for {judge_name}."
                 )
-                opinions.append(
+                fallbacks.append(
                     JudicialOpinion(
                         judge=judge_name,
                         criterion_id=dim_id,
                         score=1,
                         argument=fallback_arg,
                         cited_evidence=[],
+                        source="fallback",
+                        # Stands in for a first-round opinion; never escalated
+                        tier="cheap" if cascade_enabled() else "strong",
                     )
                 )
 
-    return {"opinions": opinions}
+    # opinions has an add reducer: return only the new ones
+    return {"opinions": fallbacks}
 
 
 # ---------------------------------------------------------------------------
@@ -123,7 +147,7 @@ def evidence_quality_router(state: AgentState):
 
     # Check for minimum viable evidence
     total_evidence_items = sum(len(v) for v in evidences.values())
-    found_items = sum(1 for vals in evidences.values() for e in vals if e.found)
+    found_items = sum(1 for vals in evidences.values() for e in vals if e.found and not e.context)
 
     if total_evidence_items == 0:
         logger.warning("[Router] No evidence collected. Routing to failure handler.")
@@ -134,15 +158,55 @@ def evidence_quality_router(state: AgentState):
         return "failure_handler"
 
     # Sufficient evidence — proceed to judicial fan-out
-    return ["prosecutor", "defense", "tech_lead"]
+    return judge_tasks(state)
+
+
+def judge_tasks(state: AgentState, dimensions: Optional[List[Dict]] = None, tier: Optional[str] = None) -> list:
+    """
+    Map step of the judicial layer: one Send per (persona, dimension), each
+    carrying only that dimension's evidence, so parallelism grows with the
+    rubric and a slow dimension holds up only its own task. In "persona"
+    batch mode each persona gets a single task with every dimension, so its
+    calls can still be packed together. With the judge cascade on, the
+    first round runs on the cheap tier.
+    """
+    evidences = state.get("evidences", {})
+    dimensions = state["rubric_dimensions"] if dimensions is None else dimensions
+    tier = tier or ("cheap" if cascade_enabled() else "strong")
+    groups = [dimensions] if judge_batch_mode() == "persona" else [[dim] for dim in dimensions]
+    return [
+        Send(node, JudgeTask(
+            rubric_dimensions=group,
+            evidences={dim["id"]: evidences.get(dim["id"], []) for dim in group},
+            judge_tier=tier,
+        ))
+        for group in groups
+        for node in JUDGE_NODES.values()
+    ]
+
+
+def escalation_tasks(state: AgentState) -> list:
+    """Strong-model judge tasks for the dimensions the cheap tier could not settle."""
+    escalate = set(dimensions_to_escalate(state.get("opinions", [])))
+    dimensions = [dim for dim in state["rubric_dimensions"] if dim["id"] in escalate]
+    return judge_tasks(state, dimensions, tier="strong") if dimensions else []
+
+
+def graph_run_config() -> dict:
+    """
+    Run config for the compiled graph. max_concurrency (AUDIT_GRAPH_CONCURRENCY,
+    12) is a global cap on tasks in flight, which bounds the judicial map step.
+    """
+    return {"max_concurrency": int(os.getenv("AUDIT_GRAPH_CONCURRENCY", "12"))}
 
 
 def judicial_quality_router(state: AgentState):
     """
     Post-judicial router: checks if judge opinions are valid before synthesis.
-    Routes to error handler if opinions are malformed or missing.
+    Routes to error handler if opinions are malformed or missing, and back
+    to the judges on the strong model for cascade escalations.
     """
-    opinions = state.get("opinions", [])
+    opinions = latest_opinions(state.get("opinions", []))
     dimensions = state.get("rubric_dimensions", [])
 
     if not opinions:
@@ -158,6 +222,9 @@ def judicial_quality_router(state: AgentState):
         logger.warning(f"[Router] Majority of dimensions missing opinions: {missing_dims}. Routing to error handler.")
         return "judge_error_handler"
 
+    escalations = escalation_tasks(state)
+    if escalations:
+        return escalations
     return "chief_justice"
 
 
@@ -172,16 +239,20 @@ def create_graph():
     workflow.add_node("context_builder", context_builder_node)
     workflow.add_node("repo_investigator", repo_investigator_node)
     workflow.add_node("doc_analyst", doc_analyst_node)
-    workflow.add_node("vision_inspector", vision_inspector_node)
+    # Sync entry wraps the async fan-out; astream()/ainvoke() call the coroutine directly
+    workflow.add_node(
+        "vision_inspector", RunnableLambda(vision_inspector_node, afunc=avision_inspector_node)
+    )
     workflow.add_node("evidence_aggregator", evidence_aggregator_node)
 
     # Error-handling nodes
     workflow.add_node("failure_handler", failure_handler_node)
     workflow.add_node("judge_error_handler", judge_error_handler_node)
 
-    workflow.add_node("prosecutor", prosecutor_node)
-    workflow.add_node("defense", defense_node)
-    workflow.add_node("tech_lead", tech_lead_node)
+    # Judges run once per Send task (see judge_tasks); sync entries wrap the coroutines
+    workflow.add_node("prosecutor", RunnableLambda(prosecutor_node, afunc=aprosecutor_node))
+    workflow.add_node("defense", RunnableLambda(defense_node, afunc=adefense_node))
+    workflow.add_node("tech_lead", RunnableLambda(tech_lead_node, afunc=atech_lead_node))
     workflow.add_node("judicial_aggregator", judicial_aggregator_node)
 
     workflow.add_node("chief_justice", chief_justice_node)
@@ -215,7 +286,7 @@ def create_graph():
     # ORCHESTRATION LAYER 2: Judicial Phase (Judge Fan-Out / Fan-In)
     # =======================================================================
 
-    # Post-aggregation quality check before dispatching to judges
+    # Post-aggregation quality check, then map: one Send task per (persona, dimension)
     workflow.add_conditional_edges(
         "evidence_aggregator",
         evidence_quality_router,
@@ -227,7 +298,7 @@ def create_graph():
         }
     )
 
-    # Fan-In: All judges converge on the dedicated judicial aggregator
+    # Reduce: every judge task converges on the dedicated judicial aggregator
     workflow.add_edge("prosecutor", "judicial_aggregator")
     workflow.add_edge("defense", "judicial_aggregator")
     workflow.add_edge("tech_lead", "judicial_aggregator")
@@ -239,6 +310,10 @@ def create_graph():
         {
             "chief_justice": "chief_justice",
             "judge_error_handler": "judge_error_handler",
+            # Cascade escalations re-enter the judicial map step on the strong model
+            "prosecutor": "prosecutor",
+            "defense": "defense",
+            "tech_lead": "tech_lead",
         }
     )
 
@@ -279,6 +354,45 @@ def main():
         default="audit/report_onself_generated",
         help="Output directory for the generated Markdown report",
     )
+    parser.add_argument(
+        "--ingestion-backend",
+        choices=["pymupdf", "docling"],
+        default=None,
+        help="PDF ingestion backend for DocAnalyst (default: AUDIT_INGESTION_BACKEND or pymupdf)",
+    )
+    parser.add_argument(
+        "--judge-batch-mode",
+        choices=["dimension", "persona", "panel"],
+        default=None,
+        help="Judge call granularity (default: AUDIT_JUDGE_BATCH_MODE or dimension)",
+    )
+    parser.add_argument(
+        "--llm-backend",
+        choices=["live", "fake"],
+        default=None,
+        help="Judge and vision model backend; 'fake' runs offline and deterministic (default: AUDIT_LLM_BACKEND or live)",
+    )
+    parser.add_argument(
+        "--fast-path",
+        action="store_true",
+        help="Score dimensions with decisive evidence deterministically, without judge LLM calls",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Judge on a cheap model first; escalate disagreeing or failed dimensions to the strong model",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Global cap on graph tasks in flight, e.g. judge tasks (default: AUDIT_GRAPH_CONCURRENCY or 12)",
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Bypass the persistent judge and vision response caches for this run",
+    )
     args = parser.parse_args()
 
     with open(args.rubric, "r") as f:
@@ -298,17 +412,47 @@ def main():
 
     # Override the output directory used by ChiefJustice
     os.environ["AUDIT_OUTPUT_DIR"] = args.output_dir
+    if args.ingestion_backend:
+        os.environ["AUDIT_INGESTION_BACKEND"] = args.ingestion_backend
+    if args.judge_batch_mode:
+        os.environ["AUDIT_JUDGE_BATCH_MODE"] = args.judge_batch_mode
+    if args.llm_backend:
+        os.environ["AUDIT_LLM_BACKEND"] = args.llm_backend
+        reload_llm()
+    if args.fast_path:
+        os.environ["AUDIT_JUDGE_FAST_PATH"] = "1"
+    if args.cascade:
+        os.environ["AUDIT_JUDGE_CASCADE"] = "1"
+    if args.max_concurrency:
+        os.environ["AUDIT_GRAPH_CONCURRENCY"] = str(args.max_concurrency)
+    if args.no_llm_cache:
+        os.environ["AUDIT_LLM_CACHE"] = "0"
+        os.environ["AUDIT_VISION_CACHE"] = "0"
+
+    ledger = reset_usage_ledger()
 
     print(f"[Auditor] Starting audit of: {args.repo_url}")
     print(f"[Auditor] PDF Report: {args.pdf_path}")
     print(f"[Auditor] Output: {args.output_dir}/report.md")
     print("[Auditor] LangSmith tracing:", os.getenv("LANGCHAIN_TRACING_V2", "false"))
 
-    for event in app.stream(initial_state):
-        for node_name, output in event.items():
-            print(f"[Auditor] Node '{node_name}' finished.")
+    try:
+        for event in app.stream(initial_state, config=graph_run_config()):
+            for node_name, output in event.items():
+                print(f"[Auditor] Node '{node_name}' finished.")
+    finally:
+        # The detectives share one parse of the PDF; release it with the run
+        close_pdf_sessions(args.pdf_path)
 
     print(f"\n[Auditor] ✅ Audit complete. Report saved to: {args.output_dir}/report.md")
+    judge_cache, vision_cache = get_judge_cache(), get_vision_cache()
+    print(
+        f"[Auditor] LLM cache: judges {judge_cache.summary() if judge_cache else 'disabled'}, "
+        f"vision {vision_cache.summary() if vision_cache else 'disabled'}"
+    )
+    usage_path = ledger.write_json(os.path.join(args.output_dir, "llm_usage.json"))
+    print(f"[Auditor] LLM usage ({usage_path}):")
+    print(ledger.format_table())
 
 
 if __name__ == "__main__":
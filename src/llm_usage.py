@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+# USD per million (input, output) tokens; unknown models are costed at 0
+MODEL_PRICES = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-flash-8b": (0.0375, 0.15),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "fake-judge": (0.0, 0.0),
+    "fake-judge-mini": (0.0, 0.0),
+    "fake-vision": (0.0, 0.0),
+}
+
+
+@dataclass
+class CallRecord:
+    """
+    One logical LLM interaction (a judge ruling, a vision analysis) against
+    one provider. attempts counts the model runs seen by the callback, so
+    retries are attempts - 1; a cache hit has no attempts at all. repairs
+    counts malformed responses fixed locally instead of re-asking.
+    """
+
+    node: str
+    dimension: Optional[str]
+    provider: str
+    model: str
+    cache: str  # "hit", "miss" or "off"
+    tier: str = "strong"  # judge cascade tier
+    status: str = "pending"  # "ok", "failed" or "cached"
+    attempts: int = 0
+    repairs: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    llm_latency_s: float = 0.0
+    wall_s: float = 0.0
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+    @property
+    def cost_usd(self) -> float:
+        price_in, price_out = MODEL_PRICES.get(self.model, (0.0, 0.0))
+        return (self.input_tokens * price_in + self.output_tokens * price_out) / 1_000_000
+
+    def callbacks(self) -> List[BaseCallbackHandler]:
+        """Pass as config={"callbacks": ...} to every runnable of this interaction."""
+        return [UsageCallbackHandler(self)]
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.wall_s = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+        data.update(retries=self.retries, cost_usd=round(self.cost_usd, 6))
+        data["llm_latency_s"] = round(self.llm_latency_s, 3)
+        data["wall_s"] = round(self.wall_s, 3)
+        return data
+
+
+def _usage(response: LLMResult) -> Tuple[int, int]:
+    """(input, output) tokens from message usage_metadata, else provider llm_output."""
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+    if not (input_tokens or output_tokens):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        input_tokens = usage.get("prompt_tokens", 0)
+        output_tokens = usage.get("completion_tokens", 0)
+    return input_tokens, output_tokens
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Adds each model run's tokens and latency to a CallRecord."""
+
+    run_inline = True
+
+    def __init__(self, record: CallRecord):
+        self.record = record
+        self._starts: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self._starts[run_id] = time.perf_counter()
+        with self.record._lock:
+            self.record.attempts += 1
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs) -> None:
+        self.on_chat_model_start(serialized, prompts, run_id=run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        input_tokens, output_tokens = _usage(response)
+        with self.record._lock:
+            self.record.llm_latency_s += self._elapsed(run_id)
+            self.record.input_tokens += input_tokens
+            self.record.output_tokens += output_tokens
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        with self.record._lock:
+            self.record.llm_latency_s += self._elapsed(run_id)
+
+    def _elapsed(self, run_id: UUID) -> float:
+        start = self._starts.pop(run_id, None)
+        return time.perf_counter() - start if start is not None else 0.0
+
+
+def _aggregate(records: List[CallRecord]) -> Dict[str, Any]:
+    return {
+        "calls": len(records),
+        "cache_hits": sum(r.cache == "hit" for r in records),
+        "failed": sum(r.status == "failed" for r in records),
+        "attempts": sum(r.attempts for r in records),
+        "retries": sum(r.retries for r in records),
+        "repairs": sum(r.repairs for r in records),
+        "input_tokens": sum(r.input_tokens for r in records),
+        "output_tokens": sum(r.output_tokens for r in records),
+        "cost_usd": round(sum(r.cost_usd for r in records), 6),
+        "llm_latency_s": round(sum(r.llm_latency_s for r in records), 3),
+    }
+
+
+def _group(records: List[CallRecord], key) -> Dict[str, Dict[str, Any]]:
+    groups: Dict[str, List[CallRecord]] = {}
+    for record in records:
+        groups.setdefault(key(record), []).append(record)
+    return {name: _aggregate(group) for name, group in sorted(groups.items())}
+
+
+class UsageLedger:
+    """Every LLM interaction of an audit, aggregated per node, dimension and model."""
+
+    def __init__(self):
+        self.records: List[CallRecord] = []
+        self.cascade_dimensions: set = set()
+        self.escalated_dimensions: set = set()
+        self.evidence_dropped_tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self, node: str, dimension: Optional[str], provider: str, model: str, cache: str, tier: str = "strong"
+    ) -> CallRecord:
+        record = CallRecord(node=node, dimension=dimension, provider=provider, model=model, cache=cache, tier=tier)
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def record_cache_hit(
+        self, node: str, dimension: Optional[str], provider: str, model: str, tier: str = "strong"
+    ) -> None:
+        self.start(node, dimension, provider, model, cache="hit", tier=tier).finish("cached")
+
+    def record_cascade(self, cheap_dimensions: Iterable[str], escalated: Iterable[str]) -> None:
+        """Dimensions first judged on the cheap tier, and those escalated to the strong one."""
+        with self._lock:
+            self.cascade_dimensions.update(cheap_dimensions)
+            self.escalated_dimensions.update(escalated)
+
+    def record_evidence_packing(self, dimension: str, dropped_tokens: int) -> None:
+        """Estimated evidence tokens cut from a dimension's judge prompts to fit the budget."""
+        with self._lock:
+            self.evidence_dropped_tokens[dimension] = dropped_tokens
+
+    def packing_summary(self) -> Optional[Dict[str, Any]]:
+        """Evidence packing losses per dimension, or None when everything fit."""
+        with self._lock:
+            dropped = dict(self.evidence_dropped_tokens)
+        if not dropped:
+            return None
+        return {
+            "dimensions_packed": len(dropped),
+            "dropped_tokens_est": sum(dropped.values()),
+            "by_dimension": dict(sorted(dropped.items())),
+        }
+
+    def cascade_summary(self) -> Optional[Dict[str, Any]]:
+        """
+        Escalation rate and estimated savings of the judge cascade, or None
+        when it was off. Savings are the strong calls avoided for dimensions
+        that were not escalated, priced at the mean observed strong-tier
+        latency/cost, minus every cheap-tier call (the cascade's overhead);
+        escalations would have been strong calls anyway. A negative value
+        means the cascade cost more than it saved. Savings are unknown until
+        a strong call has been observed.
+        """
+        with self._lock:
+            records = list(self.records)
+            dimensions, escalated = set(self.cascade_dimensions), set(self.escalated_dimensions)
+        if not dimensions:
+            return None
+        cheap = [r for r in records if r.tier == "cheap" and r.cache != "hit"]
+        judge_nodes = {r.node for r in cheap}
+        strong = [r for r in records if r.tier == "strong" and r.node in judge_nodes and r.cache != "hit"]
+        measured = [r for r in strong if r.status == "ok"]
+
+        summary = {
+            "dimensions": len(dimensions),
+            "escalated": len(escalated),
+            "escalation_rate": round(len(escalated) / len(dimensions), 3),
+            "cheap_llm_s": round(sum(r.llm_latency_s for r in cheap), 3),
+            "strong_llm_s": round(sum(r.llm_latency_s for r in strong), 3),
+            "llm_s_saved_est": None,
+            "cost_usd_saved_est": None,
+        }
+        if measured:
+            mean_latency = sum(r.llm_latency_s for r in measured) / len(measured)
+            mean_cost = sum(r.cost_usd for r in measured) / len(measured)
+            # Persona batches carry no dimension; assume they avoided the non-escalated share
+            kept = 1 - len(escalated) / len(dimensions)
+            avoided = sum(
+                (r.dimension not in escalated) if r.dimension is not None else kept for r in cheap
+            )
+            summary["llm_s_saved_est"] = round(avoided * mean_latency - summary["cheap_llm_s"], 3)
+            summary["cost_usd_saved_est"] = round(avoided * mean_cost - sum(r.cost_usd for r in cheap), 6)
+        return summary
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            records = list(self.records)
+        return {
+            "totals": _aggregate(records),
+            "by_node": _group(records, lambda r: r.node),
+            "by_dimension": _group(records, lambda r: r.dimension or "(unattributed)"),
+            "by_model": _group(records, lambda r: f"{r.provider}/{r.model}"),
+            "cascade": self.cascade_summary(),
+            "evidence_packing": self.packing_summary(),
+            "calls": [r.to_dict() for r in records],
+        }
+
+    def write_json(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+    def format_table(self) -> str:
+        """Compact per-node table with a total row, for the end of a CLI run."""
+        summary = self.summary()
+        rows = list(summary["by_node"].items()) + [("TOTAL", summary["totals"])]
+        lines = [f"{'node':<18}{'calls':>6}{'hits':>6}{'fail':>6}{'retry':>6}{'repair':>7}{'in_tok':>9}{'out_tok':>9}{'cost_usd':>10}{'llm_s':>8}"]
+        for name, agg in rows:
+            lines.append(
+                f"{name:<18}{agg['calls']:>6}{agg['cache_hits']:>6}{agg['failed']:>6}{agg['retries']:>6}{agg['repairs']:>7}"
+                f"{agg['input_tokens']:>9}{agg['output_tokens']:>9}{agg['cost_usd']:>10.4f}{agg['llm_latency_s']:>8.1f}"
+            )
+        cascade = summary["cascade"]
+        if cascade:
+            seconds, cost = cascade["llm_s_saved_est"], cascade["cost_usd_saved_est"]
+            if seconds is None:
+                saved = "savings unknown (no strong-model call observed)"
+            else:
+                saved = ", ".join([
+                    f"~{seconds:.1f}s LLM time saved" if seconds >= 0 else f"~{-seconds:.1f}s extra LLM time",
+                    f"${cost:.4f} saved (est.)" if cost >= 0 else f"${-cost:.4f} extra cost (est.)",
+                ])
+            lines.append(
+                f"Cascade: {cascade['escalated']}/{cascade['dimensions']} dimension(s) escalated "
+                f"({cascade['escalation_rate']:.0%}), {saved}"
+            )
+        packing = summary["evidence_packing"]
+        if packing:
+            lines.append(
+                f"Evidence packing: ~{packing['dropped_tokens_est']} token(s) dropped across "
+                f"{packing['dimensions_packed']} dimension(s) to fit the judge budget"
+            )
+        return "\n".join(lines)
+
+
+_ledger = UsageLedger()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Process-wide ledger shared by judge and vision calls."""
+    return _ledger
+
+
+def reset_usage_ledger() -> UsageLedger:
+    """Starts a fresh ledger, e.g. at the beginning of an audit."""
+    global _ledger
+    _ledger = UsageLedger()
+    return _ledger
@@ -1,12 +1,27 @@
 import os
+import asyncio
 import logging
 from src.state import AgentState, Evidence
 from src.tools.repo_tools import RepoInvestigator
 from src.tools.doc_tools import DocAnalyst
-from src.tools.vision_tools import VisionInspector
+from src.tools.ingestion_backends import get_ingestion_backend
+from src.tools.vision_tools import VisionInspector, get_vision_cache, is_fallback_analysis, vision_page_section
+from src.tools.image_ops import group_duplicate_images
+from src.tools.diagram_labels import analyze_from_labels, vocabulary_from_rubric
+from src.tools.diagram_scorer import rank_diagram_candidates, vision_top_k
+from src.tools.page_cache import PageCache
+from src.tools.pdf_session import get_pdf_session, hold_pdf_session, release_pdf_session
 
 logger = logging.getLogger(__name__)
 
+# Evidence keys under which DocAnalyst publishes per-dimension report passages.
+# EvidenceAggregator folds them into the dimension's own evidence list so
+# parallel detectives never overwrite each other's entries for the same key.
+# Passages are marked context=True: a report merely mentioning a topic must
+# not move the judges' evidence statistics.
+REPORT_PASSAGES_PREFIX = "report_passages:"
+PASSAGES_TOP_K = int(os.getenv("AUDIT_PASSAGES_TOP_K", "3"))
+
 
 def context_builder_node(state: AgentState) -> dict:
     """Pre-checks artifact availability and builds orchestration context."""
@@ -21,6 +36,8 @@ def context_builder_node(state: AgentState) -> dict:
     pdf_path = state.get("pdf_path")
     if pdf_path and os.path.exists(pdf_path):
         available.append("pdf")
+        # Released by EvidenceAggregator once this audit's detectives are done
+        hold_pdf_session(pdf_path)
     
     logger.info(f"Orchestration Context: Available artifacts = {available}")
     return {"available_artifacts": available}
@@ -223,9 +240,10 @@ def doc_analyst_node(state: AgentState) -> dict:
     if not pdf_path or not os.path.exists(pdf_path):
          return {"evidences": {}}
 
-    analyst = DocAnalyst()
+    page_cache = PageCache()
+    analyst = DocAnalyst(page_cache=page_cache, backend=get_ingestion_backend())
     try:
-        doc_text = analyst.ingest_pdf(pdf_path)
+        doc_text = analyst.ingest_pdf(pdf_path, session=get_pdf_session(pdf_path))
     except Exception as e:
         logger.error(f"DocAnalyst failed to ingest PDF: {e}")
         return {"evidences": {"theoretical_depth": [Evidence(
@@ -237,7 +255,10 @@ def doc_analyst_node(state: AgentState) -> dict:
         )]}}
 
     keywords = ["Dialectical Synthesis", "Fan-In / Fan-Out", "Metacognition", "State Synchronization"]
-    concept_data = analyst.query_concepts(doc_text, keywords)
+    # One retrieval serves both the concept context and the match scores
+    chunk_results = analyst.query_chunks(keywords)
+    concept_data = analyst.query_concepts(doc_text, keywords, chunk_results=chunk_results)
+    match_scores = {kw: chunks[0]["match_score"] for kw, chunks in chunk_results.items() if chunks}
     extracted_paths = analyst.extract_file_paths(doc_text)
 
     keywords_found_in_context = []
@@ -257,7 +278,8 @@ def doc_analyst_node(state: AgentState) -> dict:
         location=pdf_path,
         rationale=(
             f"Found {len(keywords_found_in_context)} keywords with substantive context: {keywords_found_in_context}. "
-            f"Buzzword-only drops: {keywords_only_buzzword}."
+            f"Buzzword-only drops: {keywords_only_buzzword}. "
+            f"Fuzzy match scores: {match_scores or 'none'}."
         ),
         confidence=0.85,
     )
@@ -271,49 +293,155 @@ def doc_analyst_node(state: AgentState) -> dict:
         confidence=0.75,
     )
 
-    return {"evidences": {
+    evidences = {
         "theoretical_depth": [theoretical_evidence],
         "report_accuracy_raw_paths": [accuracy_evidence],
-    }}
+    }
+
+    # Route every rubric dimension to its most relevant report passages
+    dimensions = state.get("rubric_dimensions", [])
+    for dim_id, passages in analyst.route_dimensions(dimensions, top_k=PASSAGES_TOP_K).items():
+        if not passages:
+            continue
+        evidences[f"{REPORT_PASSAGES_PREFIX}{dim_id}"] = [Evidence(
+            goal=f"Locate report passages relevant to rubric dimension '{dim_id}'",
+            found=True,
+            context=True,
+            content="\n\n".join(
+                f"[Page {p['page']}, Section: {p['heading']}, relevance={p['score']:.2f}]\n{p['content']}"
+                for p in passages
+            ),
+            location=pdf_path,
+            rationale=(
+                f"TF-IDF routing matched {len(passages)} passage(s) to this dimension's "
+                f"forensic instruction and success pattern (best relevance {passages[0]['score']:.2f})."
+            ),
+            confidence=0.6,
+        )]
+
+    return {"evidences": evidences}
 
 
 def vision_inspector_node(state: AgentState) -> dict:
     """Node for forensic analysis of diagrams in the PDF using multimodal LLM."""
+    return asyncio.run(avision_inspector_node(state))
+
+
+async def avision_inspector_node(state: AgentState) -> dict:
+    """
+    Async VisionInspector: every candidate image on changed pages is analyzed
+    concurrently (bounded by AUDIT_VISION_CONCURRENCY and the per-provider
+    rate limiter), so wall time is about one LLM round-trip instead of N.
+    Diagrams whose node labels are in the PDF text layer need no LLM call.
+    """
     pdf_path = state["pdf_path"]
     if not pdf_path or not os.path.exists(pdf_path):
         return {"evidences": {}}
 
-    viz = VisionInspector()
-    images = viz.extract_images_from_pdf(pdf_path)
+    page_cache = PageCache()
+    viz = VisionInspector(page_cache=page_cache)
+    try:
+        session = get_pdf_session(pdf_path)
+    except Exception as e:
+        logger.error(f"VisionInspector failed to open PDF {pdf_path}: {e}")
+        session = None
+    pages = viz.extract_images_by_page(pdf_path, session=session) if session else []
 
-    if not images:
+    if not pages:
         return {"evidences": {"swarm_visual": [Evidence(
             goal="Extract and analyze architectural diagrams",
             found=False,
-            content="No embedded images found in the PDF.",
+            content="No embedded images or vector-drawn figures found in the PDF.",
             location=pdf_path,
-            rationale="VisionInspector scanned all PDF pages but found zero embedded images.",
+            rationale="VisionInspector scanned all PDF pages but found zero embedded images or vector figures.",
             confidence=1.0,
         )]}}
 
-    # Analyze each extracted image (up to 3 to avoid rate limits)
+    # Reuse analyses for unchanged pages; analyze each unique new image once,
+    # all in one concurrent batch, and attach the result to every duplicate
+    fresh_pages = [page for page in pages if page["cached"] is None]
+    fresh_images = [image for page in fresh_pages for image in page["images"]]
+    groups = group_duplicate_images(fresh_images)
+    # Diagrams whose node labels sit in the PDF text layer are resolved locally;
+    # the vision budget goes to the remaining images most likely to be diagrams
+    spans_by_page = {page["page"]: page["spans"] for page in session.pages} if session else {}
+    vocabulary = vocabulary_from_rubric(state.get("rubric_dimensions", []))
+    label_results = {
+        id(group[0]): analyze_from_labels(group[0], spans_by_page.get(group[0].page, ()), vocabulary)
+        for group in groups
+    }
+    needs_vision = [group[0] for group in groups if label_results[id(group[0])] is None]
+    selected, scores = rank_diagram_candidates(needs_vision, spans_by_page)
+    selected_ids = {id(image) for image in selected}
+    selected_results = await viz.aanalyze_diagrams(selected)
+    analysis_by_rep = {id(image): analysis for image, analysis in zip(selected, selected_results)}
+
+    results_by_image = {}
+    for group in groups:
+        representative = group[0]
+        score = scores.get(id(representative))
+        if label_results[id(representative)] is not None:
+            result = {"analysis": label_results[id(representative)], "source": "text-layer"}
+        elif id(representative) in selected_ids:
+            result = {"analysis": analysis_by_rep[id(representative)], "diagram_score": score}
+        else:
+            result = {
+                "analysis": f"Not sent for vision analysis (diagram likelihood {score:.2f} below cut-off).",
+                "diagram_score": score,
+                "skipped": True,
+            }
+        for image in group:
+            duplicate_of = None if image is representative else representative.name
+            results_by_image[id(image)] = {**result, "duplicate_of": duplicate_of}
+
     analyses = []
-    for img_path in images[:3]:
-        analysis = viz.analyze_diagram(img_path)
-        analyses.append(f"[{os.path.basename(img_path)}]: {analysis}")
+    image_count = 0
+    page_section, top_k = vision_page_section(), vision_top_k()
+    for page in pages:
+        if page["cached"] is not None:
+            page_cache.reused += 1
+            image_count += len(page["cached"]["analyses"])
+            analyses.extend(_format_analysis(a, cached=True) for a in page["cached"]["analyses"])
+            continue
+
+        page_cache.reprocessed += 1
+        image_count += len(page["images"])
+        page_analyses = [
+            {"image": image.name, **results_by_image[id(image)]}
+            for image in page["images"]
+        ]
+        analyses.extend(_format_analysis(a) for a in page_analyses)
+
+        # Threshold-only skips depend on the image alone; with a top-k cap they
+        # depend on the ranking across all pages, so such pages are not cached
+        if page["page_hash"] and not any(
+            (a.get("skipped") and top_k > 0) or is_fallback_analysis(a["analysis"]) for a in page_analyses
+        ):
+            page_cache.put(page["page_hash"], page_section, {"analyses": page_analyses})
+
+    vision_cache = get_vision_cache()
+    logger.info(
+        f"VisionInspector resolved {len(groups) - len(needs_vision)} diagram(s) from text-layer labels and "
+        f"sent {len(selected)} likely diagram(s) to the vision model, out of {len(groups)} unique "
+        f"of {len(fresh_images)} new image(s); "
+        f"incremental analysis: {page_cache.summary()}; "
+        f"vision cache: {vision_cache.summary() if vision_cache else 'disabled'}"
+    )
 
     evidences = {
         "swarm_visual": [Evidence(
             goal="Analyze architectural diagrams for fan-out/fan-in parallelism",
             found=True,
             content=(
-                f"Extracted {len(images)} image(s) from PDF. "
-                f"Analyzed {min(len(images), 3)}:\n" + "\n".join(analyses)
+                f"Extracted {image_count} image(s) from PDF. "
+                f"Analyzed {len(analyses)}:\n" + "\n".join(analyses)
             ),
             location=pdf_path,
             rationale=(
-                f"VisionInspector extracted {len(images)} image(s) via PyMuPDF and "
-                f"performed multimodal analysis on {min(len(images), 3)} diagram(s)."
+                f"VisionInspector extracted {image_count} image(s) via PyMuPDF and "
+                f"resolved {len(groups) - len(needs_vision)} of {len(groups)} unique new image(s) from "
+                f"text-layer labels and performed multimodal analysis on the {len(selected)} remaining "
+                f"image(s) ranked most diagram-like ({page_cache.summary()})."
             ),
             confidence=0.8,
         )]
@@ -322,11 +450,30 @@ def vision_inspector_node(state: AgentState) -> dict:
     return {"evidences": evidences}
 
 
+def _format_analysis(entry: dict, cached: bool = False) -> str:
+    tags = ""
+    if cached:
+        tags += " (cached)"
+    if entry.get("source") == "text-layer":
+        tags += " (text layer)"
+    if entry.get("diagram_score") is not None:
+        tags += f" (diagram score {entry['diagram_score']:.2f})"
+    if entry.get("duplicate_of"):
+        tags += f" (duplicate of {entry['duplicate_of']})"
+    return f"[{entry['image']}]{tags}: {entry['analysis']}"
+
+
 def evidence_aggregator_node(state: AgentState) -> dict:
     """
     Synchronization node (Fan-In): collects all Detective evidence and performs
-    cross-referencing between repo findings and document claims.
+    cross-referencing between repo findings and document claims. The
+    detectives are done with the report here, so this audit releases its
+    hold on the shared PdfSession; the session closes once no concurrent
+    audit of the same file still holds it.
     """
+    if state.get("pdf_path"):
+        release_pdf_session(state["pdf_path"])
+
     evidences = state.get("evidences", {})
     available = state.get("available_artifacts", [])
     
@@ -342,6 +489,17 @@ def evidence_aggregator_node(state: AgentState) -> dict:
             confidence=1.0
         )]}}
 
+    updates = {}
+
+    # Fold routed report passages into each dimension's own evidence list
+    for key, passages in evidences.items():
+        if key.startswith(REPORT_PASSAGES_PREFIX):
+            dim_id = key[len(REPORT_PASSAGES_PREFIX):]
+            existing = list(evidences.get(dim_id, []))
+            new_items = [p for p in passages if p not in existing]
+            if new_items:
+                updates[dim_id] = existing + new_items
+
     # Cross-reference: report claims vs. actual repo files
     raw_paths_evidence = evidences.get("report_accuracy_raw_paths", [])
     if raw_paths_evidence and raw_paths_evidence[0].found:
@@ -372,6 +530,6 @@ def evidence_aggregator_node(state: AgentState) -> dict:
             ),
             confidence=0.8,
         )
-        return {"evidences": {"report_accuracy": [cross_ref]}}
+        updates["report_accuracy"] = updates.get("report_accuracy", []) + [cross_ref]
 
-    return {}
+    return {"evidences": updates} if updates else {}
@@ -1,14 +1,29 @@
 import os
-import time
+import asyncio
 import logging
-from typing import List, Tuple
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 
-from src.state import AgentState, JudicialOpinion, Evidence
+from src.batching import estimate_tokens, pack_batches
+from src.fake_llm import FakeChatModel, llm_backend
+from src.llm_usage import get_usage_ledger
+from src.rate_limits import get_rate_limiter
+from src.resilience import (
+    ProviderUnavailable,
+    RetriesExhausted,
+    acall_with_retries,
+    attempt_timeout,
+    get_circuit_breaker,
+)
+from src.response_cache import ResponseCache, fingerprint
+from src.state import AgentState, JudicialOpinion, JudicialOpinionBatch, Evidence
+from src.structured_repair import RepairFailed, repair_structured
 
 logger = logging.getLogger(__name__)
 
@@ -17,17 +32,123 @@ load_dotenv()
 
 
 
-def _build_llm():
-    """Prefer Gemini when configured; fallback to OpenAI."""
-    if os.getenv("GOOGLE_API_KEY"):
-        return ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0)
-    return ChatOpenAI(model="gpt-4o", temperature=0)
+JUDGE_MODELS = {"gemini": "gemini-1.5-flash", "openai": "gpt-4o", "fake": "fake-judge"}
+# First-pass models of the judge cascade (AUDIT_JUDGE_CASCADE); override with AUDIT_JUDGE_CHEAP_MODEL
+JUDGE_CHEAP_MODELS = {"gemini": "gemini-1.5-flash-8b", "openai": "gpt-4o-mini", "fake": "fake-judge-mini"}
+PROVIDER_KEYS = {"gemini": "GOOGLE_API_KEY", "openai": "OPENAI_API_KEY"}
+
+
+def _build_llm(provider: Optional[str] = None, model_name: Optional[str] = None):
+    """
+    Prefer Gemini when configured; fallback to OpenAI.
+    AUDIT_LLM_BACKEND=fake swaps in the offline FakeChatModel.
+    The model carries no rate limiter: judge calls wait for the provider's
+    shared limiter (_judge_rate_limiter) before their timed attempt starts.
+    Client-side retries are off and requests time out with the attempt, so
+    acall_with_retries owns backoff and the breaker sees every failure.
+    """
+    if provider is None and llm_backend() == "fake":
+        provider = "fake"
+    provider = provider or ("gemini" if os.getenv("GOOGLE_API_KEY") else "openai")
+    model_name = model_name or JUDGE_MODELS[provider]
+    if provider == "fake":
+        return FakeChatModel.from_env(model_name, rate_limiter=None)
+    if provider == "gemini":
+        return ChatGoogleGenerativeAI(model=model_name, temperature=0, max_retries=0, timeout=attempt_timeout())
+    return ChatOpenAI(model=model_name, temperature=0, max_retries=0, timeout=attempt_timeout())
+
+
+def _judge_rate_limiter(provider: str):
+    """The provider's shared limiter; the fake backend is paced only when AUDIT_RPS_FAKE is set."""
+    if provider == "fake" and not os.getenv("AUDIT_RPS_FAKE"):
+        return None
+    if provider not in JUDGE_MODELS:
+        return None
+    return get_rate_limiter(provider)
 
 
 llm = _build_llm()
 
+# Attempts per provider before failing over to the next configured one
 MAX_RETRIES = 3
 
+_failover_llms: Dict[str, object] = {}
+_cheap_llms: Dict[str, object] = {}
+_failover_lock = threading.Lock()
+
+
+def reload_llm():
+    """Rebuilds the judge model after AUDIT_LLM_BACKEND or provider keys change."""
+    global llm
+    llm = _build_llm()
+    with _failover_lock:
+        _failover_llms.clear()
+        _cheap_llms.clear()
+    return llm
+
+
+def _llm_provider(model) -> str:
+    if isinstance(model, FakeChatModel):
+        return "fake"
+    if isinstance(model, ChatGoogleGenerativeAI):
+        return "gemini"
+    if isinstance(model, ChatOpenAI):
+        return "openai"
+    return "custom"
+
+
+def _cheap_llm(provider: str):
+    """The cascade's first-pass model for a provider, built once."""
+    with _failover_lock:
+        if provider not in _cheap_llms:
+            name = os.getenv("AUDIT_JUDGE_CHEAP_MODEL") or JUDGE_CHEAP_MODELS[provider]
+            _cheap_llms[provider] = _build_llm(provider, name)
+        return _cheap_llms[provider]
+
+
+def _judge_providers(tier: str = "strong") -> List[Tuple[str, object]]:
+    """
+    (provider, model) pairs to try in order: the primary judge model, then
+    every other provider that has an API key configured. The fake backend
+    never fails over to a live provider. The "cheap" cascade tier only uses
+    the primary provider's cheap model: a failure there escalates instead.
+    """
+    primary = _llm_provider(llm)
+    if tier == "cheap" and primary in JUDGE_CHEAP_MODELS:
+        return [(primary, _cheap_llm(primary))]
+    candidates = [(primary, llm)]
+    if primary == "fake":
+        return candidates
+    for provider, env_key in PROVIDER_KEYS.items():
+        if provider == primary or not os.getenv(env_key):
+            continue
+        with _failover_lock:
+            if provider not in _failover_llms:
+                _failover_llms[provider] = _build_llm(provider)
+            candidates.append((provider, _failover_llms[provider]))
+    return candidates
+
+# Dimensions judged concurrently by one judge node
+JUDGE_CONCURRENCY = int(os.getenv("AUDIT_JUDGE_CONCURRENCY", "6"))
+
+# Call granularity (AUDIT_JUDGE_BATCH_MODE):
+#   "dimension" - one call per (persona, dimension)
+#   "persona"   - one call returns all dimensions for a persona, packed to the context window
+#   "panel"     - one call returns all three personas' opinions for a dimension
+JUDGE_BATCH_MODES = ("dimension", "persona", "panel")
+
+# Input context per model, in tokens; override with AUDIT_JUDGE_CONTEXT_TOKENS
+MODEL_CONTEXT_TOKENS = {
+    "gemini-1.5-flash": 1_000_000,
+    "gemini-1.5-flash-8b": 1_000_000,
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+}
+# Share of the context window a persona batch may fill, and the output
+# tokens reserved per requested opinion
+JUDGE_BATCH_CONTEXT_FRACTION = 0.5
+OPINION_OUTPUT_TOKENS = 800
+
 PROSECUTOR_PROMPT = """You are the PROSECUTOR in a Digital Courtroom.
 Persona: Hardline Security Auditor / Cynical Code Critic.
 Philosophy: "Evidence over intent. All code is guilty of technical debt until proven innocent."
@@ -80,7 +201,13 @@ FALLBACK_MESSAGES = {
 
 
 
+def _findings(relevant_evidence: List[Evidence]) -> List[Evidence]:
+    """Detective findings only: context items (routed report passages) are not scored."""
+    return [e for e in relevant_evidence if not e.context]
+
+
 def _evidence_stats(relevant_evidence: List[Evidence]) -> Tuple[float, float]:
+    relevant_evidence = _findings(relevant_evidence)
     if not relevant_evidence:
         return 0.0, 0.0
     found_ratio = sum(1 for e in relevant_evidence if e.found) / len(relevant_evidence)
@@ -89,21 +216,92 @@ def _evidence_stats(relevant_evidence: List[Evidence]) -> Tuple[float, float]:
 
 
 
-def _format_evidence_with_ids(relevant_evidence: List[Evidence]) -> Tuple[str, List[str]]:
+def _fair_shares(sizes: List[int], budget: int) -> List[int]:
+    """
+    Water-filling split of budget across items: small items keep their full
+    size and the remainder is shared evenly among the larger ones.
+    """
+    shares = [0] * len(sizes)
+    remaining = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    left = max(0, budget)
+    while remaining:
+        share = left // len(remaining)
+        i = remaining[0]
+        if sizes[i] <= share:
+            shares[i] = sizes[i]
+            left -= sizes[i]
+            remaining.pop(0)
+        else:
+            for j in remaining:
+                shares[j] = share
+            break
+    return shares
+
+
+def _clip(text: str, max_chars: int) -> str:
+    """Keeps the head and tail of text within max_chars, marking what was cut."""
+    if len(text) <= max_chars:
+        return text
+    if max_chars < 40:
+        return f"...[{len(text)} chars omitted]"
+    marker = f" ...[{len(text) - max_chars} chars omitted]... "
+    keep = max(0, max_chars - len(marker))
+    head = keep * 2 // 3
+    return text[:head] + marker + text[len(text) - (keep - head):]
+
+
+def _format_evidence_with_ids(
+    relevant_evidence: List[Evidence], token_budget: Optional[int] = None
+) -> Tuple[str, List[str], int]:
+    """
+    Renders evidence as [E#] lines within token_budget (default
+    AUDIT_JUDGE_EVIDENCE_TOKENS, 4000; 0 disables packing).
+
+    When everything does not fit, each item keeps its header (found,
+    confidence, goal, location); rationales are kept first, then the
+    content budget is shared fairly and long contents are cut to head and
+    tail. IDs follow the input order whatever is dropped.
+    Returns (text, ids, estimated tokens dropped).
+    """
     if not relevant_evidence:
-        return "No evidence collected for this dimension.", []
-
-    lines: List[str] = []
-    ids: List[str] = []
-    for i, e in enumerate(relevant_evidence):
-        eid = f"E{i + 1}"
-        ids.append(eid)
-        lines.append(
-            f"[{eid}] found={e.found} confidence={e.confidence:.2f} "
-            f"goal={e.goal} location={e.location} rationale={e.rationale} content={e.content}"
+        return "No evidence collected for this dimension.", [], 0
+    if token_budget is None:
+        token_budget = int(os.getenv("AUDIT_JUDGE_EVIDENCE_TOKENS", "4000"))
+
+    ids = [f"E{i + 1}" for i in range(len(relevant_evidence))]
+    headers = [
+        f"[{eid}] {'context (not scored)' if e.context else f'found={e.found} confidence={e.confidence:.2f}'} "
+        f"goal={e.goal} location={e.location}"
+        for eid, e in zip(ids, relevant_evidence)
+    ]
+    rationales = [e.rationale or "" for e in relevant_evidence]
+    contents = [e.content or "" for e in relevant_evidence]
+
+    def _render(rationale_parts: List[str], content_parts: List[str]) -> str:
+        return "\n".join(
+            f"{header} rationale={rationale} content={content}"
+            for header, rationale, content in zip(headers, rationale_parts, content_parts)
         )
-    return "\n".join(lines), ids
 
+    full = _render(rationales, [str(e.content) for e in relevant_evidence])
+    full_tokens = estimate_tokens(full)
+    if token_budget <= 0 or full_tokens <= token_budget:
+        return full, ids, 0
+
+    # Character budget left after the fixed per-item scaffolding
+    budget_chars = token_budget * 4 - len(_render([""] * len(ids), [""] * len(ids)))
+    rationale_shares = _fair_shares([len(r) for r in rationales], budget_chars)
+    packed_rationales = [_clip(r, n) for r, n in zip(rationales, rationale_shares)]
+    content_budget = budget_chars - sum(len(r) for r in packed_rationales)
+    content_shares = _fair_shares([len(c) for c in contents], content_budget)
+    packed_contents = [
+        _clip(c, n) if n > 0 or not c else f"[{len(c)} chars omitted]"
+        for c, n in zip(contents, content_shares)
+    ]
+
+    packed = _render(packed_rationales, packed_contents)
+    dropped = max(0, full_tokens - estimate_tokens(packed))
+    return packed, ids, dropped
 
 
 def _ensure_citations(opinion: JudicialOpinion, evidence_ids: List[str]) -> JudicialOpinion:
@@ -145,92 +343,488 @@ def _enforce_persona_score(
 
 
 
-def get_judge_node(judge_name: str, system_prompt: str):
-    def judge_node(state: AgentState) -> dict:
-        evidences = state.get("evidences", {})
-        dimensions = state["rubric_dimensions"]
-        opinions: List[JudicialOpinion] = []
-
-        # Fresh structured LLM for this node invocation
-        structured_llm = llm.with_structured_output(JudicialOpinion)
-
-        for dim in dimensions:
-            dim_id = dim["id"]
-            relevant_evidence = evidences.get(dim_id, [])
-            evidence_str, evidence_ids = _format_evidence_with_ids(relevant_evidence)
-            found_ratio, avg_conf = _evidence_stats(relevant_evidence)
-
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", system_prompt),
-                (
-                    "human",
-                    "Rubric Dimension: {dimension}\n"
-                    "Evidence Summary: found_ratio={found_ratio:.2f}, avg_confidence={avg_conf:.2f}\n\n"
-                    "Evidence:\n{evidence}",
-                ),
-            ])
+JUDGE_HUMAN_PROMPT = (
+    "Rubric Dimension: {dimension}\n"
+    "Evidence Summary (detective findings): found_ratio={found_ratio:.2f}, avg_confidence={avg_conf:.2f}\n\n"
+    "Evidence:\n{evidence}"
+)
 
-            opinion = None
-            for attempt in range(1, MAX_RETRIES + 1):
-                try:
-                    chain = prompt | structured_llm
-                    opinion = chain.invoke(
-                        {
-                            "dimension": str(dim),
-                            "found_ratio": found_ratio,
-                            "avg_conf": avg_conf,
-                            "evidence": evidence_str,
-                        }
-                    )
-                    break
-                except Exception as e:
-                    print(f"DEBUG LLM ERROR [{judge_name}]: {e}")
-                    logger.warning(
-                        "Judge '%s' retry %s/%s failed for '%s': %s",
-                        judge_name,
-                        attempt,
-                        MAX_RETRIES,
-                        dim_id,
-                        e,
-                    )
-                    if attempt < MAX_RETRIES:
-                        time.sleep(1.0 * attempt)
 
-            if opinion is None:
-                fallback_arg = FALLBACK_MESSAGES.get(
-                    judge_name, f"Judicial analysis failed for '{dim_id}'."
-                )
-                opinions.append(
-                    JudicialOpinion(
-                        judge=judge_name,
-                        criterion_id=dim_id,
-                        score=1,
-                        argument=fallback_arg,
-                        cited_evidence=evidence_ids[:2],
-                    )
+def _fallback_opinion(judge_name: str, dim_id: str, evidence_ids: List[str], tier: str = "strong") -> JudicialOpinion:
+    return JudicialOpinion(
+        judge=judge_name,
+        criterion_id=dim_id,
+        score=1,
+        argument=FALLBACK_MESSAGES.get(judge_name, f"Judicial analysis failed for '{dim_id}'."),
+        cited_evidence=evidence_ids[:2],
+        source="fallback",
+        tier=tier,
+    )
+
+
+def _finalize_opinion(
+    judge_name: str,
+    dim_id: str,
+    opinion: JudicialOpinion,
+    found_ratio: float,
+    avg_conf: float,
+    evidence_ids: List[str],
+) -> JudicialOpinion:
+    """Stamps identity, applies persona calibration and guarantees citations."""
+    opinion.judge = judge_name
+    opinion.criterion_id = dim_id
+    opinion.score = _enforce_persona_score(judge_name, opinion.score, found_ratio, avg_conf)
+    opinion = _ensure_citations(opinion, evidence_ids)
+
+    if judge_name == "Prosecutor" and found_ratio < 0.5:
+        opinion.argument = (
+            opinion.argument
+            + " Evidence coverage is low; stricter scoring applied by prosecutor calibration."
+        )
+    if judge_name == "Defense" and found_ratio >= 0.7:
+        opinion.argument = (
+            opinion.argument
+            + " Strong evidence coverage supports a higher defense baseline."
+        )
+    return opinion
+
+
+# Evidence-decisive fast path (AUDIT_JUDGE_FAST_PATH=1): when evidence for a
+# dimension is entirely missing, or fully found with high confidence, the
+# persona clamps in _enforce_persona_score leave the LLM little to decide, so
+# a templated opinion is issued instead of a call.
+FAST_PATH_SCORES = {
+    "absent": {"Prosecutor": 1, "Defense": 2, "TechLead": 1},
+    "established": {"Prosecutor": 3, "Defense": 5, "TechLead": 4},
+}
+FAST_PATH_ARGUMENTS = {
+    "absent": {
+        "Prosecutor": "No artifact supporting '{name}' was found{cites}. An unproven claim is scored as absent.",
+        "Defense": "The evidence shows no implementation of '{name}' yet{cites}; intent alone cannot carry this dimension.",
+        "TechLead": "Nothing operational exists for '{name}'{cites}; there is nothing to run or maintain.",
+    },
+    "established": {
+        "Prosecutor": "Every evidence item for '{name}' was found with high confidence{cites}; residual risk is limited to what the evidence does not cover.",
+        "Defense": "All evidence for '{name}' is present and high-confidence{cites}; the implementation delivers its architectural intent.",
+        "TechLead": "'{name}' is fully evidenced with high confidence{cites}; it is viable to operate as shown.",
+    },
+}
+
+
+def _fast_path_enabled() -> bool:
+    return os.getenv("AUDIT_JUDGE_FAST_PATH", "0") == "1"
+
+
+def _decisive_evidence(relevant_evidence: List[Evidence]) -> Optional[str]:
+    """
+    Decides on detective findings only (routed report passages are context):
+    "absent" when none was found, "established" when at least
+    AUDIT_FAST_PATH_MIN_EVIDENCE (1; most dimensions get a single detective
+    item) were all found with confidence >= AUDIT_FAST_PATH_MIN_CONFIDENCE
+    (0.85); None when the LLM should judge.
+    """
+    findings = _findings(relevant_evidence)
+    if not any(e.found for e in findings):
+        return "absent"
+    min_items = int(os.getenv("AUDIT_FAST_PATH_MIN_EVIDENCE", "1"))
+    min_conf = float(os.getenv("AUDIT_FAST_PATH_MIN_CONFIDENCE", "0.85"))
+    if len(findings) >= min_items and all(e.found and e.confidence >= min_conf for e in findings):
+        return "established"
+    return None
+
+
+def _fast_path_opinion(judge_name: str, case: Dict) -> JudicialOpinion:
+    """Templated opinion for a decisive case, calibrated like an LLM opinion."""
+    verdict = case["decisive"]
+    cited = case["evidence_ids"][:3]
+    cites = " " + " ".join(f"[{eid}]" for eid in cited) if cited else " (no evidence collected)"
+    name = case["dim"].get("name", case["dim_id"])
+    opinion = JudicialOpinion(
+        judge=judge_name,
+        criterion_id=case["dim_id"],
+        score=FAST_PATH_SCORES[verdict][judge_name],
+        argument=FAST_PATH_ARGUMENTS[verdict][judge_name].format(name=name, cites=cites),
+        cited_evidence=cited,
+        source="fast-path",
+    )
+    return _finalize_opinion(
+        judge_name, case["dim_id"], opinion, case["found_ratio"], case["avg_conf"], case["evidence_ids"]
+    )
+
+
+PERSONA_BATCH_INSTRUCTIONS = """
+You will judge several rubric dimensions in one pass. Each dimension section
+lists its own evidence; evidence IDs like [E1] are local to their section.
+Return one JudicialOpinion per dimension, with criterion_id set to the
+dimension id shown in the section header.
+"""
+
+PANEL_PROMPT = """You are convening a three-judge panel in a Digital Courtroom.
+Write one independent JudicialOpinion for each judge below, staying strictly
+in that judge's persona and scoring policy; do not let the judges converge.
+
+=== Prosecutor ===
+{prosecutor}
+=== Defense ===
+{defense}
+=== TechLead ===
+{tech_lead}
+Return exactly three opinions, with judge set to Prosecutor, Defense and TechLead.
+"""
+
+BATCH_HUMAN_PROMPT = "{sections}"
+
+
+def judge_batch_mode() -> str:
+    mode = os.getenv("AUDIT_JUDGE_BATCH_MODE", "dimension").lower()
+    if mode not in JUDGE_BATCH_MODES:
+        raise ValueError(f"Unknown judge batch mode '{mode}'. Available: {', '.join(JUDGE_BATCH_MODES)}")
+    return mode
+
+
+def _model_name(model=None) -> str:
+    model = model or llm
+    name = getattr(model, "model_name", None) or getattr(model, "model", "")
+    return str(name).split("/")[-1]
+
+
+def _context_window(model=None) -> int:
+    """Input tokens the model (default: the strong judge model) accepts."""
+    override = os.getenv("AUDIT_JUDGE_CONTEXT_TOKENS")
+    if override:
+        return int(override)
+    return MODEL_CONTEXT_TOKENS.get(_model_name(model), 32_000)
+
+
+_judge_cache: Optional[ResponseCache] = None
+_judge_cache_lock = threading.Lock()
+
+
+def get_judge_cache() -> Optional[ResponseCache]:
+    """
+    Process-wide persistent cache of parsed judge responses, or None when
+    disabled with AUDIT_LLM_CACHE=0 (--no-llm-cache). Judges run at
+    temperature 0, so an identical prompt yields a reusable answer.
+    TTL and size come from AUDIT_LLM_CACHE_TTL (seconds) and
+    AUDIT_LLM_CACHE_MAX_ENTRIES.
+    """
+    global _judge_cache
+    if os.getenv("AUDIT_LLM_CACHE", "1") == "0":
+        return None
+    with _judge_cache_lock:
+        if _judge_cache is None:
+            _judge_cache = ResponseCache(
+                "judge",
+                ttl=float(os.getenv("AUDIT_LLM_CACHE_TTL", 30 * 24 * 3600)),
+                max_entries=int(os.getenv("AUDIT_LLM_CACHE_MAX_ENTRIES", "5000")),
+            )
+        return _judge_cache
+
+
+def set_judge_cache(cache: Optional[ResponseCache]) -> None:
+    """Plugs in a different cache backend (any object with get/put/summary)."""
+    global _judge_cache
+    with _judge_cache_lock:
+        _judge_cache = cache
+
+
+def _judge_cache_key(prompt: ChatPromptTemplate, inputs: Dict, schema, model_name: Optional[str] = None) -> str:
+    """Hash of (model, rendered system + human messages, output schema)."""
+    messages = [(m.type, m.content) for m in prompt.format_messages(**inputs)]
+    return fingerprint(model_name or _model_name(), messages, schema.model_json_schema())
+
+
+def _dimension_case(dim: Dict, evidences: Dict) -> Dict:
+    """Everything a judge needs to rule on one dimension."""
+    relevant_evidence = evidences.get(dim["id"], [])
+    evidence_str, evidence_ids, dropped = _format_evidence_with_ids(relevant_evidence)
+    if dropped:
+        logger.info(f"Evidence for '{dim['id']}' packed to budget: ~{dropped} token(s) dropped")
+        get_usage_ledger().record_evidence_packing(dim["id"], dropped)
+    found_ratio, avg_conf = _evidence_stats(relevant_evidence)
+    return {
+        "dim": dim,
+        "decisive": _decisive_evidence(relevant_evidence),
+        "dim_id": dim["id"],
+        "evidence": evidence_str,
+        "evidence_ids": evidence_ids,
+        "found_ratio": found_ratio,
+        "avg_conf": avg_conf,
+    }
+
+
+def _format_dimension(dim: Dict) -> str:
+    """Compact 'key: value' rendering of a rubric entry instead of its dict repr."""
+    return "\n".join(f"{key}: {value}" for key, value in dim.items() if value not in (None, "", [], {}))
+
+
+def _case_inputs(case: Dict) -> Dict:
+    return {
+        "dimension": _format_dimension(case["dim"]),
+        "found_ratio": case["found_ratio"],
+        "avg_conf": case["avg_conf"],
+        "evidence": case["evidence"],
+    }
+
+
+def _case_section(case: Dict) -> str:
+    return f"### Dimension {case['dim_id']}\n" + JUDGE_HUMAN_PROMPT.format(**_case_inputs(case))
+
+
+class _PanelCalls:
+    """
+    Shares one panel call per dimension between the three judge nodes, which
+    may run on different threads and event loops. The first judge to ask
+    makes the call; the others await the same future.
+    """
+
+    def __init__(self, panel_size: int = 3):
+        self.panel_size = panel_size
+        self._lock = threading.Lock()
+        self._calls: Dict[str, List] = {}  # key -> [future, judges still to collect]
+
+    def claim(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            entry = self._calls.get(key)
+            if entry is None:
+                entry = self._calls[key] = [Future(), self.panel_size]
+                owner = True
+            else:
+                owner = False
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._calls[key]
+            return entry[0], owner
+
+
+_panel_calls = _PanelCalls()
+
+
+def get_async_judge_node(judge_name: str, system_prompt: str):
+    """
+    Async judge node: every rubric dimension is judged concurrently with
+    ainvoke(), at most JUDGE_CONCURRENCY (AUDIT_JUDGE_CONCURRENCY) calls in
+    flight. Request pacing comes from the provider rate limiter on the model.
+
+    In "persona" and "panel" batch modes (AUDIT_JUDGE_BATCH_MODE) one call
+    returns a JudicialOpinionBatch; any opinion missing from a batch, or
+    every opinion of a failed batch, is retried as an individual call.
+    With AUDIT_JUDGE_FAST_PATH=1, dimensions with decisive evidence get a
+    templated opinion and no call at all.
+    """
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", JUDGE_HUMAN_PROMPT),
+    ])
+    persona_batch_prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt + PERSONA_BATCH_INSTRUCTIONS),
+        ("human", BATCH_HUMAN_PROMPT),
+    ])
+
+    async def _invoke_with_retries(
+        prompt_template: ChatPromptTemplate,
+        schema,
+        inputs: Dict,
+        label: str,
+        dimension: Optional[str] = None,
+        tier: str = "strong",
+        repair_judge: Optional[str] = judge_name,
+    ):
+        """
+        Structured call with timeouts, jittered backoff and per-provider
+        circuit breaking, failing over across configured providers. Parsed
+        responses of the primary model are served from and stored in the
+        judge cache. Every provider tried is recorded in the usage ledger.
+
+        A response that fails schema validation is first repaired locally
+        (see src.structured_repair), filling judge from repair_judge and
+        criterion_id from dimension; only an unrepairable one is re-asked.
+        Returns None when every provider failed.
+        """
+        ledger = get_usage_ledger()
+        providers = _judge_providers(tier)
+        primary_provider, primary_model = providers[0]
+        cache = get_judge_cache()
+        cache_key = _judge_cache_key(prompt_template, inputs, schema, _model_name(primary_model)) if cache else None
+        cached = cache.get(cache_key) if cache else None
+        if cached is not None:
+            ledger.record_cache_hit(judge_name, dimension, primary_provider, _model_name(primary_model), tier=tier)
+            return schema.model_validate(cached)
+
+        for position, (provider, model) in enumerate(providers):
+            chain = prompt_template | model.with_structured_output(schema, include_raw=True)
+            record = ledger.start(
+                judge_name,
+                dimension,
+                provider,
+                _model_name(model),
+                cache="miss" if cache and position == 0 else "off",
+                tier=tier,
+            )
+            config = {"callbacks": record.callbacks()}
+
+            async def _call(chain=chain, record=record):
+                output = await chain.ainvoke(inputs, config=config)
+                if output.get("parsed") is not None:
+                    return output["parsed"]
+                try:
+                    repaired = repair_structured(output["raw"], schema, judge=repair_judge, criterion_id=dimension)
+                except RepairFailed as e:
+                    raise RepairFailed(f"{e} (parser: {output.get('parsing_error')})") from output.get("parsing_error")
+                record.repairs += 1
+                logger.info(f"Judge '{judge_name}' repaired a malformed {schema.__name__} for '{label}' locally")
+                return repaired
+
+            try:
+                result = await acall_with_retries(
+                    _call,
+                    breaker=get_circuit_breaker(provider),
+                    label=f"Judge '{judge_name}' on '{label}' via {provider}",
+                    max_attempts=MAX_RETRIES,
+                    rate_limiter=_judge_rate_limiter(provider),
                 )
+            except (ProviderUnavailable, RetriesExhausted) as e:
+                record.finish("failed")
+                logger.warning(f"Judge '{judge_name}' could not use {provider} for '{label}': {e}")
                 continue
+            record.finish("ok")
+            if position > 0:
+                logger.info(f"Judge '{judge_name}' failed over to {provider} for '{label}'")
+            elif cache and result is not None:
+                cache.put(cache_key, result.model_dump())
+            return result
+        return None
+
+    async def _judge_dimension(case: Dict, semaphore: asyncio.Semaphore) -> JudicialOpinion:
+        async with semaphore:
+            opinion = await _invoke_with_retries(
+                prompt, JudicialOpinion, _case_inputs(case), case["dim_id"], dimension=case["dim_id"], tier=case["tier"]
+            )
+        return _resolve(case, opinion)
+
+    def _resolve(case: Dict, opinion: Optional[JudicialOpinion]) -> JudicialOpinion:
+        if opinion is None:
+            return _fallback_opinion(judge_name, case["dim_id"], case["evidence_ids"], tier=case["tier"])
+        opinion = _finalize_opinion(
+            judge_name, case["dim_id"], opinion, case["found_ratio"], case["avg_conf"], case["evidence_ids"]
+        )
+        opinion.tier = case["tier"]
+        return opinion
+
+    async def _judge_persona_batch(cases: List[Dict], semaphore: asyncio.Semaphore) -> List[JudicialOpinion]:
+        if len(cases) == 1:
+            return [await _judge_dimension(cases[0], semaphore)]
+
+        sections = "\n\n".join(_case_section(case) for case in cases)
+        async with semaphore:
+            batch = await _invoke_with_retries(
+                persona_batch_prompt,
+                JudicialOpinionBatch,
+                {"sections": sections},
+                f"{len(cases)} dimensions",
+                tier=cases[0]["tier"],
+            )
+
+        by_dimension = {o.criterion_id: o for o in batch.opinions} if batch else {}
+        missing = [case for case in cases if case["dim_id"] not in by_dimension]
+        if missing:
+            logger.warning(
+                f"Judge '{judge_name}' batch left {len(missing)} of {len(cases)} dimension(s) unanswered; "
+                f"judging them individually"
+            )
+        retried = await asyncio.gather(*(_judge_dimension(case, semaphore) for case in missing))
+        retried_by_dimension = {o.criterion_id: o for o in retried}
+        return [
+            retried_by_dimension.get(case["dim_id"]) or _resolve(case, by_dimension[case["dim_id"]])
+            for case in cases
+        ]
+
+    async def _judge_persona_mode(cases: List[Dict], semaphore: asyncio.Semaphore) -> List[JudicialOpinion]:
+        # Pack dimensions so each call stays within a share of the context
+        # window of every model the batch may go to on its tier, failover included
+        window = min(_context_window(model) for _, model in _judge_providers(cases[0]["tier"]))
+        budget = int(window * JUDGE_BATCH_CONTEXT_FRACTION) - estimate_tokens(system_prompt)
+        batches = pack_batches(
+            cases,
+            lambda case: estimate_tokens(_case_section(case)) + OPINION_OUTPUT_TOKENS,
+            max_count=len(cases),
+            max_size=max(1, budget),
+        )
+        logger.info(f"Judge '{judge_name}' packed {len(cases)} dimension(s) into {len(batches)} call(s)")
+        results = await asyncio.gather(*(_judge_persona_batch(batch, semaphore) for batch in batches))
+        return [opinion for batch in results for opinion in batch]
+
+    async def _judge_panel(case: Dict, semaphore: asyncio.Semaphore) -> JudicialOpinion:
+        key = fingerprint(
+            "panel", case["tier"], case["dim_id"], case["evidence"], case["found_ratio"], case["avg_conf"]
+        )
+        future, owner = _panel_calls.claim(key)
+        if owner:
+            panel_prompt = ChatPromptTemplate.from_messages([
+                ("system", PANEL_PROMPT.format(
+                    prosecutor=PROSECUTOR_PROMPT, defense=DEFENSE_PROMPT, tech_lead=TECH_LEAD_PROMPT
+                )),
+                ("human", JUDGE_HUMAN_PROMPT),
+            ])
+            batch = None
+            try:
+                async with semaphore:
+                    batch = await _invoke_with_retries(
+                        panel_prompt,
+                        JudicialOpinionBatch,
+                        _case_inputs(case),
+                        f"panel {case['dim_id']}",
+                        dimension=case["dim_id"],
+                        tier=case["tier"],
+                        repair_judge=None,
+                    )
+            finally:
+                # Always resolve, so the other judges fall back instead of waiting forever
+                future.set_result(batch)
+        batch = await asyncio.wrap_future(future)
+
+        opinion = next((o for o in batch.opinions if o.judge == judge_name), None) if batch else None
+        if opinion is None:
+            logger.warning(f"Panel call gave no {judge_name} opinion for '{case['dim_id']}'; judging individually")
+            return await _judge_dimension(case, semaphore)
+        return _resolve(case, opinion.model_copy())
+
+    async def ajudge_node(state: AgentState) -> dict:
+        evidences = state.get("evidences", {})
+        all_cases = [_dimension_case(dim, evidences) for dim in state["rubric_dimensions"]]
+        for case in all_cases:
+            case["tier"] = state.get("judge_tier", "strong")
+        semaphore = asyncio.Semaphore(max(1, JUDGE_CONCURRENCY))
+
+        fast = {}
+        if _fast_path_enabled():
+            fast = {c["dim_id"]: _fast_path_opinion(judge_name, c) for c in all_cases if c["decisive"]}
+            if fast:
+                logger.info(f"Judge '{judge_name}' fast-pathed {len(fast)} of {len(all_cases)} dimension(s)")
+        cases = [case for case in all_cases if case["dim_id"] not in fast]
+
+        mode = judge_batch_mode()
+        if not cases:
+            opinions = []
+        elif mode == "persona":
+            opinions = await _judge_persona_mode(cases, semaphore)
+        elif mode == "panel":
+            opinions = await asyncio.gather(*(_judge_panel(case, semaphore) for case in cases))
+        else:
+            opinions = await asyncio.gather(*(_judge_dimension(case, semaphore) for case in cases))
 
-            opinion.judge = judge_name
-            opinion.criterion_id = dim_id
-            opinion.score = _enforce_persona_score(judge_name, opinion.score, found_ratio, avg_conf)
-            opinion = _ensure_citations(opinion, evidence_ids)
+        by_dimension = {case["dim_id"]: opinion for case, opinion in zip(cases, opinions)}
+        return {"opinions": [fast.get(c["dim_id"]) or by_dimension[c["dim_id"]] for c in all_cases]}
 
-            if judge_name == "Prosecutor" and found_ratio < 0.5:
-                opinion.argument = (
-                    opinion.argument
-                    + " Evidence coverage is low; stricter scoring applied by prosecutor calibration."
-                )
-            if judge_name == "Defense" and found_ratio >= 0.7:
-                opinion.argument = (
-                    opinion.argument
-                    + " Strong evidence coverage supports a higher defense baseline."
-                )
+    return ajudge_node
 
-            opinions.append(opinion)
-            time.sleep(0.8)
 
-        return {"opinions": opinions}
+def get_judge_node(judge_name: str, system_prompt: str):
+    """Sync entry point for the async judge node (used by graph.stream() and tests)."""
+    ajudge_node = get_async_judge_node(judge_name, system_prompt)
+
+    def judge_node(state: AgentState) -> dict:
+        return asyncio.run(ajudge_node(state))
 
     return judge_node
 
@@ -238,15 +832,61 @@ def get_judge_node(judge_name: str, system_prompt: str):
 prosecutor_node = get_judge_node("Prosecutor", PROSECUTOR_PROMPT)
 defense_node = get_judge_node("Defense", DEFENSE_PROMPT)
 tech_lead_node = get_judge_node("TechLead", TECH_LEAD_PROMPT)
+aprosecutor_node = get_async_judge_node("Prosecutor", PROSECUTOR_PROMPT)
+adefense_node = get_async_judge_node("Defense", DEFENSE_PROMPT)
+atech_lead_node = get_async_judge_node("TechLead", TECH_LEAD_PROMPT)
+
+
+
+# Judge cascade (AUDIT_JUDGE_CASCADE=1): every persona first rules on the
+# cheap model; dimensions whose scores then disagree, or whose structured
+# output failed, are re-judged on the strong model.
+def cascade_enabled() -> bool:
+    return os.getenv("AUDIT_JUDGE_CASCADE", "0") == "1"
 
 
+def latest_opinions(opinions: List[JudicialOpinion]) -> List[JudicialOpinion]:
+    """
+    One opinion per (judge, dimension): escalated opinions are appended by
+    the reducer after the cheap ones they replace, so the last one wins.
+    """
+    latest: Dict[Tuple[str, str], JudicialOpinion] = {}
+    for opinion in opinions:
+        latest.pop((opinion.judge, opinion.criterion_id), None)
+        latest[(opinion.judge, opinion.criterion_id)] = opinion
+    return list(latest.values())
+
+
+def dimensions_to_escalate(opinions: List[JudicialOpinion], threshold: Optional[int] = None) -> List[str]:
+    """
+    Dimensions still ruled on the cheap tier whose scores spread by more
+    than threshold (AUDIT_CASCADE_VARIANCE, 2: Chief Justice's dissent rule)
+    or that have a fallback opinion. Fast-path dimensions never escalate.
+    """
+    threshold = threshold if threshold is not None else int(os.getenv("AUDIT_CASCADE_VARIANCE", "2"))
+    by_dimension: Dict[str, List[JudicialOpinion]] = {}
+    for opinion in latest_opinions(opinions):
+        by_dimension.setdefault(opinion.criterion_id, []).append(opinion)
+
+    escalate = []
+    for dim_id, dim_opinions in by_dimension.items():
+        cheap = [o for o in dim_opinions if o.tier == "cheap" and o.source != "fast-path"]
+        if not cheap:
+            continue
+        scores = [o.score for o in dim_opinions]
+        if any(o.source == "fallback" for o in cheap) or max(scores) - min(scores) > threshold:
+            escalate.append(dim_id)
+    return escalate
+
 
 def judicial_aggregator_node(state: AgentState) -> dict:
     """
-    Dedicated synchronization node for the judicial layer.
-    Ensures all judges have contributed before passing to Chief Justice.
+    Dedicated synchronization node for the judicial layer (the reduce step
+    of the per-(persona, dimension) judge tasks). Ensures all judges have
+    contributed before passing to Chief Justice. With the cascade on, it
+    also records which cheap-tier dimensions need escalation.
     """
-    opinions = state.get("opinions", [])
+    opinions = latest_opinions(state.get("opinions", []))
     dimensions = state["rubric_dimensions"]
     judge_names = ["Prosecutor", "Defense", "TechLead"]
 
@@ -263,4 +903,16 @@ def judicial_aggregator_node(state: AgentState) -> dict:
             if not found:
                 logger.warning("[JudicialAggregator] Missing opinion from %s for %s", jname, dim_id)
 
-    return {"opinions": opinions}
+    cheap_dimensions = {o.criterion_id for o in opinions if o.tier == "cheap" and o.source != "fast-path"}
+    if cheap_dimensions:
+        escalated = dimensions_to_escalate(opinions)
+        get_usage_ledger().record_cascade(cheap_dimensions, escalated)
+        logger.info(
+            "[JudicialAggregator] Cascade: escalating %s of %s cheap-tier dimension(s) to the strong model: %s",
+            len(escalated),
+            len(cheap_dimensions),
+            escalated,
+        )
+
+    # The add reducer has already merged every task's opinions; re-emitting them would duplicate
+    return {}
@@ -3,6 +3,7 @@ import re
 from collections import defaultdict
 from typing import Dict, List
 
+from src.nodes.judges import latest_opinions
 from src.state import AgentState, AuditReport, CriterionResult
 
 
@@ -30,6 +31,8 @@ def _extract_file_refs(text: str) -> List[str]:
 
 
 def _evidence_found_ratio(evidence_items: list) -> float:
+    # Routed report passages are context, not findings
+    evidence_items = [e for e in evidence_items if not e.context]
     if not evidence_items:
         return 0.0
     found = sum(1 for e in evidence_items if e.found)
@@ -172,7 +175,9 @@ def _build_final_remediation_plan(criterion_results: list) -> str:
 
 def chief_justice_node(state: AgentState) -> dict:
     """Synthesize judicial opinions into a deterministic final report."""
-    opinions = state["opinions"]
+    # Cascade escalations supersede the cheap-tier opinions they re-judged
+    opinions = latest_opinions(state["opinions"])
+    cascade_used = any(o.tier == "cheap" for o in state["opinions"])
     dimensions = state["rubric_dimensions"]
     evidences = state.get("evidences", {})
 
@@ -284,6 +289,19 @@ def chief_justice_node(state: AgentState) -> dict:
         f"- Overall Score: {report.overall_score:.2f} / 5.00",
         f"- Dimensions Evaluated: {len(criterion_results)}",
         f"- Dimensions Requiring Remediation: {len([c for c in criterion_results if c.final_score < 4])}",
+        f"- Opinions: {sum(o.source == 'llm' for o in opinions)} LLM-derived, "
+        f"{sum(o.source == 'fast-path' for o in opinions)} fast path (evidence-decisive, no LLM call), "
+        f"{sum(o.source == 'fallback' for o in opinions)} fallback",
+    ]
+    if cascade_used:
+        escalated = {o.criterion_id for o in opinions if o.tier == "strong" and o.source != "fast-path"}
+        # Dimensions that had no cheap-tier ruling (e.g. graph-level recovery) were never escalated
+        escalated &= {o.criterion_id for o in state.get("opinions", []) if o.tier == "cheap"}
+        md_lines.append(
+            f"- Judge Cascade: {len(escalated)} of {len(criterion_results)} dimension(s) escalated "
+            f"from the cheap to the strong model"
+        )
+    md_lines += [
         "",
         "---",
         "",
@@ -300,7 +318,13 @@ def chief_justice_node(state: AgentState) -> dict:
             md_lines.append("")
 
         for op in crit.judge_opinions:
-            md_lines.append(f"{op.judge} (Score: {op.score}/5): {op.argument}")
+            source = {"fast-path": "fast path", "fallback": "fallback"}.get(op.source, "LLM")
+            if cascade_used and op.source != "fast-path":
+                if op.tier == "strong" and op.criterion_id in escalated:
+                    source += ", escalated"
+                elif op.source == "llm":
+                    source += ", cheap model"
+            md_lines.append(f"{op.judge} (Score: {op.score}/5, {source}): {op.argument}")
             if op.cited_evidence:
                 md_lines.append(f"- Evidence cited: {', '.join(op.cited_evidence)}")
             md_lines.append("")
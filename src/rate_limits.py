@@ -0,0 +1,34 @@
+import os
+import threading
+from typing import Dict
+
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+# Requests per second allowed per provider, shared by every node in the process.
+# Override with AUDIT_RPS_<PROVIDER>, e.g. AUDIT_RPS_GEMINI=0.5
+DEFAULT_RPS = {
+    "gemini": 2.0,
+    "openai": 5.0,
+}
+
+_limiters: Dict[str, InMemoryRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> InMemoryRateLimiter:
+    """
+    Returns the process-wide token-bucket limiter for a provider.
+    Pass it as `rate_limiter=` to a LangChain chat model; both invoke() and
+    ainvoke() then wait for a token instead of sleeping a fixed interval.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rps = float(os.getenv(f"AUDIT_RPS_{provider.upper()}", DEFAULT_RPS.get(provider, 1.0)))
+            limiter = InMemoryRateLimiter(
+                requests_per_second=rps,
+                check_every_n_seconds=0.05,
+                max_bucket_size=max(1, int(rps)),
+            )
+            _limiters[provider] = limiter
+        return limiter
@@ -0,0 +1,240 @@
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: throttling, timeouts and server-side failures
+TRANSIENT_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+# Statuses that will not fix themselves: bad key, no access, unknown model
+FATAL_STATUSES = {401, 403, 404}
+TRANSIENT_NAME_HINTS = ("RateLimit", "Timeout", "Connection", "ServiceUnavailable", "ResourceExhausted", "InternalServer")
+
+
+class ProviderUnavailable(Exception):
+    """The provider cannot serve this call now (circuit open, fatal error or long throttle)."""
+
+
+class RetriesExhausted(Exception):
+    """Every attempt failed; the last error is chained as __cause__."""
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    "transient" for throttling, timeouts, connection and 5xx errors,
+    "fatal" for auth/permission/unknown-model errors, "output" for
+    everything else (typically a response that failed schema validation).
+    """
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return "transient"
+    status = status_code(exc)
+    if status in TRANSIENT_STATUSES:
+        return "transient"
+    if status in FATAL_STATUSES:
+        return "fatal"
+    if any(hint in type(exc).__name__ for hint in TRANSIENT_NAME_HINTS):
+        return "transient"
+    return "output"
+
+
+_RETRY_HINT = re.compile(r"retry(?:[ _-]?delay|[ -]after| in)[^0-9]{0,20}(\d+(?:\.\d+)?)\s*(ms)?", re.IGNORECASE)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    Server-requested wait, from a retry_after attribute, Retry-After /
+    retry-after-ms response headers, or a hint in the message such as
+    Gemini's "Please retry in 12.5s" / "retry_delay { seconds: 12 }".
+    """
+    for err in (exc, exc.__cause__):
+        if err is None:
+            continue
+        value = getattr(err, "retry_after", None)
+        if isinstance(value, (int, float)):
+            return float(value)
+        headers = getattr(getattr(err, "response", None), "headers", None)
+        if headers:
+            try:
+                if headers.get("retry-after-ms"):
+                    return float(headers["retry-after-ms"]) / 1000
+                if headers.get("retry-after"):
+                    return float(headers["retry-after"])
+            except (TypeError, ValueError):
+                pass  # HTTP-date form; fall back to backoff
+    match = _RETRY_HINT.search(str(exc))
+    if match:
+        seconds = float(match.group(1))
+        return seconds / 1000 if match.group(2) else seconds
+    return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Exponential backoff with full jitter: uniform(0, min(max, base * 2^(attempt-1))),
+    base/max from AUDIT_RETRY_BASE_DELAY (0.5s) and AUDIT_RETRY_MAX_DELAY (8s).
+    A server retry-after is honored as a floor.
+    """
+    base = float(os.getenv("AUDIT_RETRY_BASE_DELAY", "0.5"))
+    cap = float(os.getenv("AUDIT_RETRY_MAX_DELAY", "8"))
+    delay = random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, base))
+    return delay
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker shared by every node and thread.
+
+    Opens after failure_threshold consecutive provider failures
+    (AUDIT_BREAKER_FAILURES, 5); while open, calls are refused so callers
+    fail over immediately. After reset_timeout seconds (AUDIT_BREAKER_RESET,
+    30) one probe call is let through; its outcome closes or re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv("AUDIT_BREAKER_FAILURES", "5"))
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(
+            os.getenv("AUDIT_BREAKER_RESET", "30")
+        )
+        self.failures = 0
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                return True  # single probe
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self._open()
+
+    def abandon_probe(self) -> None:
+        """A call ended without an outcome (e.g. cancelled); a half-open probe re-opens the circuit."""
+        with self._lock:
+            if self.state == "half-open":
+                self._opened_at = time.monotonic()
+                self.state = "open"
+
+    def trip(self) -> None:
+        with self._lock:
+            self._open()
+
+    def _open(self) -> None:
+        if self.state != "open":
+            logger.warning(f"Circuit for '{self.name}' opened after {self.failures} failure(s)")
+        self.state = "open"
+        self._opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker for a provider."""
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(provider)
+        return breaker
+
+
+def reset_circuit_breakers() -> None:
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def attempt_timeout() -> float:
+    """Seconds one LLM attempt may take (AUDIT_LLM_TIMEOUT, 60)."""
+    return float(os.getenv("AUDIT_LLM_TIMEOUT", "60"))
+
+
+async def acall_with_retries(
+    call: Callable[[], Awaitable[T]],
+    breaker: CircuitBreaker,
+    label: str,
+    max_attempts: int = 3,
+    timeout: Optional[float] = None,
+    rate_limiter=None,
+) -> T:
+    """
+    Awaits call() with a per-attempt timeout (AUDIT_LLM_TIMEOUT, 60s),
+    retrying with jittered exponential backoff that honors retry-after.
+    A rate_limiter (e.g. get_rate_limiter(provider)) is acquired before each
+    attempt, outside the timeout, so queueing behind a throttled but healthy
+    provider never counts as a provider failure.
+
+    Transient and fatal errors count against the provider's breaker. Raises
+    ProviderUnavailable when the breaker opens, the error is fatal or the
+    server asks to wait longer than AUDIT_RETRY_AFTER_MAX (30s), so the
+    caller can fail over; RetriesExhausted when attempts run out.
+    """
+    timeout = timeout or attempt_timeout()
+    max_wait = float(os.getenv("AUDIT_RETRY_AFTER_MAX", "30"))
+    last_error: Optional[BaseException] = None
+
+    for attempt in range(1, max_attempts + 1):
+        if not breaker.allow():
+            raise ProviderUnavailable(f"circuit for '{breaker.name}' is open") from last_error
+        try:
+            if rate_limiter is not None:
+                await rate_limiter.aacquire()
+            result = await asyncio.wait_for(call(), timeout=timeout)
+        except Exception as e:
+            last_error = e
+            kind = classify_error(e)
+            logger.warning(f"{label}: attempt {attempt}/{max_attempts} failed ({kind}): {e}")
+            if kind == "fatal":
+                breaker.trip()
+                raise ProviderUnavailable(f"'{breaker.name}' rejected the call: {e}") from e
+            retry_after = None
+            if kind == "output":
+                breaker.record_success()  # the provider answered, just not usefully
+            else:
+                breaker.record_failure()
+                retry_after = retry_after_seconds(e)
+                if retry_after is not None and retry_after > max_wait:
+                    raise ProviderUnavailable(f"'{breaker.name}' asked to wait {retry_after:.0f}s") from e
+            if attempt < max_attempts:
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+            continue
+        except BaseException:
+            # Cancelled mid-call: don't leave a half-open breaker waiting on a probe that never reports
+            breaker.abandon_probe()
+            raise
+        breaker.record_success()
+        return result
+
+    raise RetriesExhausted(f"{label}: {max_attempts} attempt(s) failed") from last_error
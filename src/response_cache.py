@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".audit_cache"
+
+
+def fingerprint(*parts: Any) -> str:
+    """SHA-256 over the JSON encoding of the given key parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent SQLite cache for LLM responses.
+
+    Values are JSON-serializable payloads stored under a namespace
+    (e.g. "vision", "judge") and a caller-computed key. Entries expire after
+    ttl seconds; when a namespace grows past max_entries the least recently
+    used entries are evicted. hits/misses count lookups on this instance.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        path: Optional[str] = None,
+        ttl: float = 30 * 24 * 3600,
+        max_entries: int = 5000,
+    ):
+        self.namespace = namespace
+        self.path = path or os.path.join(
+            os.getenv("AUDIT_CACHE_DIR", DEFAULT_CACHE_DIR), "responses.sqlite"
+        )
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection per operation, so any thread or event loop can use the cache."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None when absent or expired."""
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM responses WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl:
+                    conn.execute(
+                        "DELETE FROM responses WHERE namespace = ? AND key = ?", (self.namespace, key)
+                    )
+                    row = None
+                if row is not None:
+                    conn.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                        (now, self.namespace, key),
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"ResponseCache[{self.namespace}] lookup failed: {e}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), now, now),
+                )
+                conn.execute(
+                    "DELETE FROM responses WHERE namespace = ? AND key IN ("
+                    " SELECT key FROM responses WHERE namespace = ?"
+                    " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_entries),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"ResponseCache[{self.namespace}] failed to store entry: {e}")
+
+    def summary(self) -> str:
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
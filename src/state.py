@@ -1,6 +1,7 @@
 import operator
 from typing import Annotated, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from typing_extensions import TypedDict
 
 
@@ -14,6 +15,25 @@ class Evidence(BaseModel):
         description="Your rationale for your confidence on the evidence you find for this particular goal"
     )
     confidence: float = Field(ge=0.0, le=1.0, description="Confidence score for the evidence")
+    # Supporting material (routed report passages) shown to the judges but
+    # left out of found_ratio/avg_conf, which only count detective findings
+    context: bool = False
+
+
+# --- Vision Output ---
+class DiagramClassification(BaseModel):
+    image_index: int = Field(description="1-based position of the image in the request")
+    diagram_type: Literal["Flow Diagram", "Sequence Diagram", "State Machine", "Component Diagram", "Other"]
+    fan_out_fan_in: bool = Field(description="Whether the diagram shows fan-out/fan-in parallelism")
+    components: List[str] = Field(default_factory=list, description="Key components visible in the diagram")
+    data_flow: str = Field(description="Direction of data flow through the diagram")
+    summary: str = Field(description="Concise 2-3 sentence description of the diagram")
+
+
+class DiagramBatch(BaseModel):
+    classifications: List[DiagramClassification] = Field(
+        description="Exactly one classification per image, in request order"
+    )
 
 
 # --- Judge Output ---
@@ -23,6 +43,16 @@ class JudicialOpinion(BaseModel):
     score: int = Field(ge=1, le=5)
     argument: str
     cited_evidence: List[str] = Field(default_factory=list, description="List of evidence IDs or keys cited")
+    # How and on which cascade tier the opinion was reached; kept out of the
+    # schema the LLM is asked to fill
+    source: SkipJsonSchema[Literal["llm", "fast-path", "fallback"]] = "llm"
+    tier: SkipJsonSchema[Literal["cheap", "strong"]] = "strong"
+
+
+class JudicialOpinionBatch(BaseModel):
+    opinions: List[JudicialOpinion] = Field(
+        description="One opinion per requested (judge, criterion_id) pair"
+    )
 
 
 # --- Chief Justice Output ---
@@ -60,3 +90,10 @@ class AgentState(TypedDict):
     evidences: Annotated[Dict[str, List[Evidence]], operator.ior]
     opinions: Annotated[List[JudicialOpinion], operator.add]
     final_report: Optional[AuditReport]
+
+
+class JudgeTask(TypedDict, total=False):
+    """Input of one judicial Send task: the dimension(s) to rule on and only their evidence."""
+    rubric_dimensions: List[Dict]
+    evidences: Dict[str, List[Evidence]]
+    judge_tier: Literal["cheap", "strong"]  # cascade tier; "strong" when absent
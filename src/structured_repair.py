@@ -0,0 +1,170 @@
+import re
+import json
+import logging
+from typing import Any, List, Optional, Type
+
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel, ValidationError
+
+from src.state import JudicialOpinion, JudicialOpinionBatch
+
+logger = logging.getLogger(__name__)
+
+# Normalized (lowercase, letters only) spellings of the judge literal
+JUDGE_ALIASES = {
+    "prosecutor": "Prosecutor",
+    "defense": "Defense",
+    "defence": "Defense",
+    "defenseattorney": "Defense",
+    "techlead": "TechLead",
+    "technicallead": "TechLead",
+}
+# Keys models use instead of "argument"
+ARGUMENT_ALIASES = ("argument", "reasoning", "rationale", "explanation", "justification")
+SCORE_RANGE = (1, 5)
+
+
+class RepairFailed(ValueError):
+    """The raw response could not be turned into the schema; the model should be asked again."""
+
+
+def extract_json(text: str) -> Any:
+    """
+    First JSON object or array in text, tolerating markdown fences and prose
+    before or after it. Raises RepairFailed when there is none.
+    """
+    text = re.sub(r"```(?:json)?", "", text)
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"[\[{]", text):
+        try:
+            value, _ = decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, (dict, list)):
+            return value
+    raise RepairFailed("no JSON object in response")
+
+
+def _raw_payloads(raw: AIMessage) -> List[Any]:
+    """Candidate payloads of a raw response: tool call args, then message text."""
+    payloads: List[Any] = [call["args"] for call in getattr(raw, "tool_calls", None) or []]
+    payloads += [call.get("args") for call in getattr(raw, "invalid_tool_calls", None) or [] if call.get("args")]
+    content = raw.content
+    if isinstance(content, list):
+        content = "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    if content:
+        payloads.append(content)
+    return payloads
+
+
+def _coerce_score(value: Any) -> int:
+    if isinstance(value, bool):
+        raise RepairFailed(f"score {value!r} is not a number")
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        match = re.search(r"-?\d+(?:\.\d+)?", str(value))
+        if not match:
+            raise RepairFailed(f"score {value!r} is not a number")
+        number = float(match.group(0))
+    low, high = SCORE_RANGE
+    return max(low, min(high, int(round(number))))
+
+
+def _coerce_judge(value: Any, default: Optional[str]) -> str:
+    judge = JUDGE_ALIASES.get(re.sub(r"[^a-z]", "", str(value or "").lower()))
+    if judge is None:
+        judge = default
+    if judge is None:
+        raise RepairFailed(f"unknown judge {value!r}")
+    return judge
+
+
+def _coerce_citations(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return re.findall(r"E\d+", value) or [value]
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def repair_opinion(
+    data: Any, judge: Optional[str] = None, criterion_id: Optional[str] = None
+) -> JudicialOpinion:
+    """
+    JudicialOpinion from an almost-valid dict: the score is coerced to an
+    int and clamped to 1-5, the judge literal is normalized, and judge or
+    criterion_id are taken from the call context when missing or invalid.
+    """
+    if isinstance(data, dict) and len(data) == 1 and isinstance(next(iter(data.values())), dict):
+        data = next(iter(data.values()))  # {"JudicialOpinion": {...}}
+    if not isinstance(data, dict):
+        raise RepairFailed(f"expected an object, got {type(data).__name__}")
+
+    argument = next((data[key] for key in ARGUMENT_ALIASES if data.get(key)), None)
+    if isinstance(argument, list):
+        argument = " ".join(str(part) for part in argument)
+    if not argument:
+        raise RepairFailed("opinion has no argument")
+    if "score" not in data:
+        raise RepairFailed("opinion has no score")
+
+    values = {
+        "judge": _coerce_judge(data.get("judge"), judge),
+        "criterion_id": str(data.get("criterion_id") or criterion_id or ""),
+        "score": _coerce_score(data["score"]),
+        "argument": str(argument),
+        "cited_evidence": _coerce_citations(data.get("cited_evidence")),
+    }
+    if not values["criterion_id"]:
+        raise RepairFailed("opinion has no criterion_id")
+    try:
+        return JudicialOpinion.model_validate(values)
+    except ValidationError as e:
+        raise RepairFailed(str(e)) from e
+
+
+def repair_opinion_batch(
+    data: Any, judge: Optional[str] = None, criterion_id: Optional[str] = None
+) -> JudicialOpinionBatch:
+    """Repairs every opinion of a batch, dropping the ones beyond repair; the judges retry those individually."""
+    items = data.get("opinions") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise RepairFailed("batch has no opinions list")
+    opinions = []
+    for item in items:
+        try:
+            opinions.append(repair_opinion(item, judge=judge, criterion_id=criterion_id))
+        except RepairFailed as e:
+            logger.debug(f"Dropping unrepairable batch opinion: {e}")
+    if not opinions:
+        raise RepairFailed("no opinion in the batch could be repaired")
+    return JudicialOpinionBatch(opinions=opinions)
+
+
+def repair_structured(
+    raw: AIMessage,
+    schema: Type[BaseModel],
+    judge: Optional[str] = None,
+    criterion_id: Optional[str] = None,
+) -> BaseModel:
+    """
+    Rebuilds schema from a raw response that failed structured parsing.
+    Judge schemas get field repair; other schemas only JSON extraction.
+    Raises RepairFailed when no payload can be repaired.
+    """
+    errors = []
+    for payload in _raw_payloads(raw):
+        try:
+            data = extract_json(payload) if isinstance(payload, str) else payload
+            if schema is JudicialOpinion:
+                return repair_opinion(data, judge=judge, criterion_id=criterion_id)
+            if schema is JudicialOpinionBatch:
+                return repair_opinion_batch(data, judge=judge, criterion_id=criterion_id)
+            return schema.model_validate(data)
+        except (RepairFailed, ValidationError) as e:
+            errors.append(str(e).splitlines()[0])
+    raise RepairFailed("; ".join(errors) or "empty response")
+
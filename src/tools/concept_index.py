@@ -0,0 +1,116 @@
+import re
+import math
+from collections import defaultdict
+from typing import Dict, List, Set
+
+# "Dialec-\ntical" -> "Dialectical": undo hyphenation at PDF line wraps
+_HYPHEN_WRAP = re.compile(r"(\w)-[ \t]*\r?\n[ \t]*(\w)")
+# "Fan-In / Fan-Out", "fan_out" -> space-separated tokens
+_SEPARATORS = re.compile(r"[\-/_–—]+")
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and flattens hyphens, slashes, punctuation and line wraps to single spaces."""
+    text = _HYPHEN_WRAP.sub(r"\1\2", text)
+    text = _SEPARATORS.sub(" ", text)
+    text = _NON_WORD.sub(" ", text)
+    return " ".join(text.lower().split())
+
+
+def _token_grams(token: str, n: int) -> Set[str]:
+    padded = f" {token} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def _dice(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class ConceptIndex:
+    """
+    Character n-gram inverted index over document chunks for approximate
+    phrase matching.
+
+    Grams are computed per token (padded with spaces), so a phrase matches
+    regardless of token order or separator style: "Fan-In / Fan-Out",
+    "fan-out/fan-in" and "fan out" all share the same grams. A query only
+    touches the posting lists of its own grams to pick candidate chunks;
+    the windowed Dice score is computed for those candidates alone.
+    """
+
+    def __init__(self, chunks: List[Dict], n: int = 3):
+        self.n = n
+        self._chunk_tokens: List[List[str]] = []
+        self._chunk_token_grams: List[List[Set[str]]] = []
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+
+        for chunk_id, chunk in enumerate(chunks):
+            tokens = normalize_text(chunk["content"]).split()
+            token_grams = [_token_grams(t, n) for t in tokens]
+            self._chunk_tokens.append(tokens)
+            self._chunk_token_grams.append(token_grams)
+            for grams in token_grams:
+                for gram in grams:
+                    self._postings[gram].add(chunk_id)
+
+    def __len__(self) -> int:
+        return len(self._chunk_tokens)
+
+    def _candidates(self, query_grams: Set[str], min_score: float) -> Dict[int, int]:
+        """Chunks sharing enough distinct grams with the query to possibly reach min_score."""
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for chunk_id in self._postings.get(gram, ()):
+                shared[chunk_id] += 1
+        # Dice = 2s / (|q| + |w|) and |w| >= s, so reaching min_score needs s >= t|q| / (2 - t)
+        required = math.ceil(min_score * len(query_grams) / (2 - min_score))
+        return {cid: s for cid, s in shared.items() if s >= required}
+
+    def search(self, phrase: str, top_k: int = 3, min_score: float = 0.7) -> List[Dict]:
+        """
+        Returns up to top_k matches as
+        {"chunk_id": int, "score": float, "match": str, "hits": int},
+        sorted by best window score then number of matching windows.
+        """
+        query_tokens = normalize_text(phrase).split()
+        if not query_tokens:
+            return []
+        query_grams: Set[str] = set().union(*(_token_grams(t, self.n) for t in query_tokens))
+        width = len(query_tokens)
+
+        results = []
+        for chunk_id in self._candidates(query_grams, min_score):
+            tokens = self._chunk_tokens[chunk_id]
+            token_grams = self._chunk_token_grams[chunk_id]
+            best_score, best_match, hits = 0.0, "", 0
+            next_free = 0
+
+            for start in range(len(tokens)):
+                start_best = 0.0
+                for size in range(max(1, width - 1), width + 2):
+                    end = start + size
+                    if end > len(tokens):
+                        break
+                    score = _dice(query_grams, set().union(*token_grams[start:end]))
+                    if score > start_best:
+                        start_best = score
+                    if score > best_score:
+                        best_score, best_match = score, " ".join(tokens[start:end])
+                # Count non-overlapping occurrences
+                if start_best >= min_score and start >= next_free:
+                    hits += 1
+                    next_free = start + width
+
+            if best_score >= min_score:
+                results.append({
+                    "chunk_id": chunk_id,
+                    "score": round(best_score, 3),
+                    "match": best_match,
+                    "hits": hits,
+                })
+
+        results.sort(key=lambda r: (r["score"], r["hits"]), reverse=True)
+        return results[:top_k]
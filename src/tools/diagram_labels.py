@@ -0,0 +1,179 @@
+import re
+import logging
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Rect = Tuple[float, float, float, float]
+
+# Node names of the reference swarm architecture, grouped by the role they
+# play in its topology. Parallel roles fan out; aggregator roles fan back in.
+# Used when the rubric does not name the nodes (see vocabulary_from_rubric).
+PARALLEL_ROLES = {
+    "detective": ("RepoInvestigator", "DocAnalyst", "VisionInspector"),
+    "judge": ("Prosecutor", "Defense", "TechLead"),
+}
+AGGREGATOR_NODES = ("EvidenceAggregator", "JudicialAggregator", "ChiefJustice")
+
+
+def _normalize(name: str) -> str:
+    """'Repo Investigator', 'repo_investigator' and 'RepoInvestigator' all map to 'repoinvestigator'."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+@dataclass(frozen=True)
+class NodeVocabulary:
+    """
+    The node names label-based detection can recognize. Only exact names
+    (modulo case, spaces and underscores) match: a diagram that draws the
+    same architecture under other names, or abbreviates them, is left to
+    the vision model.
+    """
+
+    parallel_roles: Dict[str, Tuple[str, ...]]
+    aggregators: Tuple[str, ...]
+
+    @cached_property
+    def lookup(self) -> Dict[str, Tuple[str, str]]:
+        """normalized name -> (role, node)"""
+        table = {_normalize(node): (role, node) for role, nodes in self.parallel_roles.items() for node in nodes}
+        table.update({_normalize(node): ("aggregator", node) for node in self.aggregators})
+        return table
+
+
+DEFAULT_VOCABULARY = NodeVocabulary(PARALLEL_ROLES, AGGREGATOR_NODES)
+
+# "Detectives (RepoInvestigator, DocAnalyst, VisionInspector)"
+_ROLE_GROUP = re.compile(r"\b([A-Z]?[a-z]+?)s?\s*\(\s*([A-Z]\w*(?:\s*,\s*[A-Z]\w*)+)\s*\)")
+# "... -> [Detectives in parallel] -> EvidenceAggregator -> ...": the node after a parallel group fans in
+_FAN_IN_STEP = re.compile(r"\]\s*(?:->|→)\s*([A-Z][A-Za-z0-9_]+)\b")
+
+
+def vocabulary_from_rubric(dimensions: Iterable[Dict]) -> Optional[NodeVocabulary]:
+    """
+    Node names as the rubric states them: parallel roles from "Role (A, B,
+    C)" groups, aggregators from the node that follows a "[...]" parallel
+    step in a "X -> [...] -> Y" flow. Failure patterns are ignored since
+    they describe architectures the audit rejects. None when the rubric
+    names no parallel group, so callers fall back to DEFAULT_VOCABULARY.
+    """
+    text = " ".join(
+        str(dim.get(field, "")) for dim in dimensions for field in ("forensic_instruction", "success_pattern")
+    )
+    roles: Dict[str, Tuple[str, ...]] = {}
+    for role, names in _ROLE_GROUP.findall(text):
+        roles.setdefault(role.lower(), tuple(n.strip() for n in names.split(",")))
+    if not roles:
+        return None
+    parallel = {_normalize(n) for nodes in roles.values() for n in nodes}
+    aggregators = tuple(dict.fromkeys(
+        step for step in _FAN_IN_STEP.findall(text) if step != "END" and _normalize(step) not in parallel
+    ))
+    return NodeVocabulary(roles, aggregators or AGGREGATOR_NODES)
+
+
+def _center(bbox: Rect) -> Tuple[float, float]:
+    return (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+
+
+def labels_in_region(
+    spans: Sequence[Dict],
+    rects: Sequence[Rect],
+    margin: float = 4.0,
+    vocabulary: Optional[NodeVocabulary] = None,
+) -> List[Dict]:
+    """
+    Known node names (vocabulary, default DEFAULT_VOCABULARY) whose
+    text-layer span is centred inside one of rects. Labels broken across
+    two consecutive spans ("Repo" / "Investigator") are joined. Returns
+    [{"node", "role", "center"}], one per node.
+    """
+    lookup = (vocabulary or DEFAULT_VOCABULARY).lookup
+    inside = []
+    for span in spans:
+        cx, cy = _center(span["bbox"])
+        if any(r[0] - margin <= cx <= r[2] + margin and r[1] - margin <= cy <= r[3] + margin for r in rects):
+            inside.append(span)
+
+    found: Dict[str, Dict] = {}
+    for i, span in enumerate(inside):
+        candidates = [(span["text"], span["bbox"])]
+        if i + 1 < len(inside):
+            nxt = inside[i + 1]
+            joined = (
+                min(span["bbox"][0], nxt["bbox"][0]), min(span["bbox"][1], nxt["bbox"][1]),
+                max(span["bbox"][2], nxt["bbox"][2]), max(span["bbox"][3], nxt["bbox"][3]),
+            )
+            candidates.append((span["text"] + nxt["text"], joined))
+        for text, bbox in candidates:
+            match = lookup.get(_normalize(text))
+            if match and match[1] not in found:
+                found[match[1]] = {"node": match[1], "role": match[0], "center": _center(bbox)}
+    return list(found.values())
+
+
+def infer_fan_out_fan_in(labels: List[Dict]) -> Optional[Dict]:
+    """
+    Decides from label positions alone whether a diagram shows fan-out/fan-in.
+
+    Conclusive when at least two nodes of one parallel role sit side by side
+    (one row or one column) and an aggregator sits beyond that layer along
+    the perpendicular axis. Returns {"role", "nodes", "aggregator",
+    "direction"}, or None when the labels do not settle the question.
+    """
+    aggregators = [label for label in labels if label["role"] == "aggregator"]
+    for role in dict.fromkeys(label["role"] for label in labels if label["role"] != "aggregator"):
+        layer = [label for label in labels if label["role"] == role]
+        if len(layer) < 2 or not aggregators:
+            continue
+        xs = [label["center"][0] for label in layer]
+        ys = [label["center"][1] for label in layer]
+        x_spread, y_spread = max(xs) - min(xs), max(ys) - min(ys)
+
+        if x_spread > 2 * y_spread:
+            # One row: the aggregator must be above or below the whole row
+            axis, layer_lo, layer_hi = 1, min(ys), max(ys)
+            forward, backward = "top to bottom", "bottom to top"
+        elif y_spread > 2 * x_spread:
+            axis, layer_lo, layer_hi = 0, min(xs), max(xs)
+            forward, backward = "left to right", "right to left"
+        else:
+            continue
+
+        for aggregator in aggregators:
+            position = aggregator["center"][axis]
+            if position > layer_hi or position < layer_lo:
+                return {
+                    "role": role,
+                    "nodes": [label["node"] for label in layer],
+                    "aggregator": aggregator["node"],
+                    "direction": forward if position > layer_hi else backward,
+                }
+    return None
+
+
+def analyze_from_labels(
+    image, spans: Sequence[Dict], vocabulary: Optional[NodeVocabulary] = None
+) -> Optional[str]:
+    """
+    Text-layer analysis of an ImageRecord's placement on its page, in the
+    same shape as a vision analysis, or None when the labels are inconclusive
+    and the multimodal LLM should decide. Only names in vocabulary (e.g.
+    vocabulary_from_rubric) are recognized.
+    """
+    if not image.rects or not spans:
+        return None
+    labels = labels_in_region(spans, image.rects, vocabulary=vocabulary)
+    topology = infer_fan_out_fan_in(labels)
+    if topology is None:
+        return None
+
+    components = ", ".join(label["node"] for label in labels)
+    return (
+        f"Flow Diagram (inferred from text-layer labels). Fan-out/fan-in parallelism: yes. "
+        f"Components: {components}. Data flow: {topology['direction']}. "
+        f"{len(topology['nodes'])} {topology['role']} node(s) ({', '.join(topology['nodes'])}) "
+        f"run side by side and converge on {topology['aggregator']}."
+    )
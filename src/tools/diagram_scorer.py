@@ -0,0 +1,160 @@
+import os
+import re
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words that, near an image, suggest it is a figure worth a vision call
+CAPTION_PATTERN = re.compile(
+    r"\b(fig(ure)?\.?|diagram|architecture|flow|graph|pipeline|topology|workflow|sequence)\b",
+    re.IGNORECASE,
+)
+
+Rect = Tuple[float, float, float, float]
+
+
+def image_features(data: bytes, sample_dim: int = 256) -> Dict[str, float]:
+    """
+    Cheap image statistics computed on a <= sample_dim thumbnail:
+    - colors: distinct colors after quantizing to 4 bits per channel
+    - edge_density: fraction of pixels with a strong luminance gradient
+    - whitespace: fraction of pixels matching the dominant (background) color
+    - aspect: long side / short side
+    - min_side: shorter side of the original image in pixels
+    """
+    pix = fitz.Pixmap(data)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.colorspace is None or pix.colorspace.n != 3:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    width, height = pix.width, pix.height
+    longest = max(width, height)
+    if longest > sample_dim:
+        scale = sample_dim / longest
+        pix = fitz.Pixmap(pix, max(1, round(width * scale)), max(1, round(height * scale)), None)
+
+    samples = np.frombuffer(pix.samples, dtype=np.uint8)
+    rgb = samples.reshape(pix.height, pix.stride)[:, : pix.width * 3].reshape(pix.height, pix.width, 3)
+
+    quantized = (rgb >> 4).astype(np.int32)
+    codes = (quantized[..., 0] << 8) | (quantized[..., 1] << 4) | quantized[..., 2]
+    counts = np.bincount(codes.ravel(), minlength=4096)
+
+    gray = rgb.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    edges = np.zeros(gray.shape, dtype=bool)
+    edges[:, 1:] |= np.abs(np.diff(gray, axis=1)) > 48
+    edges[1:, :] |= np.abs(np.diff(gray, axis=0)) > 48
+
+    return {
+        "colors": float(np.count_nonzero(counts)),
+        "edge_density": float(edges.mean()),
+        "whitespace": float(counts.max() / codes.size),
+        "aspect": longest / max(1, min(width, height)),
+        "min_side": float(min(width, height)),
+    }
+
+
+def caption_proximity(rects: Iterable[Rect], spans: Sequence[Dict], max_distance: float = 72.0) -> float:
+    """
+    1.0 when a caption-like word ("Figure", "Architecture", ...) sits within
+    max_distance points of one of the image's placements, decaying linearly to
+    0.0 at that distance; 0.5 for a match anywhere else on the page.
+    """
+    keyword_spans = [s for s in spans if CAPTION_PATTERN.search(s["text"])]
+    if not keyword_spans:
+        return 0.0
+
+    best = 0.5
+    for rect in rects:
+        x0, y0, x1, y1 = rect
+        for span in keyword_spans:
+            sx0, sy0, sx1, sy1 = span["bbox"]
+            dx = max(x0 - sx1, sx0 - x1, 0.0)
+            dy = max(y0 - sy1, sy0 - y1, 0.0)
+            distance = (dx * dx + dy * dy) ** 0.5
+            if distance < max_distance:
+                best = max(best, 1.0 - distance / max_distance)
+    return best
+
+
+def diagram_likelihood(features: Dict[str, float], proximity: float = 0.0) -> float:
+    """
+    Heuristic 0..1 score that an image is a diagram rather than a photo,
+    code screenshot, icon or decorative banner. Diagrams tend to have few
+    flat colors, a large uniform background and sparse sharp edges; photos
+    have thousands of colors, code screenshots dense text edges.
+    """
+    colors = features["colors"]
+    color_score = 1.0 if colors <= 32 else max(0.0, 1.0 - np.log2(colors / 32) / 5)
+
+    edges = features["edge_density"]
+    if edges < 0.005:
+        edge_score = 0.2  # blank or near-solid fill
+    elif edges <= 0.08:
+        edge_score = 1.0
+    else:
+        edge_score = max(0.0, 1.0 - (edges - 0.08) / 0.12)  # dense text
+
+    whitespace = features["whitespace"]
+    whitespace_score = min(1.0, whitespace / 0.6) if whitespace < 0.97 else 0.3
+
+    aspect = features["aspect"]
+    aspect_score = 1.0 if aspect <= 3.0 else max(0.0, 1.0 - (aspect - 3.0) / 3.0)
+
+    score = (
+        0.25 * color_score
+        + 0.3 * edge_score
+        + 0.2 * whitespace_score
+        + 0.1 * aspect_score
+        + 0.15 * proximity
+    )
+    if features["min_side"] < 48:
+        score *= 0.5  # icons, bullets and rules
+    return round(float(score), 3)
+
+
+def vision_top_k() -> int:
+    """Cap on images sent for vision analysis per audit (AUDIT_VISION_TOP_K, 0 = unlimited)."""
+    return int(os.getenv("AUDIT_VISION_TOP_K", "0"))
+
+
+def rank_diagram_candidates(
+    images: List,
+    spans_by_page: Optional[Dict[int, Sequence[Dict]]] = None,
+    threshold: Optional[float] = None,
+    top_k: Optional[int] = None,
+) -> Tuple[List, Dict[int, float]]:
+    """
+    Scores each image (ImageRecord-like: data, page, rects) and picks the
+    ones worth a vision call: score >= threshold (default
+    AUDIT_DIAGRAM_THRESHOLD, 0.6), at most top_k of them (default
+    AUDIT_VISION_TOP_K, 0 = unlimited), best first.
+    Returns (selected images, {id(image): score}). Images that cannot be
+    decoded score exactly the threshold, so they are kept but ranked last.
+    """
+    if threshold is None:
+        threshold = float(os.getenv("AUDIT_DIAGRAM_THRESHOLD", "0.6"))
+    if top_k is None:
+        top_k = vision_top_k()
+    spans_by_page = spans_by_page or {}
+
+    scores: Dict[int, float] = {}
+    for image in images:
+        try:
+            features = image_features(image.data)
+        except Exception as e:
+            logger.warning(f"Could not score image {image.name}: {e}")
+            scores[id(image)] = threshold
+            continue
+        proximity = caption_proximity(image.rects, spans_by_page.get(image.page, ()))
+        scores[id(image)] = diagram_likelihood(features, proximity)
+
+    ranked = sorted(images, key=lambda image: scores[id(image)], reverse=True)
+    selected = [image for image in ranked if scores[id(image)] >= threshold]
+    if top_k > 0:
+        selected = selected[:top_k]
+    return selected, scores
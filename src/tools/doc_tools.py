@@ -1,46 +1,109 @@
 import re
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-import fitz  # PyMuPDF
+from src.tools.concept_index import ConceptIndex
+from src.tools.ingestion_backends import IngestionBackend, PyMuPDFBackend
+from src.tools.page_cache import PageCache
+from src.tools.pdf_session import PdfSession
+from src.tools.passage_router import PassageRouter
 
 logger = logging.getLogger(__name__)
 
+PYMUPDF_CACHE_SECTION = PyMuPDFBackend().cache_section
+
 
 class DocAnalyst:
     """Forensic tools for analyzing PDF reports with chunked ingestion (RAG-lite)."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        page_cache: Optional[PageCache] = None,
+        backend: Optional[IngestionBackend] = None,
+    ):
         self._chunks: List[Dict[str, str]] = []
+        self.backend = backend or PyMuPDFBackend()
+        self._index: Optional[ConceptIndex] = None
+        self._router: Optional[PassageRouter] = None
+        self.page_cache = page_cache
 
-    def ingest_pdf(self, pdf_path: str) -> str:
+    def ingest_pdf(self, pdf_path: str, session: Optional[PdfSession] = None) -> str:
         """
-        Converts PDF to text using PyMuPDF with page-level chunking.
+        Converts PDF to text with the configured ingestion backend (PyMuPDF
+        by default, optionally Docling) and page-level chunking.
         Stores chunks internally for targeted retrieval via query_chunks().
+        When a PageCache is attached, pages whose fingerprint is unchanged
+        since a previous ingestion reuse their cached text and chunks; pages
+        a backend answered through its PyMuPDF fallback are cached as PyMuPDF
+        text, so a later run still tries the backend for them.
+        Pass the audit's shared PdfSession to avoid a second parse of the file.
         Returns the full text for backward compatibility.
         """
+        owned = session is None
         try:
-            doc = fitz.open(pdf_path)
+            if owned:
+                session = PdfSession(pdf_path)
             full_text = ""
             self._chunks = []
+            page_count = len(session.pages)
+            section_name = self.backend.cache_section
+
+            cached_pages = {}
+            if self.page_cache:
+                for page in session.pages:
+                    cached = self.page_cache.get(page["fingerprint"], section_name)
+                    if cached is not None:
+                        cached_pages[page["page"]] = cached
+            reused = len(cached_pages)
+
+            # Only pages without a cache hit go through the backend
+            fresh_texts = self.backend.page_texts(
+                pdf_path, session, [p["page"] for p in session.pages if p["page"] not in cached_pages]
+            )
+            fallback_pages = getattr(fresh_texts, "fallback_pages", set())
 
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_text = page.get_text()
-                full_text += page_text
+            for page in session.pages:
+                page_num = page["page"]
+                cached = cached_pages.get(page_num)
 
-                # Split each page further by heading-like sections
-                sections = self._split_by_headings(page_text, page_num + 1)
+                if cached is not None:
+                    page_text = cached["text"]
+                    sections = cached["chunks"]
+                else:
+                    page_text = fresh_texts.get(page_num, "")
+                    # Split each page further by heading-like sections
+                    sections = self._split_by_headings(page_text, page_num)
+                    if self.page_cache:
+                        self.page_cache.put(
+                            page["fingerprint"],
+                            PYMUPDF_CACHE_SECTION if page_num in fallback_pages else section_name,
+                            {"text": page_text, "chunks": sections},
+                        )
+
+                # Cached chunks may come from another report where this page sat elsewhere
+                for section in sections:
+                    if section["heading"] == f"Page {section['page']}":
+                        section["heading"] = f"Page {page_num}"
+                    section["page"] = page_num
+                full_text += page_text
                 self._chunks.extend(sections)
 
-            doc.close()
+            self._index = ConceptIndex(self._chunks)
+            self._router = PassageRouter(self._chunks)
+            if self.page_cache:
+                self.page_cache.reused += reused
+                self.page_cache.reprocessed += page_count - reused
             logger.info(
-                f"DocAnalyst ingested {len(doc)} pages into {len(self._chunks)} chunks "
-                f"from {pdf_path}"
+                f"DocAnalyst ingested {page_count} pages into {len(self._chunks)} chunks "
+                f"from {pdf_path} via {self.backend.name} "
+                f"({reused} reused, {page_count - reused} reprocessed)"
             )
             return full_text
         except Exception as e:
             raise RuntimeError(f"Failed to ingest PDF {pdf_path}: {e}")
+        finally:
+            if owned and session is not None:
+                session.close()
 
     @staticmethod
     def _split_by_headings(page_text: str, page_num: int) -> List[Dict[str, str]]:
@@ -82,50 +145,69 @@ class DocAnalyst:
             "content": page_text.strip(),
         }]
 
-    def query_chunks(self, keywords: List[str], top_k: int = 3) -> Dict[str, List[Dict]]:
+    def query_chunks(
+        self, keywords: List[str], top_k: int = 3, min_score: float = 0.7
+    ) -> Dict[str, List[Dict]]:
         """
-        RAG-lite targeted retrieval: searches stored chunks for keywords
-        and returns the most relevant chunks per keyword.
+        RAG-lite targeted retrieval: approximate phrase search over stored
+        chunks via the n-gram ConceptIndex built at ingestion. Tolerates
+        hyphen/slash variants, word order and line-wrap hyphenation.
+        Returns the most relevant chunks per keyword with their match score.
         """
-        results: Dict[str, List[Dict]] = {}
+        if self._index is None or len(self._index) != len(self._chunks):
+            self._index = ConceptIndex(self._chunks)
 
+        results: Dict[str, List[Dict]] = {}
         for keyword in keywords:
-            scored_chunks = []
-            kw_lower = keyword.lower()
-
-            for chunk in self._chunks:
-                content_lower = chunk["content"].lower()
-                if kw_lower in content_lower:
-                    # Score by frequency of keyword in chunk
-                    frequency = content_lower.count(kw_lower)
-                    scored_chunks.append({
-                        "page": chunk["page"],
-                        "heading": chunk["heading"],
-                        "content": chunk["content"],
-                        "relevance_hits": frequency,
-                    })
-
-            # Sort by relevance (frequency), return top_k
-            scored_chunks.sort(key=lambda c: c["relevance_hits"], reverse=True)
-            results[keyword] = scored_chunks[:top_k]
+            results[keyword] = [
+                {
+                    "page": self._chunks[m["chunk_id"]]["page"],
+                    "heading": self._chunks[m["chunk_id"]]["heading"],
+                    "content": self._chunks[m["chunk_id"]]["content"],
+                    "relevance_hits": m["hits"],
+                    "match_score": m["score"],
+                    "matched_text": m["match"],
+                }
+                for m in self._index.search(keyword, top_k=top_k, min_score=min_score)
+            ]
 
         return results
 
-    def query_concepts(self, text: str, keywords: List[str]) -> Dict[str, str]:
+    def route_dimensions(self, dimensions: List[Dict], top_k: int = 3) -> Dict[str, List[Dict]]:
+        """
+        Assigns every rubric dimension its top_k report passages by TF-IDF
+        similarity to the dimension's forensic_instruction/success_pattern.
+        Returns full chunk dicts (page, heading, content) plus "score".
+        """
+        if self._router is None or len(self._router.chunks) != len(self._chunks):
+            self._router = PassageRouter(self._chunks)
+
+        return {
+            dim_id: [{**self._chunks[m["chunk_id"]], "score": m["score"]} for m in matches]
+            for dim_id, matches in self._router.route(dimensions, top_k=top_k).items()
+        }
+
+    def query_concepts(
+        self, text: str, keywords: List[str], chunk_results: Optional[Dict[str, List[Dict]]] = None
+    ) -> Dict[str, str]:
         """
         Chunk-aware concept search. If chunks are available, searches within
         chunks for targeted context. Falls back to line-level search.
+        Pass chunk_results from an earlier query_chunks(keywords) call to
+        reuse its retrieval instead of searching again.
         """
         # If we have chunks from ingestion, use chunk-based retrieval
         if self._chunks:
-            chunk_results = self.query_chunks(keywords)
+            if chunk_results is None:
+                chunk_results = self.query_chunks(keywords)
             results = {}
             for keyword, chunks in chunk_results.items():
                 if chunks:
                     # Return the most relevant chunk's content with page reference
                     best = chunks[0]
                     context = (
-                        f"[Page {best['page']}, Section: {best['heading']}]\n"
+                        f"[Page {best['page']}, Section: {best['heading']}, "
+                        f"match_score={best['match_score']:.2f} on \"{best['matched_text']}\"]\n"
                         f"{best['content'][:500]}"
                     )
                     if len(chunks) > 1:
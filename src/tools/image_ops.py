@@ -0,0 +1,112 @@
+import os
+import logging
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def decode_gray(data: bytes) -> np.ndarray:
+    """Decodes image bytes with PyMuPDF into a 2-D uint8 grayscale array."""
+    pix = fitz.Pixmap(data)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.n != 1:
+        pix = fitz.Pixmap(fitz.csGRAY, pix)
+    samples = np.frombuffer(pix.samples, dtype=np.uint8)
+    return samples.reshape(pix.height, pix.stride)[:, : pix.width]
+
+
+def _block_mean(gray: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """Area-averages a grayscale array down to rows x cols."""
+    row_edges = np.linspace(0, gray.shape[0], rows + 1).astype(int)
+    col_edges = np.linspace(0, gray.shape[1], cols + 1).astype(int)
+    # Guarantee non-empty bins for images smaller than the grid
+    row_edges[1:] = np.maximum(row_edges[1:], row_edges[:-1] + 1)
+    col_edges[1:] = np.maximum(col_edges[1:], col_edges[:-1] + 1)
+    out = np.empty((rows, cols), dtype=np.float64)
+    for r in range(rows):
+        band = gray[row_edges[r]:row_edges[r + 1]]
+        for c in range(cols):
+            block = band[:, col_edges[c]:col_edges[c + 1]]
+            out[r, c] = block.mean() if block.size else 0.0
+    return out
+
+
+def dhash(data: bytes, size: int = 8) -> int:
+    """
+    Difference hash: shrink to size x (size + 1) grayscale and record whether
+    each pixel is brighter than its right neighbour. Re-encoded or slightly
+    rescaled copies of the same picture land within a few bits of each other.
+    """
+    grid = _block_mean(decode_gray(data), size, size + 1)
+    bits = (grid[:, 1:] > grid[:, :-1]).flatten()
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def downscale_image(data: bytes, max_dim: int = 1024, jpeg_quality: int = 85) -> Tuple[bytes, str, int, int]:
+    """
+    Resizes an image so its longest side is at most max_dim and re-encodes it
+    from raw pixels, which drops any embedded metadata (EXIF, ICC, XMP).
+    Returns (bytes, ext, width, height) using whichever of PNG or JPEG is
+    smaller; images with transparency stay PNG.
+    """
+    pix = fitz.Pixmap(data)
+    if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+
+    longest = max(pix.width, pix.height)
+    if longest > max_dim:
+        scale = max_dim / longest
+        pix = fitz.Pixmap(pix, max(1, round(pix.width * scale)), max(1, round(pix.height * scale)), None)
+
+    candidates = [(pix.tobytes("png"), "png")]
+    if not pix.alpha:
+        candidates.append((pix.tobytes("jpeg", jpg_quality=jpeg_quality), "jpeg"))
+    encoded, ext = min(candidates, key=lambda c: len(c[0]))
+    return encoded, ext, pix.width, pix.height
+
+
+def group_duplicate_images(images: List, max_distance: Optional[int] = None) -> List[List]:
+    """
+    Groups repeated images so each unique picture is analyzed once.
+
+    Images sharing an xref are the same PDF object and are grouped without
+    decoding. Remaining representatives are merged when their dHash values
+    are within max_distance bits (default AUDIT_PHASH_DISTANCE, 6).
+    Each group's first element is its representative; input order is kept.
+    """
+    if max_distance is None:
+        max_distance = int(os.getenv("AUDIT_PHASH_DISTANCE", "6"))
+
+    by_xref = {}
+    for image in images:
+        # xref 0 means "not from a PDF object" (e.g. loaded from a file)
+        by_xref.setdefault(image.xref or id(image), []).append(image)
+
+    groups: List[List] = []
+    group_hashes: List[int] = []
+    for members in by_xref.values():
+        try:
+            image_hash = dhash(members[0].data)
+        except Exception as e:
+            logger.warning(f"Could not hash image {members[0].name}: {e}")
+            groups.append(list(members))
+            group_hashes.append(None)
+            continue
+
+        for idx, existing in enumerate(group_hashes):
+            if existing is not None and hamming(existing, image_hash) <= max_distance:
+                groups[idx].extend(members)
+                break
+        else:
+            groups.append(list(members))
+            group_hashes.append(image_hash)
+
+    return groups
@@ -0,0 +1,277 @@
+import os
+import logging
+import importlib.util
+import multiprocessing
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.tools.pdf_session import PdfSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOCLING_TIMEOUT = 60.0
+DEFAULT_DOCLING_INIT_TIMEOUT = 300.0
+
+
+class PageTexts(dict):
+    """
+    {page_number: text} returned by a backend. fallback_pages lists the
+    pages whose text came from the PyMuPDF fallback rather than the backend
+    itself, so callers do not cache them as that backend's output.
+    """
+
+    def __init__(self, texts=(), fallback_pages: Iterable[int] = ()):
+        super().__init__(texts)
+        self.fallback_pages = set(fallback_pages)
+
+
+class IngestionBackend(ABC):
+    """
+    Turns PDF pages into text for DocAnalyst.
+
+    Backends return PageTexts ({page_number: text}) for the requested 1-based
+    pages. The text is chunked by DocAnalyst._split_by_headings, which
+    understands both plain PyMuPDF text and Markdown headings.
+    """
+
+    name = "base"
+
+    @property
+    def cache_section(self) -> str:
+        """PageCache section for this backend's output; backends never share cached text."""
+        return "doc" if self.name == "pymupdf" else f"doc-{self.name}"
+
+    @abstractmethod
+    def page_texts(self, pdf_path: str, session: PdfSession, page_numbers: List[int]) -> PageTexts:
+        """Text of the requested pages."""
+
+
+class PyMuPDFBackend(IngestionBackend):
+    """Plain text from the shared PdfSession page walk. Fast, no layout structure."""
+
+    name = "pymupdf"
+
+    def page_texts(self, pdf_path: str, session: PdfSession, page_numbers: List[int]) -> PageTexts:
+        wanted = set(page_numbers)
+        return PageTexts({p["page"]: p["text"] for p in session.pages if p["page"] in wanted})
+
+
+# ---------------------------------------------------------------------------
+# Docling: warm converters in long-lived worker processes
+# ---------------------------------------------------------------------------
+
+_worker_converter = None
+
+
+def _docling_worker_init() -> None:
+    """
+    Process initializer: builds the PDF pipeline and loads its models once
+    per worker. DocumentConverter() alone is lazy and would load them on
+    the first convert(), inside that conversion's timeout.
+    """
+    global _worker_converter
+    from docling.datamodel.base_models import InputFormat
+    from docling.document_converter import DocumentConverter
+
+    converter = DocumentConverter()
+    converter.initialize_pipeline(InputFormat.PDF)
+    _worker_converter = converter
+
+
+def _run_worker_init(initializer, ready) -> None:
+    """Runs the pool's initializer, then signals the parent that this worker is ready."""
+    initializer()
+    ready.release()
+
+
+def _docling_worker_ping() -> bool:
+    return _worker_converter is not None
+
+
+def _page_ranges(page_numbers: List[int]) -> List[Tuple[int, int]]:
+    """Contiguous, inclusive (first, last) runs of the requested pages."""
+    ranges: List[Tuple[int, int]] = []
+    for n in sorted(set(page_numbers)):
+        if ranges and n == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], n)
+        else:
+            ranges.append((n, n))
+    return ranges
+
+
+def _docling_worker_convert(pdf_path: str, page_numbers: List[int]) -> Dict[int, str]:
+    """
+    Runs inside a worker: converts only the requested pages, one Docling
+    page_range per contiguous run, and exports Markdown per page.
+    """
+    texts = {}
+    for first, last in _page_ranges(page_numbers):
+        result = _worker_converter.convert(pdf_path, page_range=(first, last))
+        for n in range(first, last + 1):
+            texts[n] = result.document.export_to_markdown(page_no=n)
+    return texts
+
+
+class DoclingWorkerPool:
+    """
+    Long-lived pool of spawn-started processes, each holding a DocumentConverter
+    with its PDF pipeline loaded. Shared by every audit in the process. A
+    conversion that times out terminates the pool (a running conversion
+    cannot be cancelled), and the next shared() call starts a fresh one,
+    which DoclingBackend warms again before converting.
+    """
+
+    # Module-level callables run in the workers; overridable for tests
+    initializer = staticmethod(_docling_worker_init)
+    convert_fn = staticmethod(_docling_worker_convert)
+
+    _instance: Optional["DoclingWorkerPool"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(1, workers or int(os.getenv("AUDIT_DOCLING_WORKERS", "1")))
+        context = multiprocessing.get_context("spawn")
+        self._ready = context.Semaphore(0)
+        self._warm = False
+        self._warm_lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_run_worker_init,
+            initargs=(self.initializer, self._ready),
+        )
+
+    @classmethod
+    def shared(cls) -> "DoclingWorkerPool":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def warm(self, timeout: Optional[float] = None) -> None:
+        """
+        Starts every worker and blocks until each has finished initializing
+        its converter; a no-op once the pool is warm. Raises
+        concurrent.futures.TimeoutError when that takes longer than timeout.
+        """
+        with self._warm_lock:
+            if self._warm:
+                return
+            deadline = None if timeout is None else time.monotonic() + timeout
+
+            def _remaining() -> Optional[float]:
+                return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            # Each submit starts a worker while none is idle; a failed initializer surfaces here
+            futures = [self._executor.submit(_docling_worker_ping) for _ in range(self.workers)]
+            for future in futures:
+                future.result(timeout=_remaining())
+            for _ in range(self.workers):
+                if not self._ready.acquire(timeout=_remaining()):
+                    raise FutureTimeoutError(f"Docling workers not ready after {timeout:.0f}s")
+            self._warm = True
+
+    def convert(self, pdf_path: str, page_numbers: List[int], timeout: float) -> Dict[int, str]:
+        future = self._executor.submit(self.convert_fn, os.path.abspath(pdf_path), page_numbers)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Docling worker hung on {pdf_path}; recycling the worker pool")
+            self.terminate()
+            raise
+
+    def terminate(self) -> None:
+        """Kills the workers, including a hung conversion, and retires the pool."""
+        for process in list((getattr(self._executor, "_processes", None) or {}).values()):
+            process.terminate()
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with DoclingWorkerPool._instance_lock:
+            if DoclingWorkerPool._instance is self:
+                DoclingWorkerPool._instance = None
+
+
+class DoclingBackend(IngestionBackend):
+    """
+    High-fidelity Markdown (tables, reading order, headings) via Docling.
+    Falls back to PyMuPDF text when Docling is unavailable, errors, or does
+    not answer within the timeout. Worker start-up (model loading) is
+    waited for separately, within init_timeout (AUDIT_DOCLING_INIT_TIMEOUT,
+    300s), so it never eats into a conversion's timeout.
+    """
+
+    name = "docling"
+
+    def __init__(
+        self,
+        pool: Optional[DoclingWorkerPool] = None,
+        timeout: Optional[float] = None,
+        init_timeout: Optional[float] = None,
+    ):
+        self._pool = pool
+        self.timeout = timeout or float(os.getenv("AUDIT_DOCLING_TIMEOUT", DEFAULT_DOCLING_TIMEOUT))
+        self.init_timeout = init_timeout or float(
+            os.getenv("AUDIT_DOCLING_INIT_TIMEOUT", DEFAULT_DOCLING_INIT_TIMEOUT)
+        )
+        self.fallback = PyMuPDFBackend()
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("docling") is not None
+
+    def _fallback_texts(self, pdf_path: str, session: PdfSession, page_numbers: List[int]) -> PageTexts:
+        return PageTexts(self.fallback.page_texts(pdf_path, session, page_numbers), fallback_pages=page_numbers)
+
+    def page_texts(self, pdf_path: str, session: PdfSession, page_numbers: List[int]) -> PageTexts:
+        if not page_numbers:
+            return PageTexts()
+        if not self.available():
+            logger.warning("Docling backend requested but docling is not installed; using PyMuPDF.")
+            return self._fallback_texts(pdf_path, session, page_numbers)
+
+        pool = self._pool or DoclingWorkerPool.shared()
+        try:
+            pool.warm(timeout=self.init_timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Docling workers did not start within {self.init_timeout:.0f}s; using PyMuPDF.")
+            pool.terminate()
+            return self._fallback_texts(pdf_path, session, page_numbers)
+        except Exception as e:
+            logger.warning(f"Docling workers failed to start: {e}; using PyMuPDF.")
+            pool.terminate()
+            return self._fallback_texts(pdf_path, session, page_numbers)
+        try:
+            texts = PageTexts(pool.convert(pdf_path, page_numbers, timeout=self.timeout))
+        except FutureTimeoutError:
+            logger.warning(f"Docling timed out after {self.timeout:.0f}s on {pdf_path}; using PyMuPDF.")
+            return self._fallback_texts(pdf_path, session, page_numbers)
+        except Exception as e:
+            logger.warning(f"Docling failed on {pdf_path}: {e}; using PyMuPDF.")
+            return self._fallback_texts(pdf_path, session, page_numbers)
+
+        # Pages Docling returned empty (e.g. image-only) keep the PyMuPDF text layer
+        missing = [n for n in page_numbers if not (texts.get(n) or "").strip()]
+        if missing:
+            fallback = self._fallback_texts(pdf_path, session, missing)
+            texts.update(fallback)
+            texts.fallback_pages |= fallback.fallback_pages
+        return texts
+
+
+INGESTION_BACKENDS = {
+    PyMuPDFBackend.name: PyMuPDFBackend,
+    DoclingBackend.name: DoclingBackend,
+}
+
+
+def get_ingestion_backend(name: Optional[str] = None) -> IngestionBackend:
+    """Backend by name, defaulting to AUDIT_INGESTION_BACKEND (or "pymupdf")."""
+    name = (name or os.getenv("AUDIT_INGESTION_BACKEND", PyMuPDFBackend.name)).lower()
+    if name not in INGESTION_BACKENDS:
+        raise ValueError(f"Unknown ingestion backend '{name}'. Choose from: {sorted(INGESTION_BACKENDS)}")
+    return INGESTION_BACKENDS[name]()
@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Optional
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".audit_cache"
+
+
+def page_fingerprint(doc: "fitz.Document", page: "fitz.Page") -> str:
+    """
+    Content hash of a single PDF page.
+    Covers the page's content stream plus the raw bytes of every embedded
+    image and (nested) Form XObject it references, so an edited paragraph,
+    a swapped diagram or text drawn through a changed form all change it.
+    Font programs are not hashed.
+    """
+    digest = hashlib.sha256()
+    digest.update(page.read_contents() or b"")
+    xrefs = [img_info[0] for img_info in page.get_images(full=True)]
+    xrefs += [xobj_info[0] for xobj_info in page.get_xobjects()]
+    for xref in xrefs:
+        try:
+            digest.update(hashlib.sha256(doc.xref_stream_raw(xref) or b"").digest())
+        except Exception:
+            # Unreadable stream: fall back to the xref number so the hash stays stable
+            digest.update(f"xref:{xref}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PageCache:
+    """
+    Content-addressed on-disk cache of per-page ingestion results.
+
+    Entries are keyed by (page fingerprint, section) where section is the
+    consumer, e.g. "doc" for DocAnalyst text/chunks or the
+    vision_page_section() of VisionInspector analyses. Each section is a
+    separate file so parallel detectives never write the same path.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        base_dir = cache_dir or os.getenv("AUDIT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.cache_dir = os.path.join(base_dir, "pages")
+        self.reused = 0
+        self.reprocessed = 0
+
+    def _path(self, page_hash: str, section: str) -> str:
+        return os.path.join(self.cache_dir, page_hash[:2], f"{page_hash}.{section}.json")
+
+    def get(self, page_hash: str, section: str) -> Optional[Dict]:
+        """Returns the cached payload for a page, or None on a miss."""
+        path = self._path(page_hash, section)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"PageCache ignoring unreadable entry {path}: {e}")
+            return None
+
+    def put(self, page_hash: str, section: str, payload: Dict) -> None:
+        """Atomically writes a page payload (tmp file + rename)."""
+        path = self._path(page_hash, section)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"PageCache failed to write {path}: {e}")
+
+    def summary(self) -> str:
+        return f"{self.reused} page(s) reused, {self.reprocessed} page(s) reprocessed"
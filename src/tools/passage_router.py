@@ -0,0 +1,106 @@
+import logging
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+from src.tools.concept_index import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or "
+    "that the their then there these this to was were will with no not all any "
+    "each should must".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in normalize_text(text).split() if len(t) > 1 and t not in _STOPWORDS]
+
+
+def dimension_query_text(dim: Dict) -> str:
+    """The rubric text a dimension is routed on: its name, instruction and success pattern."""
+    return " ".join(
+        dim.get(field) or "" for field in ("name", "forensic_instruction", "success_pattern")
+    )
+
+
+class PassageRouter:
+    """
+    Routes rubric dimensions to their most relevant report chunks.
+
+    A sparse TF-IDF matrix over chunks (chunks x vocab, L2-normalized rows)
+    is built once at ingestion. Routing vectorizes every dimension's rubric
+    text against the same vocabulary and scores all (dimension, chunk)
+    pairs with a single sparse matrix product, so cost grows with the
+    number of non-zero terms rather than with dimensions x chunks loops.
+    """
+
+    def __init__(self, chunks: List[Dict]):
+        self.chunks = chunks
+        docs = [Counter(tokenize(c["content"])) for c in chunks]
+
+        self.vocab: Dict[str, int] = {}
+        for counts in docs:
+            for term in counts:
+                self.vocab.setdefault(term, len(self.vocab))
+
+        self.matrix = self._weigh(docs)
+        n_docs = max(1, len(chunks))
+        doc_freq = np.bincount(self.matrix.indices, minlength=len(self.vocab))
+        self.idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1.0
+        self.matrix = self._normalize(self.matrix @ sparse.diags(self.idf))
+
+    def _weigh(self, docs: List[Counter]) -> sparse.csr_matrix:
+        """Sublinear term-frequency matrix over the router vocabulary (unknown terms dropped)."""
+        rows, cols, vals = [], [], []
+        for row, counts in enumerate(docs):
+            for term, count in counts.items():
+                col = self.vocab.get(term)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    vals.append(1.0 + np.log(count))
+        return sparse.csr_matrix(
+            (vals, (rows, cols)), shape=(len(docs), len(self.vocab)), dtype=np.float64
+        )
+
+    @staticmethod
+    def _normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+
+    def route(
+        self, dimensions: List[Dict], top_k: int = 3, min_score: float = 0.05
+    ) -> Dict[str, List[Dict]]:
+        """
+        Returns {dimension_id: [{"chunk_id": int, "score": float}, ...]} with up
+        to top_k chunks per dimension scoring at least min_score (cosine).
+        """
+        if not dimensions or not self.chunks or not self.vocab:
+            return {dim["id"]: [] for dim in dimensions}
+
+        queries = [Counter(tokenize(dimension_query_text(dim))) for dim in dimensions]
+        query_matrix = self._normalize(self._weigh(queries) @ sparse.diags(self.idf))
+
+        # One product scores every (dimension, chunk) pair
+        scores = (query_matrix @ self.matrix.T).toarray()
+
+        k = min(top_k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        routed: Dict[str, List[Dict]] = {}
+        for row, dim in enumerate(dimensions):
+            ranked = sorted(top[row], key=lambda c: scores[row, c], reverse=True)
+            routed[dim["id"]] = [
+                {"chunk_id": int(c), "score": round(float(scores[row, c]), 3)}
+                for c in ranked
+                if scores[row, c] >= min_score
+            ]
+        logger.info(
+            f"PassageRouter scored {len(dimensions)} dimension(s) against "
+            f"{len(self.chunks)} chunk(s) over {len(self.vocab)} terms"
+        )
+        return routed
@@ -0,0 +1,243 @@
+import os
+import mmap
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+from src.tools.page_cache import page_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class PdfSession:
+    """
+    One parse of a PDF report shared by every detective in an audit.
+
+    The file is memory-mapped and opened once; a single page walk records
+    per-page text, text-span metadata, the embedded image inventory and the
+    page fingerprint used by PageCache. The document stays open for later
+    random access (image bytes) until close(), which release_pdf_session
+    calls once the last audit holding the file is done with it.
+
+    Each page record is:
+    {"page": int, "text": str, "fingerprint": str,
+     "spans": [{"text", "bbox", "size", "font"}],
+     "images": [{"xref", "width", "height", "rects": [bbox, ...]}],
+     "drawings": [{"bbox", "paths"}]}
+
+    "drawings" are clusters of vector paths large and busy enough to be a
+    figure (see cluster_drawings); render_region() rasterizes one on demand.
+    """
+
+    def __init__(self, pdf_path: str):
+        self.pdf_path = pdf_path
+        self._lock = threading.Lock()
+        self.closed = False
+        self._file = open(pdf_path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mmap)
+        self.doc = None
+        try:
+            self.doc = fitz.open(stream=self._view, filetype="pdf")
+            self.pages: List[Dict] = [self._walk_page(n) for n in range(len(self.doc))]
+        except Exception:
+            self.close()
+            raise
+        logger.info(f"PdfSession parsed {len(self.pages)} page(s) from {pdf_path}")
+
+    def _walk_page(self, page_num: int) -> Dict:
+        page = self.doc[page_num]
+        # One text extraction serves both the plain text and the span layout
+        textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+        text = page.get_text("text", textpage=textpage)
+        spans = [
+            {
+                "text": span["text"],
+                "bbox": tuple(span["bbox"]),
+                "size": span["size"],
+                "font": span["font"],
+            }
+            for block in page.get_text("dict", textpage=textpage)["blocks"]
+            if block.get("type") == 0
+            for line in block["lines"]
+            for span in line["spans"]
+            if span["text"].strip()
+        ]
+
+        images = []
+        for img_info in page.get_images(full=True):
+            xref = img_info[0]
+            try:
+                rects = [tuple(r) for r in page.get_image_rects(xref)]
+            except Exception:
+                rects = []
+            images.append({"xref": xref, "width": img_info[2], "height": img_info[3], "rects": rects})
+
+        try:
+            drawings = cluster_drawings([d["rect"] for d in page.get_drawings()], page.rect)
+        except Exception as e:
+            logger.warning(f"Could not read vector drawings on page {page_num + 1}: {e}")
+            drawings = []
+
+        return {
+            "page": page_num + 1,
+            "text": text,
+            "fingerprint": page_fingerprint(self.doc, page),
+            "spans": spans,
+            "images": images,
+            "drawings": drawings,
+        }
+
+    def extract_image(self, xref: int) -> Dict:
+        """Thread-safe doc.extract_image(); MuPDF documents are not safe for concurrent use."""
+        with self._lock:
+            return self.doc.extract_image(xref)
+
+    def render_region(self, page_num: int, bbox: Tuple[float, float, float, float], dpi: Optional[int] = None) -> Dict:
+        """
+        Rasterizes only bbox (clipped to the page) of a 1-based page at dpi
+        (default AUDIT_VECTOR_DPI, 110), never the full page. Returns the
+        same shape as extract_image(): {"image": png bytes, "ext", "width", "height"}.
+        """
+        dpi = dpi or int(os.getenv("AUDIT_VECTOR_DPI", "110"))
+        with self._lock:
+            page = self.doc[page_num - 1]
+            pix = page.get_pixmap(clip=fitz.Rect(bbox) & page.rect, dpi=dpi, alpha=False)
+            return {"image": pix.tobytes("png"), "ext": "png", "width": pix.width, "height": pix.height}
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self.doc is not None:
+            self.doc.close()
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+        logger.info(f"PdfSession closed {self.pdf_path}")
+
+    def __enter__(self) -> "PdfSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def cluster_drawings(
+    rects: Sequence,
+    page_rect,
+    gap: float = 12.0,
+    min_paths: Optional[int] = None,
+    min_size: float = 48.0,
+) -> List[Dict]:
+    """
+    Groups vector path bounding boxes that lie within gap points of each
+    other into figure candidates: {"bbox": (x0, y0, x1, y1), "paths": n}.
+
+    Clusters with fewer than min_paths paths (default AUDIT_MIN_DRAWING_PATHS,
+    4), narrower or shorter than min_size points, or covering most of the page
+    (backgrounds, borders) are dropped, as are lone rules and underlines.
+    """
+    if min_paths is None:
+        min_paths = int(os.getenv("AUDIT_MIN_DRAWING_PATHS", "4"))
+    page_rect = fitz.Rect(page_rect)
+    page_area = page_rect.width * page_rect.height
+
+    clusters: List[List] = []  # [x0, y0, x1, y1, paths]
+    for rect in rects:
+        rect = fitz.Rect(rect) & page_rect
+        if rect.x1 < rect.x0 or rect.y1 < rect.y0 or (rect.width == 0 and rect.height == 0):
+            continue  # off-page or a bare point
+        if rect.width * rect.height > 0.9 * page_area:
+            continue  # page background or frame
+        box = [rect.x0, rect.y0, rect.x1, rect.y1, 1]
+        # Absorb every existing cluster within reach, repeatedly, since a
+        # merge can bring further clusters into range
+        merged = True
+        while merged:
+            merged = False
+            for other in clusters:
+                if (
+                    other[0] - gap <= box[2] and box[0] <= other[2] + gap
+                    and other[1] - gap <= box[3] and box[1] <= other[3] + gap
+                ):
+                    box = [min(box[0], other[0]), min(box[1], other[1]),
+                           max(box[2], other[2]), max(box[3], other[3]), box[4] + other[4]]
+                    clusters.remove(other)
+                    merged = True
+                    break
+        clusters.append(box)
+
+    figures = []
+    for x0, y0, x1, y1, paths in clusters:
+        if paths < min_paths or x1 - x0 < min_size or y1 - y0 < min_size:
+            continue
+        if (x1 - x0) * (y1 - y0) > 0.9 * page_area:
+            continue
+        figures.append({"bbox": (x0, y0, x1, y1), "paths": paths})
+    return figures
+
+
+_sessions: Dict[str, PdfSession] = {}
+# Audits currently using each report; see hold_pdf_session
+_holders: Dict[str, int] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_pdf_session(pdf_path: str) -> PdfSession:
+    """
+    Returns the shared session for pdf_path, parsing it on first use.
+    Parallel detectives asking for the same report block until the single
+    parse completes instead of each opening the file.
+    """
+    key = os.path.realpath(pdf_path)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or session.closed:
+            session = PdfSession(pdf_path)
+            _sessions[key] = session
+        return session
+
+
+def hold_pdf_session(pdf_path: str) -> None:
+    """
+    Registers one audit as a user of pdf_path's shared session, so another
+    audit of the same file releasing it does not close it underneath this
+    one. The session itself is still parsed lazily by get_pdf_session.
+    """
+    key = os.path.realpath(pdf_path)
+    with _sessions_lock:
+        _holders[key] = _holders.get(key, 0) + 1
+
+
+def release_pdf_session(pdf_path: str) -> None:
+    """Drops one holder of pdf_path's session and closes it once no audit holds it."""
+    key = os.path.realpath(pdf_path)
+    with _sessions_lock:
+        holders = _holders.pop(key, 0) - 1
+        if holders > 0:
+            _holders[key] = holders
+            return
+        session = _sessions.pop(key, None)
+    if session is not None:
+        session.close()
+
+
+def close_pdf_sessions(pdf_path: Optional[str] = None) -> None:
+    """
+    Closes the session for pdf_path, or every open session when no path is
+    given, whoever still holds it. Meant for process or CLI-run teardown.
+    """
+    with _sessions_lock:
+        keys = [os.path.realpath(pdf_path)] if pdf_path else list(_sessions)
+        for key in keys:
+            _holders.pop(key, None)
+            session = _sessions.pop(key, None)
+            if session is not None:
+                session.close()
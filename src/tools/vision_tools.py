@@ -1,153 +1,600 @@
 import os
+import time
+import base64
+import hashlib
+import threading
+import asyncio
 import tempfile
 import logging
-from typing import List, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-import fitz  # PyMuPDF — already a project dependency
+from src.batching import pack_batches
+from src.fake_llm import llm_backend
+from src.llm_usage import CallRecord, get_usage_ledger
+from src.rate_limits import get_rate_limiter
+from src.state import DiagramBatch, DiagramClassification
+from src.response_cache import ResponseCache, fingerprint
+from src.tools.image_ops import downscale_image
+from src.tools.page_cache import PageCache
+from src.tools.pdf_session import PdfSession
 
 logger = logging.getLogger(__name__)
 
 
+MIME_TYPES = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+@dataclass
+class ImageRecord:
+    """
+    An embedded PDF image, or a rasterized vector drawing (kind="vector",
+    xref 0), held in memory.
+    The base64 payload for multimodal upload is encoded once, on first use.
+    """
+
+    data: bytes = field(repr=False)
+    ext: str
+    page: int
+    xref: int
+    width: int
+    height: int
+    index: int = 1
+    rects: List[Tuple[float, float, float, float]] = field(default_factory=list)
+    kind: str = "image"
+
+    @property
+    def name(self) -> str:
+        prefix = "vector" if self.kind == "vector" else "img"
+        return f"page{self.page}_{prefix}{self.index}.{self.ext}"
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES.get(self.ext.lower(), "image/png")
+
+    @cached_property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+    @cached_property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("utf-8")
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.base64}"
+
+    @classmethod
+    def from_file(cls, image_path: str) -> "ImageRecord":
+        with open(image_path, "rb") as f:
+            data = f.read()
+        ext = os.path.splitext(image_path)[1].lower().lstrip(".") or "png"
+        return cls(data=data, ext=ext, page=0, xref=0, width=0, height=0)
+
+
+@contextmanager
+def spilled_images(images: List[ImageRecord]) -> Iterator[List[str]]:
+    """
+    Opt-in disk spill for tools that need file paths. Writes the images to a
+    temporary directory that is removed when the context exits.
+    """
+    with tempfile.TemporaryDirectory(prefix="vision_inspector_") as temp_dir:
+        paths = []
+        for image in images:
+            path = os.path.join(temp_dir, image.name)
+            with open(path, "wb") as img_file:
+                img_file.write(image.data)
+            paths.append(path)
+        yield paths
+
+
 class VisionInspector:
     """Forensic tools for extracting and analyzing images/diagrams in PDF reports."""
 
+    def __init__(self, page_cache: Optional[PageCache] = None):
+        self.page_cache = page_cache
+
     @staticmethod
-    def extract_images_from_pdf(pdf_path: str) -> List[str]:
+    def extract_images_from_pdf(pdf_path: str) -> List[ImageRecord]:
         """
         Extracts embedded images from a PDF using PyMuPDF.
-        Returns a list of file paths to extracted images saved in a temp directory.
+        Returns in-memory ImageRecords; nothing is written to disk
+        (use spilled_images() when file paths are required).
+        """
+        pages = VisionInspector().extract_images_by_page(pdf_path)
+        return [image for page in pages for image in page["images"]]
+
+    def extract_images_by_page(self, pdf_path: str, session: Optional[PdfSession] = None) -> List[Dict]:
         """
-        extracted_paths: List[str] = []
+        Extracts embedded images and vector-drawn figures grouped by page.
+        Vector figures are rasterized from their bounding box only (see
+        PdfSession.render_region), never as full-page renders.
+        Returns one record per page that has either:
+        {"page": int, "page_hash": str | None, "images": [ImageRecord], "cached": dict | None}.
+        Pages whose fingerprint already has cached vision analyses (under
+        vision_page_section()) are not re-extracted; their cached payload is
+        returned in "cached" instead. page_hash is None when page reuse is off.
+        Pass the audit's shared PdfSession to reuse its image inventory.
+        """
+        pages: List[Dict] = []
+        extracted_count = 0
+        section = vision_page_section() if self.page_cache else None
+        owned = session is None
         try:
-            doc = fitz.open(pdf_path)
-            temp_dir = tempfile.mkdtemp(prefix="vision_inspector_")
+            if owned:
+                session = PdfSession(pdf_path)
+
+            for page in session.pages:
+                page_num = page["page"]
+                if not page["images"] and not page["drawings"]:
+                    continue
+
+                page_hash = page["fingerprint"] if section else None
+                cached = self.page_cache.get(page_hash, section) if page_hash else None
+                record = {"page": page_num, "page_hash": page_hash, "images": [], "cached": cached}
+                pages.append(record)
+                if cached is not None:
+                    continue
 
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                image_list = page.get_images(full=True)
+                for img_idx, img_info in enumerate(page["images"]):
+                    xref = img_info["xref"]
+                    try:
+                        base_image = session.extract_image(xref)
+                        image = ImageRecord(
+                            data=base_image["image"],
+                            ext=base_image.get("ext", "png"),
+                            page=page_num,
+                            xref=xref,
+                            width=base_image.get("width", img_info["width"]),
+                            height=base_image.get("height", img_info["height"]),
+                            index=img_idx + 1,
+                            rects=list(img_info["rects"]),
+                        )
+                        record["images"].append(image)
+                        extracted_count += 1
+                        logger.info(f"Extracted image: {image.name} ({len(image.data)} bytes)")
+                    except Exception as e:
+                        logger.warning(f"Failed to extract image xref={xref} on page {page_num}: {e}")
 
-                for img_idx, img_info in enumerate(image_list):
-                    xref = img_info[0]
+                for fig_idx, drawing in enumerate(page["drawings"]):
                     try:
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        image_ext = base_image.get("ext", "png")
-                        image_filename = f"page{page_num + 1}_img{img_idx + 1}.{image_ext}"
-                        image_path = os.path.join(temp_dir, image_filename)
-
-                        with open(image_path, "wb") as img_file:
-                            img_file.write(image_bytes)
-                        extracted_paths.append(image_path)
-                        logger.info(f"Extracted image: {image_filename} ({len(image_bytes)} bytes)")
+                        image = _render_vector_figure(session, page_num, drawing, fig_idx + 1)
+                        record["images"].append(image)
+                        extracted_count += 1
+                        logger.info(
+                            f"Rasterized vector figure: {image.name} ({drawing['paths']} paths, "
+                            f"{image.width}x{image.height}, {len(image.data)} bytes)"
+                        )
                     except Exception as e:
-                        logger.warning(f"Failed to extract image xref={xref} on page {page_num + 1}: {e}")
+                        logger.warning(f"Failed to rasterize vector figure {fig_idx + 1} on page {page_num}: {e}")
 
-            doc.close()
-            logger.info(f"VisionInspector extracted {len(extracted_paths)} image(s) from {pdf_path}")
+            logger.info(f"VisionInspector extracted {extracted_count} image(s)/figure(s) from {pdf_path}")
         except Exception as e:
             logger.error(f"VisionInspector failed to process PDF {pdf_path}: {e}")
+        finally:
+            if owned and session is not None:
+                session.close()
 
-        return extracted_paths
+        return pages
 
     @staticmethod
-    def analyze_diagram(image_path: str) -> str:
+    def analyze_diagram(image: Union[ImageRecord, str]) -> str:
         """
         Analyzes an architectural diagram using a multimodal LLM.
 
         This method implements the multimodal analysis pipeline:
-        1. Loads the image from disk
+        1. Takes the in-memory image record (or loads a file path)
         2. Sends it to a vision-capable LLM (Gemini or GPT-4o) for classification
         3. Returns a structured textual analysis
 
         Execution of the actual LLM call is optional per rubric, but the
         implementation pathway is fully wired.
         """
-        if not os.path.exists(image_path):
-            return f"Image not found at {image_path}"
+        if isinstance(image, str):
+            if not os.path.exists(image):
+                return f"Image not found at {image}"
+            image = ImageRecord.from_file(image)
+
+        provider = _vision_provider()
+        if provider is None:
+            return _skipped_analysis(image)
 
-        file_size = os.path.getsize(image_path)
-        file_ext = os.path.splitext(image_path)[1].lower()
+        cache, cache_key = get_vision_cache(), _vision_cache_key(image, provider[0])
+        cached = cache.get(cache_key) if cache else None
+        if cached is not None:
+            _record_vision_cache_hit(provider[0])
+            return cached["analysis"]
 
-        # Attempt multimodal LLM analysis if API key is available
+        # Attempt multimodal LLM analysis with the configured provider
+        record = _start_vision_record(provider[0], cache)
         try:
-            google_key = os.getenv("GOOGLE_API_KEY")
-            openai_key = os.getenv("OPENAI_API_KEY")
+            llm = _build_vision_llm(*provider)
+            upload = prepare_for_upload(image)
+            start = time.perf_counter()
+            content = llm.invoke([_build_vision_message(upload)], config={"callbacks": record.callbacks()}).content
+            _log_upload(image, upload, time.perf_counter() - start)
+        except Exception as e:
+            record.finish("failed")
+            return _failed_analysis(image, e)
+        record.finish("ok")
+        if cache:
+            cache.put(cache_key, {"analysis": content})
+        return content
 
-            if google_key:
-                return _analyze_with_gemini(image_path, google_key)
-            elif openai_key:
-                return _analyze_with_openai(image_path, openai_key)
-            else:
-                return (
-                    f"Multimodal analysis skipped (no API key configured). "
-                    f"Image metadata: format={file_ext}, size={file_size} bytes. "
-                    f"To enable: set GOOGLE_API_KEY or OPENAI_API_KEY."
-                )
+    @staticmethod
+    async def aanalyze_diagram(image: Union[ImageRecord, str]) -> str:
+        """Async variant of analyze_diagram using ainvoke(); same fallbacks."""
+        if isinstance(image, str):
+            if not os.path.exists(image):
+                return f"Image not found at {image}"
+            image = ImageRecord.from_file(image)
+
+        provider = _vision_provider()
+        if provider is None:
+            return _skipped_analysis(image)
+
+        cache = get_vision_cache()
+        cached = cache.get(_vision_cache_key(image, provider[0])) if cache else None
+        if cached is not None:
+            _record_vision_cache_hit(provider[0])
+            return cached["analysis"]
+        upload = await asyncio.to_thread(prepare_for_upload, image)
+        return await _ainvoke_vision(image, upload, provider)
+
+    @staticmethod
+    async def aanalyze_diagram_batch(
+        batch: List[Tuple[ImageRecord, ImageRecord]], provider: Tuple[str, str]
+    ) -> List[Optional[str]]:
+        """
+        Classifies several (image, upload) pairs in one multimodal request
+        with a structured DiagramBatch response. Images the model leaves out,
+        or every image when the batch call fails, come back as None for the
+        caller to analyze individually within its own concurrency bound.
+        """
+        if len(batch) == 1:
+            return [await _ainvoke_vision(*batch[0], provider)]
+
+        record = _start_vision_record(provider[0], get_vision_cache())
+        try:
+            llm = _build_vision_llm(*provider).with_structured_output(DiagramBatch)
+            start = time.perf_counter()
+            response = await llm.ainvoke(
+                [_build_batch_message([upload for _, upload in batch])], config={"callbacks": record.callbacks()}
+            )
+            latency = time.perf_counter() - start
+            record.finish("ok")
         except Exception as e:
-            logger.warning(f"Multimodal analysis failed, falling back to metadata: {e}")
-            return (
-                f"Multimodal analysis attempted but failed: {str(e)}. "
-                f"Image metadata: format={file_ext}, size={file_size} bytes."
+            record.finish("failed")
+            logger.warning(f"Batched vision call for {len(batch)} image(s) failed, retrying individually: {e}")
+            response = None
+
+        by_index = {}
+        if response is not None:
+            by_index = {c.image_index: c for c in response.classifications}
+            for image, upload in batch:
+                _log_upload(image, upload, latency, batch=len(batch))
+            logger.info(
+                f"Vision batch of {len(batch)} image(s) "
+                f"({sum(len(upload.data) for _, upload in batch)} bytes) classified in {latency:.2f}s"
             )
 
+        cache = get_vision_cache()
+        results: List[Optional[str]] = []
+        for position, (image, _) in enumerate(batch, start=1):
+            classification = by_index.get(position)
+            if classification is None:
+                results.append(None)
+                continue
+            analysis = format_classification(classification)
+            if cache:
+                cache.put(_vision_cache_key(image, provider[0]), {"analysis": analysis})
+            results.append(analysis)
 
-def _analyze_with_gemini(image_path: str, api_key: str) -> str:
-    """Analyze an image using Google Gemini's multimodal capabilities."""
-    import base64
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    from langchain_core.messages import HumanMessage
+        missing = results.count(None)
+        if missing and response is not None:
+            logger.warning(f"Vision batch omitted {missing} image(s), analyzing them individually")
+        return results
 
-    with open(image_path, "rb") as f:
-        image_data = base64.b64encode(f.read()).decode("utf-8")
+    @staticmethod
+    async def aanalyze_diagrams(
+        images: List[Union[ImageRecord, str]],
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Analyzes every image concurrently, at most `concurrency` requests in
+        flight (default AUDIT_VISION_CONCURRENCY, 4). Provider request rates
+        are additionally paced by the shared per-provider rate limiter.
 
-    ext = os.path.splitext(image_path)[1].lower().replace(".", "")
-    mime_map = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}
-    mime_type = mime_map.get(ext, "image/png")
+        Uncached in-memory images are packed into multi-image requests of at
+        most batch_size images (AUDIT_VISION_BATCH_SIZE, 4; 1 disables
+        batching) and batch_bytes of upload payload (AUDIT_VISION_BATCH_BYTES,
+        4 MB). File paths are analyzed one per request, as are images a batch
+        left unclassified; those retries take their own concurrency slots.
+        Uploads are downscaled on worker threads, off the event loop.
+        Results are returned in input order.
+        """
+        limit = concurrency or int(os.getenv("AUDIT_VISION_CONCURRENCY", "4"))
+        batch_size = batch_size or int(os.getenv("AUDIT_VISION_BATCH_SIZE", "4"))
+        batch_bytes = batch_bytes or int(os.getenv("AUDIT_VISION_BATCH_BYTES", str(4 * 1024 * 1024)))
+        semaphore = asyncio.Semaphore(max(1, limit))
+        provider = _vision_provider()
+        cache = get_vision_cache() if provider else None
 
-    llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0, google_api_key=api_key)
-    message = HumanMessage(
-        content=[
-            {"type": "text", "text": (
-                "Analyze this architectural diagram. Classify it as one of: "
-                "Flow Diagram, Sequence Diagram, State Machine, Component Diagram, or Other. "
-                "Then describe: (1) whether it shows fan-out/fan-in parallelism, "
-                "(2) key components visible, (3) data flow direction. "
-                "Be concise (3-5 sentences)."
-            )},
-            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}},
+        results: List[Optional[str]] = [None] * len(images)
+        singles: List[int] = []
+        uncached: List[Tuple[int, ImageRecord]] = []
+        for position, image in enumerate(images):
+            if provider is None or batch_size <= 1 or not isinstance(image, ImageRecord):
+                singles.append(position)
+                continue
+            cached = cache.get(_vision_cache_key(image, provider[0])) if cache else None
+            if cached is not None:
+                _record_vision_cache_hit(provider[0])
+                results[position] = cached["analysis"]
+            else:
+                uncached.append((position, image))
+        uploads = await asyncio.gather(*(asyncio.to_thread(prepare_for_upload, image) for _, image in uncached))
+        pending: List[Tuple[int, ImageRecord, ImageRecord]] = [
+            (position, image, upload) for (position, image), upload in zip(uncached, uploads)
         ]
+
+        async def _bounded_single(position: int) -> None:
+            async with semaphore:
+                results[position] = await VisionInspector.aanalyze_diagram(images[position])
+
+        async def _bounded_fallback(position: int, image: ImageRecord, upload: ImageRecord) -> None:
+            async with semaphore:
+                results[position] = await _ainvoke_vision(image, upload, provider)
+
+        async def _bounded_batch(batch: List[Tuple[int, ImageRecord, ImageRecord]]) -> None:
+            async with semaphore:
+                analyses = await VisionInspector.aanalyze_diagram_batch(
+                    [(image, upload) for _, image, upload in batch], provider
+                )
+            for (position, _, _), analysis in zip(batch, analyses):
+                results[position] = analysis
+            await asyncio.gather(*(
+                _bounded_fallback(position, image, upload)
+                for (position, image, upload), analysis in zip(batch, analyses)
+                if analysis is None
+            ))
+
+        batches = pack_batches(pending, lambda item: len(item[2].data), batch_size, batch_bytes)
+        if batches:
+            logger.info(f"Packed {len(pending)} image(s) into {len(batches)} vision request(s)")
+        await asyncio.gather(
+            *(_bounded_single(p) for p in singles),
+            *(_bounded_batch(b) for b in batches),
+        )
+        return results
+
+
+def _render_vector_figure(session: PdfSession, page_num: int, drawing: Dict, index: int) -> ImageRecord:
+    """Rasterizes a vector-drawing cluster, with a small margin for edge labels."""
+    x0, y0, x1, y1 = drawing["bbox"]
+    margin = 4.0
+    rendered = session.render_region(page_num, (x0 - margin, y0 - margin, x1 + margin, y1 + margin))
+    return ImageRecord(
+        data=rendered["image"],
+        ext=rendered["ext"],
+        page=page_num,
+        xref=0,
+        width=rendered["width"],
+        height=rendered["height"],
+        index=index,
+        rects=[tuple(drawing["bbox"])],
+        kind="vector",
     )
 
-    response = llm.invoke([message])
+
+def format_classification(classification: DiagramClassification) -> str:
+    """Renders a structured classification in the same shape as a free-text analysis."""
+    components = ", ".join(classification.components) or "none identified"
+    return (
+        f"{classification.diagram_type}. "
+        f"Fan-out/fan-in parallelism: {'yes' if classification.fan_out_fan_in else 'no'}. "
+        f"Components: {components}. Data flow: {classification.data_flow}. "
+        f"{classification.summary}"
+    )
+
+
+def _start_vision_record(provider: str, cache: Optional[ResponseCache]) -> CallRecord:
+    return get_usage_ledger().start(
+        "VisionInspector", None, provider, VISION_MODELS[provider], cache="miss" if cache else "off"
+    )
+
+
+def _record_vision_cache_hit(provider: str) -> None:
+    get_usage_ledger().record_cache_hit("VisionInspector", None, provider, VISION_MODELS[provider])
+
+
+async def _ainvoke_vision(image: ImageRecord, upload: ImageRecord, provider: Tuple[str, str]) -> str:
+    """Single-image vision call; caches successful analyses."""
+    cache = get_vision_cache()
+    record = _start_vision_record(provider[0], cache)
+    try:
+        llm = _build_vision_llm(*provider)
+        start = time.perf_counter()
+        response = await llm.ainvoke([_build_vision_message(upload)], config={"callbacks": record.callbacks()})
+        _log_upload(image, upload, time.perf_counter() - start)
+    except Exception as e:
+        record.finish("failed")
+        return _failed_analysis(image, e)
+    record.finish("ok")
+    if cache:
+        cache.put(_vision_cache_key(image, provider[0]), {"analysis": response.content})
     return response.content
 
 
-def _analyze_with_openai(image_path: str, api_key: str) -> str:
-    """Analyze an image using OpenAI GPT-4o's vision capabilities."""
-    import base64
+def is_fallback_analysis(analysis: str) -> bool:
+    """True when analyze_diagram returned metadata instead of a real LLM analysis."""
+    return analysis.startswith(("Multimodal analysis", "Image not found"))
+
+
+# Bump whenever VISION_PROMPT or VISION_BATCH_PROMPT changes so cached analyses are not reused
+VISION_PROMPT_VERSION = "v2"
+
+VISION_MODELS = {"gemini": "gemini-1.5-flash", "openai": "gpt-4o", "fake": "fake-vision"}
+
+_vision_cache: Optional[ResponseCache] = None
+_vision_cache_lock = threading.Lock()
+
+
+def get_vision_cache() -> Optional[ResponseCache]:
+    """
+    Process-wide persistent cache of vision analyses, or None when disabled
+    with AUDIT_VISION_CACHE=0. TTL and size come from
+    AUDIT_VISION_CACHE_TTL (seconds) and AUDIT_VISION_CACHE_MAX_ENTRIES.
+    """
+    global _vision_cache
+    if os.getenv("AUDIT_VISION_CACHE", "1") == "0":
+        return None
+    with _vision_cache_lock:
+        if _vision_cache is None:
+            _vision_cache = ResponseCache(
+                "vision",
+                ttl=float(os.getenv("AUDIT_VISION_CACHE_TTL", 30 * 24 * 3600)),
+                max_entries=int(os.getenv("AUDIT_VISION_CACHE_MAX_ENTRIES", "5000")),
+            )
+        return _vision_cache
+
+
+def vision_page_section() -> Optional[str]:
+    """
+    PageCache section for per-page vision analyses, keyed like the response
+    cache by provider, model and prompt version. None, i.e. no page reuse,
+    for the fake backend, without a provider, or with AUDIT_VISION_CACHE=0
+    (--no-llm-cache).
+    """
+    provider = _vision_provider()
+    if provider is None or provider[0] == "fake" or os.getenv("AUDIT_VISION_CACHE", "1") == "0":
+        return None
+    return f"vision-{provider[0]}-{VISION_MODELS[provider[0]]}-{VISION_PROMPT_VERSION}"
+
+
+def _vision_cache_key(image: ImageRecord, provider: str) -> str:
+    return fingerprint(image.sha256, VISION_MODELS[provider], VISION_PROMPT_VERSION)
+
+
+VISION_PROMPT = (
+    "Analyze this architectural diagram. Classify it as one of: "
+    "Flow Diagram, Sequence Diagram, State Machine, Component Diagram, or Other. "
+    "Then describe: (1) whether it shows fan-out/fan-in parallelism, "
+    "(2) key components visible, (3) data flow direction. "
+    "Be concise (3-5 sentences)."
+)
+
+
+def prepare_for_upload(image: ImageRecord, max_dim: Optional[int] = None) -> ImageRecord:
+    """
+    Downscaled, metadata-free copy of an image for multimodal upload.
+    max_dim defaults to AUDIT_VISION_MAX_DIM (1024 px on the longest side).
+    Falls back to the original bytes if the image cannot be decoded.
+    """
+    max_dim = max_dim or int(os.getenv("AUDIT_VISION_MAX_DIM", "1024"))
+    try:
+        data, ext, width, height = downscale_image(image.data, max_dim=max_dim)
+    except Exception as e:
+        logger.warning(f"Could not downscale {image.name}, uploading original: {e}")
+        return image
+    return replace(image, data=data, ext=ext, width=width, height=height)
+
+
+def _log_upload(original: ImageRecord, upload: ImageRecord, latency: float, batch: int = 1) -> None:
+    request = f"batch of {batch}, " if batch > 1 else ""
+    logger.info(
+        f"Vision upload {original.name}: {len(original.data)} -> {len(upload.data)} bytes "
+        f"({original.width}x{original.height} -> {upload.width}x{upload.height}), "
+        f"{request}latency {latency:.2f}s"
+    )
+
+
+def _vision_provider() -> Optional[Tuple[str, str]]:
+    """(provider, api_key) for the configured multimodal LLM; Gemini preferred."""
+    if llm_backend() == "fake":
+        return "fake", ""
+    google_key = os.getenv("GOOGLE_API_KEY")
+    if google_key:
+        return "gemini", google_key
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if openai_key:
+        return "openai", openai_key
+    return None
+
+
+def _skipped_analysis(image: ImageRecord) -> str:
+    return (
+        f"Multimodal analysis skipped (no API key configured). "
+        f"Image metadata: format=.{image.ext}, size={len(image.data)} bytes. "
+        f"To enable: set GOOGLE_API_KEY or OPENAI_API_KEY."
+    )
+
+
+def _failed_analysis(image: ImageRecord, error: Exception) -> str:
+    logger.warning(f"Multimodal analysis failed, falling back to metadata: {error}")
+    return (
+        f"Multimodal analysis attempted but failed: {str(error)}. "
+        f"Image metadata: format=.{image.ext}, size={len(image.data)} bytes."
+    )
+
+
+def _build_vision_llm(provider: str, api_key: str):
+    """Vision-capable chat model for the provider, paced by its shared rate limiter."""
+    if provider == "fake":
+        from src.fake_llm import FakeChatModel
+
+        return FakeChatModel.from_env(VISION_MODELS["fake"])
+    if provider == "gemini":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        return ChatGoogleGenerativeAI(
+            model=VISION_MODELS["gemini"],
+            temperature=0,
+            google_api_key=api_key,
+            rate_limiter=get_rate_limiter("gemini"),
+        )
+
     from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=VISION_MODELS["openai"],
+        temperature=0,
+        api_key=api_key,
+        rate_limiter=get_rate_limiter("openai"),
+    )
+
+
+VISION_BATCH_PROMPT = (
+    "You are given {count} images, each preceded by its label 'Image N'. "
+    "For every image, classify it as one of: Flow Diagram, Sequence Diagram, "
+    "State Machine, Component Diagram, or Other, and report whether it shows "
+    "fan-out/fan-in parallelism, its key components and its data flow direction. "
+    "Return exactly one classification per image, using its N as image_index."
+)
+
+
+def _build_batch_message(images: List[ImageRecord]):
+    """HumanMessage carrying the batch prompt and each image after its 'Image N' label."""
     from langchain_core.messages import HumanMessage
 
-    with open(image_path, "rb") as f:
-        image_data = base64.b64encode(f.read()).decode("utf-8")
+    content = [{"type": "text", "text": VISION_BATCH_PROMPT.format(count=len(images))}]
+    for position, image in enumerate(images, start=1):
+        content.append({"type": "text", "text": f"Image {position}:"})
+        content.append({"type": "image_url", "image_url": {"url": image.data_url}})
+    return HumanMessage(content=content)
+
 
-    ext = os.path.splitext(image_path)[1].lower().replace(".", "")
-    mime_map = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}
-    mime_type = mime_map.get(ext, "image/png")
+def _build_vision_message(image: ImageRecord):
+    """HumanMessage carrying the vision prompt and the image's base64 data URL."""
+    from langchain_core.messages import HumanMessage
 
-    llm = ChatOpenAI(model="gpt-4o", temperature=0, api_key=api_key)
-    message = HumanMessage(
+    return HumanMessage(
         content=[
-            {"type": "text", "text": (
-                "Analyze this architectural diagram. Classify it as one of: "
-                "Flow Diagram, Sequence Diagram, State Machine, Component Diagram, or Other. "
-                "Then describe: (1) whether it shows fan-out/fan-in parallelism, "
-                "(2) key components visible, (3) data flow direction. "
-                "Be concise (3-5 sentences)."
-            )},
-            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}},
+            {"type": "text", "text": VISION_PROMPT},
+            {"type": "image_url", "image_url": {"url": image.data_url}},
         ]
     )
-
-    response = llm.invoke([message])
-    return response.content
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.tools.concept_index import ConceptIndex, normalize_text
+from src.tools.doc_tools import DocAnalyst
+
+
+class TestConceptIndex(unittest.TestCase):
+    def setUp(self):
+        self.chunks = [
+            {"page": 1, "heading": "Intro", "content": "We describe the overall goals of the auditor."},
+            {"page": 2, "heading": "Graph", "content": "Detectives run in a fan-out/fan-in topology."},
+            {"page": 3, "heading": "Judges", "content": "Opinions are merged by dialec-\ntical synthesis."},
+            {"page": 4, "heading": "Ops", "content": "The fan out step is bounded by a semaphore."},
+        ]
+        self.index = ConceptIndex(self.chunks)
+
+    def test_normalization(self):
+        self.assertEqual(normalize_text("Fan-In / Fan-Out"), "fan in fan out")
+        self.assertEqual(normalize_text("Dialec-\ntical  Synthesis"), "dialectical synthesis")
+
+    def test_variant_spellings_match(self):
+        matches = self.index.search("Fan-In / Fan-Out")
+        self.assertEqual(matches[0]["chunk_id"], 1)
+        self.assertEqual(matches[0]["score"], 1.0)
+        self.assertIn(3, [m["chunk_id"] for m in matches])
+
+        matches = self.index.search("Dialectical Synthesis")
+        self.assertEqual([m["chunk_id"] for m in matches], [2])
+
+    def test_unrelated_term_not_found(self):
+        self.assertEqual(self.index.search("Metacognition"), [])
+
+    def test_doc_analyst_reports_scores(self):
+        analyst = DocAnalyst()
+        analyst._chunks = self.chunks
+        concepts = analyst.query_concepts("", ["Fan-In / Fan-Out", "Metacognition"])
+        self.assertIn("match_score=1.00", concepts["Fan-In / Fan-Out"])
+        self.assertEqual(concepts["Metacognition"], "Term not found.")
+
+    def test_precomputed_retrieval_is_reused(self):
+        analyst = DocAnalyst()
+        analyst._chunks = self.chunks
+        chunk_results = analyst.query_chunks(["Fan-In / Fan-Out"])
+        analyst._index.search = None  # a second retrieval would fail
+        concepts = analyst.query_concepts("", ["Fan-In / Fan-Out"], chunk_results=chunk_results)
+        self.assertIn("match_score=1.00", concepts["Fan-In / Fan-Out"])
+
+
+if __name__ == "__main__":
+    unittest.main()
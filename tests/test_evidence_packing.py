@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.batching import estimate_tokens
+from src.llm_usage import reset_usage_ledger
+from src.nodes.judges import _dimension_case, _format_evidence_with_ids
+from src.state import Evidence
+
+
+def _evidence(goal, content, rationale="Short rationale."):
+    return Evidence(goal=goal, found=True, content=content, location="repo", rationale=rationale, confidence=0.9)
+
+
+class TestEvidencePacking(unittest.TestCase):
+    def test_small_evidence_is_untouched(self):
+        text, ids, dropped = _format_evidence_with_ids([_evidence("a", "tiny")], token_budget=1000)
+        self.assertEqual(ids, ["E1"])
+        self.assertEqual(dropped, 0)
+        self.assertIn("content=tiny", text)
+
+    def test_large_evidence_fits_budget_with_stable_ids(self):
+        git_log = "\n".join(f"abc{i:04d} 2024-01-01: commit message {i}" for i in range(2000))
+        items = [
+            _evidence("git log", "HEAD-MARKER\n" + git_log + "\nTAIL-MARKER"),
+            _evidence("state", "class AgentState(TypedDict): ...", rationale="Reducers found on evidences."),
+            _evidence("topology", "x" * 20000),
+        ]
+        text, ids, dropped = _format_evidence_with_ids(items, token_budget=800)
+
+        self.assertEqual(ids, ["E1", "E2", "E3"])
+        self.assertLessEqual(estimate_tokens(text), 850)
+        self.assertGreater(dropped, 10000)
+        self.assertTrue(text.startswith("[E1]"))
+        self.assertLess(text.index("\n[E2]"), text.index("\n[E3]"))
+        # Rationales and small contents survive; large contents keep head and tail
+        self.assertIn("Reducers found on evidences.", text)
+        self.assertIn("class AgentState(TypedDict): ...", text)
+        self.assertIn("HEAD-MARKER", text)
+        self.assertIn("TAIL-MARKER", text)
+        self.assertIn("chars omitted", text)
+
+    def test_dropped_tokens_are_recorded_in_the_usage_ledger(self):
+        ledger = reset_usage_ledger()
+        evidences = {"big": [_evidence("topology", "x" * 20000)], "small": [_evidence("a", "tiny")]}
+        with patch.dict(os.environ, {"AUDIT_JUDGE_EVIDENCE_TOKENS": "500"}):
+            for dim_id in ("big", "small", "big"):
+                _dimension_case({"id": dim_id, "name": dim_id}, evidences)
+
+        packing = ledger.summary()["evidence_packing"]
+        self.assertEqual(list(packing["by_dimension"]), ["big"])
+        self.assertGreater(packing["dropped_tokens_est"], 4000)
+        self.assertIn("Evidence packing: ~", ledger.format_table())
+
+
+if __name__ == "__main__":
+    unittest.main()
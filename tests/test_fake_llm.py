@@ -0,0 +1,86 @@
+import asyncio
+import os
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.fake_llm import FakeChatModel, FakeRateLimitError, fake_call_stats, parse_latency, reset_fake_call_stats
+from src.nodes import judges
+from src.resilience import classify_error, retry_after_seconds
+from src.state import DiagramBatch, Evidence, JudicialOpinion, JudicialOpinionBatch
+
+
+class TestFakeChatModel(unittest.TestCase):
+    def setUp(self):
+        reset_fake_call_stats()
+        self.messages = [
+            SystemMessage(content=judges.PROSECUTOR_PROMPT),
+            HumanMessage(content="Rubric Dimension: id: graph_orchestration\nEvidence:\n[E1] found=True\n[E2] found=False"),
+        ]
+
+    def test_structured_output_is_deterministic_and_in_persona(self):
+        structured = FakeChatModel(model_name="fake-judge").with_structured_output(JudicialOpinion)
+        first = structured.invoke(self.messages)
+        second = asyncio.run(structured.ainvoke(self.messages))
+
+        self.assertEqual(first.model_dump(), second.model_dump())
+        self.assertEqual(first.judge, "Prosecutor")
+        self.assertEqual(first.criterion_id, "graph_orchestration")
+        self.assertTrue(1 <= first.score <= 3)
+        self.assertEqual(first.cited_evidence, ["E1", "E2"])
+
+    def test_batch_schemas_follow_the_prompt(self):
+        model = FakeChatModel()
+        persona = model.fake_structured(JudicialOpinionBatch, "TECH LEAD\n### Dimension a\nx\n### Dimension b\ny")
+        panel = model.fake_structured(JudicialOpinionBatch, "three-judge panel\nRubric Dimension: id: a")
+        vision = model.fake_structured(DiagramBatch, "Image 1:\n\nImage 2:\n")
+
+        self.assertEqual([o.criterion_id for o in persona.opinions], ["a", "b"])
+        self.assertEqual([o.judge for o in panel.opinions], ["Prosecutor", "Defense", "TechLead"])
+        self.assertEqual([c.image_index for c in vision.classifications], [1, 2])
+
+    def test_injected_errors_look_like_rate_limits(self):
+        model = FakeChatModel(model_name="flaky", error_rate=1.0)
+        with self.assertRaises(FakeRateLimitError) as ctx:
+            model.invoke("hello")
+        self.assertEqual(classify_error(ctx.exception), "transient")
+        self.assertEqual(retry_after_seconds(ctx.exception), 0.05)
+        self.assertEqual(fake_call_stats()["flaky"], {"calls": 1, "errors": 1, "peak_in_flight": 1})
+
+    def test_latency_distributions(self):
+        rng = random.Random(1)
+        self.assertEqual(parse_latency("0.25")(rng), 0.25)
+        self.assertTrue(0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2)
+        self.assertGreater(parse_latency("lognormal:-1,0.5")(rng), 0)
+        with self.assertRaises(ValueError):
+            parse_latency("pareto:1")
+
+
+class TestFakeBackendJudges(unittest.TestCase):
+    def test_judge_node_runs_offline_without_failover(self):
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.9)
+        state = {
+            "rubric_dimensions": [{"id": "dim_0", "name": "Dimension 0"}, {"id": "dim_1", "name": "Dimension 1"}],
+            "evidences": {"dim_0": [evidence], "dim_1": [evidence]},
+            "opinions": [],
+        }
+        env = {"AUDIT_LLM_BACKEND": "fake", "AUDIT_LLM_CACHE": "0", "AUDIT_FAKE_LATENCY": "0.01"}
+        with patch.dict(os.environ, env), patch.object(judges, "llm", judges._build_llm()):
+            self.assertEqual([p for p, _ in judges._judge_providers()], ["fake"])
+            node = judges.get_judge_node("Defense", judges.DEFENSE_PROMPT)
+            first = node(state)["opinions"]
+            second = node(state)["opinions"]
+
+        self.assertEqual([o.model_dump() for o in first], [o.model_dump() for o in second])
+        self.assertTrue(all(o.judge == "Defense" and o.score >= 3 for o in first))
+        self.assertNotIn("failed", first[0].argument)
+
+
+if __name__ == "__main__":
+    unittest.main()
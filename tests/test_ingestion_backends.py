@@ -0,0 +1,142 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from unittest.mock import patch
+
+import fitz
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.tools.doc_tools import DocAnalyst
+from src.tools.ingestion_backends import (
+    DoclingBackend,
+    DoclingWorkerPool,
+    IngestionBackend,
+    _page_ranges,
+    get_ingestion_backend,
+)
+from src.tools.page_cache import PageCache, page_fingerprint
+
+
+class _Session:
+    pages = [{"page": 1, "text": "plain page one"}, {"page": 2, "text": "plain page two"}]
+
+
+class _SlowPool:
+    def warm(self, timeout=None):
+        pass
+
+    def convert(self, pdf_path, page_numbers, timeout):
+        raise FutureTimeoutError()
+
+
+class _PartialPool:
+    def warm(self, timeout=None):
+        pass
+
+    def convert(self, pdf_path, page_numbers, timeout):
+        return {1: "# Heading\nstructured page one", 2: ""}
+
+
+def _no_converter() -> None:
+    pass
+
+
+def _hung_convert(pdf_path, page_numbers):
+    time.sleep(60)
+
+
+def _slow_marked_init() -> None:
+    """Slow start-up that leaves one marker file per worker."""
+    time.sleep(0.5)
+    open(os.path.join(os.environ["DOCLING_TEST_MARKERS"], str(os.getpid())), "w").close()
+
+
+class _HungWorkerPool(DoclingWorkerPool):
+    initializer = staticmethod(_no_converter)
+    convert_fn = staticmethod(_hung_convert)
+
+
+class _SlowStartPool(DoclingWorkerPool):
+    initializer = staticmethod(_slow_marked_init)
+
+
+class TestIngestionBackends(unittest.TestCase):
+    def test_selection(self):
+        self.assertEqual(get_ingestion_backend("pymupdf").name, "pymupdf")
+        self.assertEqual(get_ingestion_backend("docling").cache_section, "doc-docling")
+        with self.assertRaises(ValueError):
+            get_ingestion_backend("ocr")
+
+    @patch.object(DoclingBackend, "available", return_value=True)
+    def test_docling_timeout_falls_back_to_pymupdf(self, _):
+        backend = DoclingBackend(pool=_SlowPool(), timeout=0.1)
+        texts = backend.page_texts("report.pdf", _Session(), [1, 2])
+        self.assertEqual(texts, {1: "plain page one", 2: "plain page two"})
+
+    @patch.object(DoclingBackend, "available", return_value=True)
+    def test_docling_empty_pages_keep_text_layer(self, _):
+        backend = DoclingBackend(pool=_PartialPool())
+        texts = backend.page_texts("report.pdf", _Session(), [1, 2])
+        self.assertEqual(texts[1], "# Heading\nstructured page one")
+        self.assertEqual(texts[2], "plain page two")
+        self.assertEqual(texts.fallback_pages, {2})
+
+    def test_backends_must_implement_page_texts(self):
+        with self.assertRaises(TypeError):
+            IngestionBackend()
+
+    def test_requested_pages_become_contiguous_docling_ranges(self):
+        self.assertEqual(_page_ranges([7, 2, 3, 4, 9, 8]), [(2, 4), (7, 9)])
+
+    @patch.object(DoclingBackend, "available", return_value=True)
+    def test_fallback_pages_are_not_cached_as_docling_output(self, _):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "report.pdf")
+            doc = fitz.open()
+            doc.new_page().insert_text((72, 72), "Fan-In / Fan-Out detail")
+            doc.save(pdf_path)
+            doc.close()
+
+            cache = PageCache(os.path.join(tmp, "cache"))
+            analyst = DocAnalyst(page_cache=cache, backend=DoclingBackend(pool=_SlowPool(), timeout=0.1))
+            analyst.ingest_pdf(pdf_path)
+
+            with fitz.open(pdf_path) as doc:
+                fingerprint = page_fingerprint(doc, doc[0])
+            self.assertIsNone(cache.get(fingerprint, "doc-docling"))
+            self.assertIn("Fan-In", cache.get(fingerprint, "doc")["text"])
+
+
+class TestDoclingWorkerPool(unittest.TestCase):
+    def test_hung_conversion_recycles_the_shared_pool(self):
+        pool = _HungWorkerPool()
+        DoclingWorkerPool._instance = pool
+        self.addCleanup(setattr, DoclingWorkerPool, "_instance", None)
+
+        pool.warm(timeout=30)
+        processes = list(pool._executor._processes.values())
+        self.assertTrue(processes)
+
+        with self.assertRaises(FutureTimeoutError):
+            pool.convert("report.pdf", [1], timeout=1)
+        for process in processes:
+            process.join(timeout=5)
+            self.assertFalse(process.is_alive())
+        self.assertIsNone(DoclingWorkerPool._instance)
+
+    def test_warm_waits_for_every_worker(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"DOCLING_TEST_MARKERS": tmp}):
+            pool = _SlowStartPool(workers=2)
+            self.addCleanup(pool.terminate)
+            pool.warm(timeout=30)
+            self.assertEqual(len(os.listdir(tmp)), 2)
+            pool.warm(timeout=0)  # already warm
+
+
+if __name__ == "__main__":
+    unittest.main()
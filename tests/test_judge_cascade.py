@@ -0,0 +1,126 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.fake_llm import FakeChatModel
+from src.graph import escalation_tasks, judge_error_handler_node, judge_tasks, judicial_quality_router
+from src.llm_usage import UsageLedger
+from src.nodes import judges
+from src.state import Evidence, JudicialOpinion
+
+
+def _opinion(judge, dim_id, score, tier="cheap", source="llm"):
+    return JudicialOpinion(judge=judge, criterion_id=dim_id, score=score, argument="x", tier=tier, source=source)
+
+
+class TestCascadeEscalation(unittest.TestCase):
+    def setUp(self):
+        self.opinions = [
+            # consensus
+            _opinion("Prosecutor", "calm", 3), _opinion("Defense", "calm", 4), _opinion("TechLead", "calm", 3),
+            # spread of 4 > 2
+            _opinion("Prosecutor", "split", 1), _opinion("Defense", "split", 5), _opinion("TechLead", "split", 3),
+            # structured output failed for one persona
+            _opinion("Prosecutor", "broken", 1, source="fallback"),
+            _opinion("Defense", "broken", 3), _opinion("TechLead", "broken", 3),
+        ]
+
+    def test_disagreement_and_failures_escalate(self):
+        self.assertEqual(judges.dimensions_to_escalate(self.opinions), ["split", "broken"])
+        self.assertEqual(judges.dimensions_to_escalate(self.opinions, threshold=4), ["broken"])
+
+    def test_escalated_opinions_supersede_cheap_ones(self):
+        rejudged = [_opinion(j, "split", 3, tier="strong") for j in ("Prosecutor", "Defense", "TechLead")]
+        latest = judges.latest_opinions(self.opinions + rejudged)
+        self.assertEqual(len(latest), 9)
+        self.assertTrue(all(o.tier == "strong" for o in latest if o.criterion_id == "split"))
+        self.assertEqual(judges.dimensions_to_escalate(self.opinions + rejudged), ["broken"])
+
+    def test_router_sends_escalations_back_to_the_strong_judges(self):
+        state = {
+            "rubric_dimensions": [{"id": d, "name": d} for d in ("calm", "split", "broken")],
+            "evidences": {"split": [], "broken": []},
+            "opinions": self.opinions,
+        }
+        with patch.dict(os.environ, {"AUDIT_JUDGE_BATCH_MODE": "dimension"}):
+            sends = judicial_quality_router(state)
+            self.assertEqual(len(sends), 6)
+            self.assertTrue(all(s.arg["judge_tier"] == "strong" for s in sends))
+            self.assertEqual({s.arg["rubric_dimensions"][0]["id"] for s in sends}, {"split", "broken"})
+
+            state["opinions"] = [o for o in self.opinions if o.criterion_id == "calm"]
+            state["rubric_dimensions"] = state["rubric_dimensions"][:1]
+            self.assertEqual(escalation_tasks(state), [])
+            self.assertEqual(judicial_quality_router(state), "chief_justice")
+
+    def test_first_round_runs_on_the_cheap_tier(self):
+        state = {"rubric_dimensions": [{"id": "a", "name": "a"}], "evidences": {}}
+        with patch.dict(os.environ, {"AUDIT_JUDGE_CASCADE": "1", "AUDIT_JUDGE_BATCH_MODE": "dimension"}):
+            self.assertEqual({s.arg["judge_tier"] for s in judge_tasks(state)}, {"cheap"})
+
+    def test_error_handler_fallbacks_are_not_escalations(self):
+        state = {"rubric_dimensions": [{"id": "calm", "name": "calm"}], "opinions": self.opinions[:1]}
+        with patch.dict(os.environ, {"AUDIT_JUDGE_CASCADE": "1"}):
+            fallbacks = judge_error_handler_node(state)["opinions"]
+        self.assertEqual({(o.source, o.tier) for o in fallbacks}, {("fallback", "cheap")})
+        self.assertEqual(len(fallbacks), 2)
+
+
+class TestCheapTierModel(unittest.TestCase):
+    def test_cheap_tier_uses_the_cheap_model_without_failover(self):
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.7)
+        task = {"rubric_dimensions": [{"id": "a", "name": "a"}], "evidences": {"a": [evidence]}, "judge_tier": "cheap"}
+        env = {"AUDIT_LLM_CACHE": "0", "AUDIT_JUDGE_CHEAP_MODEL": "fake-judge-tiny"}
+        with patch.dict(os.environ, env), patch.object(judges, "llm", FakeChatModel(model_name="fake-judge")), \
+                patch.dict(judges._cheap_llms, clear=True):
+            providers = judges._judge_providers("cheap")
+            (opinion,) = judges.get_judge_node("Defense", judges.DEFENSE_PROMPT)(task)["opinions"]
+
+        self.assertEqual([(p, m.model_name) for p, m in providers], [("fake", "fake-judge-tiny")])
+        self.assertEqual(opinion.tier, "cheap")
+
+
+class TestCascadeSummary(unittest.TestCase):
+    def test_escalation_rate_and_savings(self):
+        ledger = UsageLedger()
+        for dim in ("a", "b", "c"):
+            record = ledger.start("Defense", dim, "openai", "gpt-4o-mini", cache="miss", tier="cheap")
+            record.llm_latency_s = 1.0
+            record.finish("ok")
+        record = ledger.start("Defense", "c", "openai", "gpt-4o", cache="miss", tier="strong")
+        record.llm_latency_s = 4.0
+        record.finish("ok")
+        ledger.record_cascade({"a", "b", "c"}, ["c"])
+
+        cascade = ledger.summary()["cascade"]
+        self.assertEqual((cascade["dimensions"], cascade["escalated"]), (3, 1))
+        self.assertAlmostEqual(cascade["escalation_rate"], 0.333)
+        # 2 strong calls (8s) avoided for 3 cheap calls (3s); the escalation was a strong call anyway
+        self.assertAlmostEqual(cascade["llm_s_saved_est"], 5.0)
+        self.assertIn("Cascade: 1/3", ledger.format_table())
+        self.assertIn("~5.0s LLM time saved", ledger.format_table())
+
+    def test_all_escalated_run_is_reported_as_a_cost(self):
+        ledger = UsageLedger()
+        for dim in ("a", "b"):
+            for tier, latency in (("cheap", 1.0), ("strong", 4.0)):
+                record = ledger.start("Defense", dim, "openai", "gpt-4o", cache="miss", tier=tier)
+                record.llm_latency_s = latency
+                record.finish("ok")
+        ledger.record_cascade({"a", "b"}, ["a", "b"])
+
+        cascade = ledger.cascade_summary()
+        self.assertEqual(cascade["escalation_rate"], 1.0)
+        self.assertAlmostEqual(cascade["llm_s_saved_est"], -2.0)
+        self.assertIn("~2.0s extra LLM time", ledger.format_table())
+
+    def test_no_cascade_section_when_off(self):
+        self.assertIsNone(UsageLedger().summary()["cascade"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.nodes import judges
+from src.response_cache import ResponseCache
+from src.state import Evidence, JudicialOpinion, JudicialOpinionBatch
+
+
+def as_raw_output(include_raw):
+    """Shapes answers like with_structured_output(include_raw=True) does."""
+    def wrap(answer):
+        async def _wrapped(prompt_value):
+            parsed = await answer(prompt_value)
+            return {"raw": None, "parsed": parsed, "parsing_error": None} if include_raw else parsed
+        return _wrapped
+    return wrap
+
+
+class FakeJudgeLLM:
+    """Structured-output stand-in that records how many calls overlap."""
+
+    def __init__(self, fail_dimension=None):
+        self.fail_dimension = fail_dimension
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    def with_structured_output(self, schema, include_raw=False):
+        @as_raw_output(include_raw)
+        async def _answer(prompt_value):
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.05)
+            self.in_flight -= 1
+            if self.fail_dimension and self.fail_dimension in prompt_value.to_string():
+                raise RuntimeError("provider unavailable")
+            return JudicialOpinion(judge="TechLead", criterion_id="?", score=3, argument="Looks maintainable [E1].")
+
+        return _answer
+
+
+class FakeBatchLLM:
+    """Answers batch schemas by reading the requested dimensions from the prompt."""
+
+    def __init__(self, drop=()):
+        self.drop = set(drop)
+        self.calls = {"single": 0, "batch": 0}
+
+    def with_structured_output(self, schema, include_raw=False):
+        @as_raw_output(include_raw)
+        async def _answer(prompt_value):
+            text = prompt_value.to_string()
+            if schema is JudicialOpinion:
+                self.calls["single"] += 1
+                return JudicialOpinion(judge="TechLead", criterion_id="?", score=3, argument="Individual [E1].")
+            self.calls["batch"] += 1
+            if "three-judge panel" in text:
+                dim_id = re.search(r"id: (\w+)", text).group(1)
+                pairs = [(judge, dim_id) for judge in ("Prosecutor", "Defense", "TechLead")]
+            else:
+                pairs = [("TechLead", d) for d in re.findall(r"### Dimension (\w+)", text)]
+            return JudicialOpinionBatch(opinions=[
+                JudicialOpinion(judge=judge, criterion_id=dim_id, score=3, argument=f"Batched {judge} [E1].")
+                for judge, dim_id in pairs if dim_id not in self.drop
+            ])
+
+        return _answer
+
+
+class TestJudgeConcurrency(unittest.TestCase):
+    def setUp(self):
+        self.dimensions = [{"id": f"dim_{i}", "name": f"Dimension {i}"} for i in range(6)]
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.9)
+        self.state = {
+            "rubric_dimensions": self.dimensions,
+            "evidences": {d["id"]: [evidence] for d in self.dimensions},
+            "opinions": [],
+        }
+        # Keep these tests off the persistent response cache
+        env = patch.dict(os.environ, {"AUDIT_LLM_CACHE": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_dimensions_judged_concurrently_in_order(self):
+        fake = FakeJudgeLLM()
+        with patch.object(judges, "llm", fake), patch.object(judges, "JUDGE_CONCURRENCY", 3):
+            node = judges.get_judge_node("TechLead", judges.TECH_LEAD_PROMPT)
+            start = time.perf_counter()
+            opinions = node(self.state)["opinions"]
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual([o.criterion_id for o in opinions], [d["id"] for d in self.dimensions])
+        self.assertEqual(fake.peak, 3)
+        # Two waves of 0.05s, no fixed sleeps between dimensions
+        self.assertLess(elapsed, 0.3)
+
+    def test_failed_dimension_falls_back(self):
+        fake = FakeJudgeLLM(fail_dimension="dim_2")
+        no_failover = {"GOOGLE_API_KEY": "", "OPENAI_API_KEY": ""}
+        with patch.dict(os.environ, no_failover), patch.object(judges, "llm", fake), \
+                patch.object(judges, "MAX_RETRIES", 1):
+            node = judges.get_async_judge_node("Prosecutor", judges.PROSECUTOR_PROMPT)
+            opinions = asyncio.run(node(self.state))["opinions"]
+
+        self.assertEqual(opinions[2].argument, judges.FALLBACK_MESSAGES["Prosecutor"])
+        self.assertEqual(opinions[2].score, 1)
+        self.assertLessEqual(opinions[0].score, 3)
+        self.assertEqual(opinions[0].judge, "Prosecutor")
+
+
+class TestJudgeBatching(unittest.TestCase):
+    def setUp(self):
+        self.dimensions = [{"id": f"dim_{i}", "name": f"Dimension {i}"} for i in range(6)]
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.9)
+        self.state = {
+            "rubric_dimensions": self.dimensions,
+            "evidences": {d["id"]: [evidence] for d in self.dimensions},
+            "opinions": [],
+        }
+        # Keep these tests off the persistent response cache
+        env = patch.dict(os.environ, {"AUDIT_LLM_CACHE": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def _run(self, fake, mode, judge_nodes, context_tokens="1000000"):
+        env = {"AUDIT_JUDGE_BATCH_MODE": mode, "AUDIT_JUDGE_CONTEXT_TOKENS": context_tokens}
+        with patch.dict(os.environ, env), patch.object(judges, "llm", fake):
+            return [judges.get_judge_node(name, prompt)(self.state)["opinions"] for name, prompt in judge_nodes]
+
+    def test_persona_mode_one_call_with_individual_fallback(self):
+        fake = FakeBatchLLM(drop={"dim_4"})
+        (opinions,) = self._run(fake, "persona", [("TechLead", judges.TECH_LEAD_PROMPT)])
+        self.assertEqual(fake.calls, {"single": 1, "batch": 1})
+        self.assertEqual([o.criterion_id for o in opinions], [d["id"] for d in self.dimensions])
+        self.assertTrue(opinions[0].argument.startswith("Batched"))
+        self.assertTrue(opinions[4].argument.startswith("Individual"))
+
+    def test_persona_mode_splits_to_fit_context_window(self):
+        fake = FakeBatchLLM()
+        self._run(fake, "persona", [("TechLead", judges.TECH_LEAD_PROMPT)], context_tokens="6000")
+        self.assertGreater(fake.calls["batch"], 1)
+        self.assertEqual(fake.calls["single"], 0)
+
+    def test_persona_batches_fit_the_targeted_models_window(self):
+        strong, cheap = FakeBatchLLM(), FakeBatchLLM()
+        strong.model_name, cheap.model_name = "gemini-1.5-flash", "tiny-judge"
+        self.state["judge_tier"] = "cheap"
+        with patch.dict(os.environ, {"AUDIT_JUDGE_BATCH_MODE": "persona"}), \
+                patch.dict(judges.MODEL_CONTEXT_TOKENS, {"tiny-judge": 6000}), \
+                patch.object(judges, "llm", strong), \
+                patch.object(judges, "_judge_providers", return_value=[("fake", cheap)]):
+            judges.get_judge_node("TechLead", judges.TECH_LEAD_PROMPT)(self.state)
+        self.assertGreater(cheap.calls["batch"], 1)
+
+    def test_panel_mode_shares_one_call_per_dimension(self):
+        fake = FakeBatchLLM()
+        personas = [
+            ("Prosecutor", judges.PROSECUTOR_PROMPT),
+            ("Defense", judges.DEFENSE_PROMPT),
+            ("TechLead", judges.TECH_LEAD_PROMPT),
+        ]
+        results = self._run(fake, "panel", personas)
+        self.assertEqual(fake.calls, {"single": 0, "batch": 6})
+        for (name, _), opinions in zip(personas, results):
+            self.assertTrue(all(o.judge == name and f"Batched {name}" in o.argument for o in opinions))
+
+class TestJudgeFastPath(unittest.TestCase):
+    def setUp(self):
+        confident = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.95)
+        missing = Evidence(goal="g", found=False, location="src/graph.py", rationale="r", confidence=0.9)
+        shaky = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.5)
+        self.state = {
+            "rubric_dimensions": [
+                {"id": "established", "name": "Established"},
+                {"id": "absent", "name": "Absent"},
+                {"id": "mixed", "name": "Mixed"},
+            ],
+            "evidences": {"established": [confident, confident], "absent": [missing], "mixed": [confident, shaky]},
+            "opinions": [],
+        }
+        env = patch.dict(os.environ, {"AUDIT_LLM_CACHE": "0", "AUDIT_JUDGE_FAST_PATH": "1"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_decisive_dimensions_skip_the_llm(self):
+        fake = FakeJudgeLLM()
+        with patch.object(judges, "llm", fake):
+            opinions = judges.get_judge_node("Defense", judges.DEFENSE_PROMPT)(self.state)["opinions"]
+
+        self.assertEqual(fake.calls, 1)
+        self.assertEqual([o.criterion_id for o in opinions], ["established", "absent", "mixed"])
+        self.assertEqual([o.source for o in opinions], ["fast-path", "fast-path", "llm"])
+        self.assertEqual((opinions[0].score, opinions[1].score), (5, 2))
+        self.assertEqual(opinions[0].cited_evidence, ["E1", "E2"])
+        self.assertIn("[E1]", opinions[1].argument)
+
+    def test_panel_mode_with_everything_decisive_makes_no_calls(self):
+        fake = FakeBatchLLM()
+        self.state["rubric_dimensions"] = self.state["rubric_dimensions"][:2]
+        with patch.dict(os.environ, {"AUDIT_JUDGE_BATCH_MODE": "panel"}), patch.object(judges, "llm", fake):
+            opinions = judges.get_judge_node("Prosecutor", judges.PROSECUTOR_PROMPT)(self.state)["opinions"]
+        self.assertEqual(fake.calls, {"single": 0, "batch": 0})
+        self.assertEqual([o.score for o in opinions], [3, 1])
+
+    def test_report_passages_do_not_decide_the_fast_path(self):
+        finding = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.95)
+        missing = Evidence(goal="g", found=False, location="src/graph.py", rationale="r", confidence=0.9)
+        passage = Evidence(goal="p", found=True, location="report.pdf", rationale="r", confidence=0.6, context=True)
+        self.assertEqual(judges._decisive_evidence([finding, passage]), "established")
+        self.assertEqual(judges._decisive_evidence([missing, passage]), "absent")
+        with patch.dict(os.environ, {"AUDIT_FAST_PATH_MIN_EVIDENCE": "2"}):
+            self.assertIsNone(judges._decisive_evidence([finding, passage]))
+
+    def test_source_is_not_in_the_llm_schema(self):
+        self.assertNotIn("source", JudicialOpinion.model_json_schema()["properties"])
+
+
+class TestJudgeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache("judge", path=os.path.join(self.tmp.name, "responses.sqlite"))
+        judges.set_judge_cache(self.cache)
+        self.addCleanup(judges.set_judge_cache, None)
+        self.addCleanup(self.tmp.cleanup)
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.9)
+        self.state = {
+            "rubric_dimensions": [{"id": "dim_0", "name": "Dimension 0"}, {"id": "dim_1", "name": "Dimension 1"}],
+            "evidences": {"dim_0": [evidence], "dim_1": [evidence]},
+            "opinions": [],
+        }
+
+    def test_rerun_with_unchanged_evidence_is_served_from_cache(self):
+        fake = FakeJudgeLLM()
+        with patch.object(judges, "llm", fake):
+            node = judges.get_judge_node("TechLead", judges.TECH_LEAD_PROMPT)
+            first = node(self.state)["opinions"]
+            second = node(self.state)["opinions"]
+            self.state["evidences"]["dim_1"] = []
+            node(self.state)
+
+        self.assertEqual(fake.calls, 3)
+        self.assertEqual([o.model_dump() for o in first], [o.model_dump() for o in second])
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 3))
+
+    def test_disabled_cache_is_bypassed(self):
+        with patch.dict(os.environ, {"AUDIT_LLM_CACHE": "0"}):
+            self.assertIsNone(judges.get_judge_cache())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.graph import evidence_quality_router, graph_run_config, judge_tasks
+from src.nodes.judges import judicial_aggregator_node
+from src.state import Evidence, JudicialOpinion
+
+
+class TestJudgeTasks(unittest.TestCase):
+    def setUp(self):
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.9)
+        self.dimensions = [{"id": f"dim_{i}", "name": f"Dimension {i}"} for i in range(4)]
+        self.state = {
+            "rubric_dimensions": self.dimensions,
+            "evidences": {d["id"]: [evidence] for d in self.dimensions},
+            "opinions": [],
+        }
+
+    def test_one_task_per_persona_and_dimension_with_only_its_evidence(self):
+        with patch.dict(os.environ, {"AUDIT_JUDGE_BATCH_MODE": "dimension"}):
+            sends = evidence_quality_router(self.state)
+
+        self.assertEqual(len(sends), 3 * len(self.dimensions))
+        self.assertEqual({s.node for s in sends}, {"prosecutor", "defense", "tech_lead"})
+        for send in sends:
+            (dim,) = send.arg["rubric_dimensions"]
+            self.assertEqual(list(send.arg["evidences"]), [dim["id"]])
+
+    def test_persona_mode_keeps_one_task_per_persona(self):
+        with patch.dict(os.environ, {"AUDIT_JUDGE_BATCH_MODE": "persona"}):
+            sends = judge_tasks(self.state)
+        self.assertEqual([s.node for s in sends], ["prosecutor", "defense", "tech_lead"])
+        self.assertEqual(len(sends[0].arg["rubric_dimensions"]), len(self.dimensions))
+
+    def test_aggregator_does_not_re_emit_reduced_opinions(self):
+        self.state["opinions"] = [JudicialOpinion(judge="TechLead", criterion_id="dim_0", score=3, argument="ok")]
+        self.assertEqual(judicial_aggregator_node(self.state), {})
+
+    def test_global_concurrency_limit(self):
+        with patch.dict(os.environ, {"AUDIT_GRAPH_CONCURRENCY": "5"}):
+            self.assertEqual(graph_run_config(), {"max_concurrency": 5})
+
+
+if __name__ == "__main__":
+    unittest.main()
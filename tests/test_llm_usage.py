@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.fake_llm import FakeChatModel
+from src.llm_usage import CallRecord, UsageLedger, get_usage_ledger, reset_usage_ledger
+from src.nodes import judges
+from src.resilience import reset_circuit_breakers
+from src.state import Evidence, JudicialOpinion
+
+
+class TestUsageLedger(unittest.TestCase):
+    def test_callbacks_record_tokens_latency_and_attempts(self):
+        ledger = UsageLedger()
+        record = ledger.start("TechLead", "dim_0", "fake", "fake-judge", cache="miss")
+        model = FakeChatModel(model_name="fake-judge", latency="0.01")
+        model.with_structured_output(JudicialOpinion).invoke(
+            "TECH LEAD\nRubric Dimension: id: dim_0", config={"callbacks": record.callbacks()}
+        )
+        record.finish("ok")
+
+        self.assertEqual((record.attempts, record.retries), (1, 0))
+        self.assertGreater(record.input_tokens, 0)
+        self.assertGreater(record.output_tokens, 0)
+        self.assertGreaterEqual(record.llm_latency_s, 0.01)
+        self.assertGreaterEqual(record.wall_s, record.llm_latency_s)
+
+    def test_summary_aggregates_and_costs(self):
+        ledger = UsageLedger()
+        for node, dim in (("Prosecutor", "a"), ("Defense", "a"), ("Defense", "b")):
+            record = ledger.start(node, dim, "openai", "gpt-4o", cache="miss")
+            record.input_tokens, record.output_tokens, record.attempts = 1_000_000, 100_000, 2
+            record.finish("ok")
+        ledger.record_cache_hit("Defense", "b", "openai", "gpt-4o")
+
+        summary = ledger.summary()
+        self.assertEqual(summary["totals"]["calls"], 4)
+        self.assertEqual(summary["totals"]["cache_hits"], 1)
+        self.assertEqual(summary["totals"]["retries"], 3)
+        self.assertAlmostEqual(summary["totals"]["cost_usd"], 3 * 3.5)
+        self.assertEqual(summary["by_node"]["Defense"]["calls"], 3)
+        self.assertEqual(summary["by_dimension"]["a"]["input_tokens"], 2_000_000)
+        self.assertIn("TOTAL", ledger.format_table())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = ledger.write_json(os.path.join(tmp, "out", "llm_usage.json"))
+            with open(path) as f:
+                self.assertEqual(len(json.load(f)["calls"]), 4)
+
+
+class TestJudgeUsage(unittest.TestCase):
+    def setUp(self):
+        reset_usage_ledger()
+        self.addCleanup(reset_circuit_breakers)
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.7)
+        self.state = {
+            "rubric_dimensions": [{"id": "dim_0", "name": "Dimension 0"}],
+            "evidences": {"dim_0": [evidence]},
+            "opinions": [],
+        }
+
+    def test_judge_calls_and_retries_are_recorded(self):
+        flaky = FakeChatModel(model_name="fake-judge", error_rate=1.0)
+        env = {"AUDIT_LLM_CACHE": "0", "AUDIT_RETRY_BASE_DELAY": "0"}
+        with patch.dict(os.environ, env), patch.object(judges, "llm", flaky), patch.object(judges, "MAX_RETRIES", 2):
+            judges.get_judge_node("TechLead", judges.TECH_LEAD_PROMPT)(self.state)
+
+        (record,) = get_usage_ledger().records
+        self.assertIsInstance(record, CallRecord)
+        self.assertEqual((record.node, record.dimension, record.provider), ("TechLead", "dim_0", "fake"))
+        self.assertEqual((record.status, record.attempts, record.retries, record.cache), ("failed", 2, 1, "off"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import fitz
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.tools.doc_tools import DocAnalyst
+from src.tools.page_cache import PageCache, page_fingerprint
+
+
+def _write_pdf(path: str, page_texts):
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+
+
+class TestIncrementalIngestion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.pdf_path = os.path.join(self.tmp.name, "report.pdf")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unchanged_pages_are_reused(self):
+        pages = ["Dialectical Synthesis intro", "Fan-In / Fan-Out detail", "Metacognition notes"]
+        _write_pdf(self.pdf_path, pages)
+
+        first_cache = PageCache(self.cache_dir)
+        first_text = DocAnalyst(page_cache=first_cache).ingest_pdf(self.pdf_path)
+        self.assertEqual(first_cache.reused, 0)
+        self.assertEqual(first_cache.reprocessed, 3)
+
+        # Resubmission with only the middle page edited
+        _write_pdf(self.pdf_path, [pages[0], "Fan-In / Fan-Out revised", pages[2]])
+        second_cache = PageCache(self.cache_dir)
+        analyst = DocAnalyst(page_cache=second_cache)
+        second_text = analyst.ingest_pdf(self.pdf_path)
+
+        self.assertEqual(second_cache.reused, 2)
+        self.assertEqual(second_cache.reprocessed, 1)
+        self.assertIn("revised", second_text)
+        self.assertNotEqual(first_text, second_text)
+        self.assertEqual([c["page"] for c in analyst._chunks], [1, 2, 3])
+
+    def test_text_inside_a_form_xobject_changes_the_fingerprint(self):
+        def fingerprint(text):
+            source = fitz.open()
+            source.new_page().insert_text((72, 72), text)
+            doc = fitz.open()
+            page = doc.new_page()
+            page.show_pdf_page(page.rect, source, 0)  # draws the source page as a Form XObject
+            return page_fingerprint(doc, page), page.read_contents()
+
+        (first, contents), (second, same_contents) = fingerprint("Fan-In"), fingerprint("Fan-Out")
+        self.assertEqual(contents, same_contents)
+        self.assertNotEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
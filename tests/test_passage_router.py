@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.nodes.detectives import REPORT_PASSAGES_PREFIX, evidence_aggregator_node
+from src.nodes.judges import _evidence_stats, _format_evidence_with_ids
+from src.state import Evidence
+from src.tools.passage_router import PassageRouter
+
+
+class TestPassageRouter(unittest.TestCase):
+    def setUp(self):
+        self.chunks = [
+            {"page": 1, "heading": "History", "content": "Our git commit history shows atomic commits and progression."},
+            {"page": 2, "heading": "State", "content": "AgentState uses Pydantic models and Annotated reducers."},
+            {"page": 3, "heading": "Misc", "content": "Acknowledgements and thanks to the team."},
+        ]
+        self.dimensions = [
+            {"id": "git", "name": "Git", "forensic_instruction": "Inspect the commit history",
+             "success_pattern": "Atomic commits with progression"},
+            {"id": "state", "name": "State", "forensic_instruction": "Find Pydantic state",
+             "success_pattern": "Annotated reducers on AgentState"},
+            {"id": "vision", "name": "Vision", "forensic_instruction": "Diagrams", "success_pattern": ""},
+        ]
+
+    def test_each_dimension_gets_its_passage(self):
+        routed = PassageRouter(self.chunks).route(self.dimensions, top_k=2)
+        self.assertEqual(routed["git"][0]["chunk_id"], 0)
+        self.assertEqual(routed["state"][0]["chunk_id"], 1)
+        self.assertEqual(routed["vision"], [])
+        self.assertLessEqual(len(routed["git"]), 2)
+
+    def test_aggregator_folds_passages_into_dimension(self):
+        repo_ev = Evidence(goal="repo", found=True, location="x", rationale="r", confidence=1.0)
+        passage_ev = Evidence(goal="passage", found=True, location="y", rationale="r", confidence=0.6)
+        state = {
+            "available_artifacts": ["repo", "pdf"],
+            "evidences": {"git": [repo_ev], f"{REPORT_PASSAGES_PREFIX}git": [passage_ev]},
+        }
+        out = evidence_aggregator_node(state)
+        self.assertEqual(out["evidences"]["git"], [repo_ev, passage_ev])
+
+    def test_passages_do_not_move_the_evidence_stats(self):
+        repo_ev = Evidence(goal="repo", found=False, location="x", rationale="r", confidence=1.0)
+        passage_ev = Evidence(goal="passage", found=True, location="y", rationale="r", confidence=0.6, context=True)
+        self.assertEqual(_evidence_stats([repo_ev, passage_ev]), (0.0, 1.0))
+        text, ids, _ = _format_evidence_with_ids([repo_ev, passage_ev])
+        self.assertEqual(ids, ["E1", "E2"])
+        self.assertIn("[E2] context (not scored) goal=passage", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
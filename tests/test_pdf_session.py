@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import fitz
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.nodes.detectives import context_builder_node, evidence_aggregator_node
+from src.tools.doc_tools import DocAnalyst
+from src.tools.pdf_session import close_pdf_sessions, get_pdf_session
+from src.tools.vision_tools import VisionInspector
+
+
+class TestPdfSession(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp.name, "report.pdf")
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 72), "Figure 1: ChiefJustice synthesis")
+        pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 16, 16), False)
+        pix.clear_with(200)
+        page.insert_image(fitz.Rect(72, 100, 172, 200), pixmap=pix)
+
+        # Page 2: a draw.io-style vector diagram plus an underline that is not a figure
+        page = doc.new_page()
+        page.draw_line((72, 80), (300, 80))
+        for x in (100, 250, 400):
+            page.draw_rect(fitz.Rect(x, 300, x + 100, 350))
+        page.draw_line((150, 350), (300, 420))
+        page.draw_line((450, 350), (300, 420))
+        page.draw_rect(fitz.Rect(250, 420, 350, 470))
+        doc.save(self.pdf_path)
+        doc.close()
+
+    def tearDown(self):
+        close_pdf_sessions()
+        self.tmp.cleanup()
+
+    def test_released_when_the_detectives_fan_in(self):
+        session = get_pdf_session(self.pdf_path)
+        evidence_aggregator_node({"pdf_path": self.pdf_path, "evidences": {}, "available_artifacts": ["pdf"]})
+        self.assertTrue(session.closed)
+        self.assertIsNot(session, get_pdf_session(self.pdf_path))
+
+    def test_concurrent_audit_keeps_the_session_open(self):
+        audit = {"pdf_path": self.pdf_path, "evidences": {}, "available_artifacts": ["pdf"]}
+        context_builder_node(audit)
+        context_builder_node(audit)
+        session = get_pdf_session(self.pdf_path)
+
+        evidence_aggregator_node(audit)
+        self.assertFalse(session.closed)
+        self.assertIs(session, get_pdf_session(self.pdf_path))
+        evidence_aggregator_node(audit)
+        self.assertTrue(session.closed)
+
+    def test_single_walk_shared_and_closed(self):
+        session = get_pdf_session(self.pdf_path)
+        self.assertIs(session, get_pdf_session(self.pdf_path))
+
+        page = session.pages[0]
+        self.assertIn("ChiefJustice", page["text"])
+        self.assertTrue(any("ChiefJustice" in s["text"] for s in page["spans"]))
+        self.assertEqual(len(page["images"]), 1)
+        self.assertEqual(page["images"][0]["rects"][0], (72.0, 100.0, 172.0, 200.0))
+        self.assertIn("image", session.extract_image(page["images"][0]["xref"]))
+
+        figures = session.pages[1]["drawings"]
+        self.assertEqual(len(figures), 1)
+        self.assertEqual(figures[0]["bbox"], (100.0, 300.0, 500.0, 470.0))
+        rendered = session.render_region(2, figures[0]["bbox"], dpi=72)
+        self.assertEqual((rendered["width"], rendered["height"]), (400, 170))
+
+        vision_pages = VisionInspector().extract_images_by_page(self.pdf_path, session=session)
+        vector = vision_pages[1]["images"][0]
+        self.assertEqual((vector.kind, vector.name, vector.xref), ("vector", "page2_vector1.png", 0))
+
+        analyst = DocAnalyst()
+        self.assertIn("ChiefJustice", analyst.ingest_pdf(self.pdf_path, session=session))
+
+        close_pdf_sessions(self.pdf_path)
+        self.assertTrue(session.closed)
+        self.assertIsNot(session, get_pdf_session(self.pdf_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.nodes import judges
+from src.resilience import (
+    CircuitBreaker,
+    ProviderUnavailable,
+    acall_with_retries,
+    classify_error,
+    reset_circuit_breakers,
+    retry_after_seconds,
+)
+from src.state import Evidence, JudicialOpinion
+
+
+def as_raw_output(include_raw):
+    """Shapes answers like with_structured_output(include_raw=True) does."""
+    def wrap(answer):
+        async def _wrapped(prompt_value):
+            parsed = await answer(prompt_value)
+            return {"raw": None, "parsed": parsed, "parsing_error": None} if include_raw else parsed
+        return _wrapped
+    return wrap
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, message="quota exceeded", retry_after=None):
+        super().__init__(message)
+        self.response = SimpleNamespace(headers={"retry-after": retry_after} if retry_after else {})
+
+
+class AuthenticationError(Exception):
+    status_code = 401
+
+
+class FlakyLLM:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def with_structured_output(self, schema, include_raw=False):
+        @as_raw_output(include_raw)
+        async def _answer(prompt_value):
+            self.calls += 1
+            if self.error:
+                raise self.error
+            return JudicialOpinion(judge="TechLead", criterion_id="?", score=3, argument="Backup answer [E1].")
+
+        return _answer
+
+
+class TestRetrySignals(unittest.TestCase):
+    def test_retry_after_sources(self):
+        self.assertEqual(retry_after_seconds(RateLimitError(retry_after="7")), 7.0)
+        self.assertEqual(retry_after_seconds(Exception("429 Resource exhausted. Please retry in 12.5s.")), 12.5)
+        self.assertEqual(retry_after_seconds(Exception("retry_delay {\n  seconds: 3\n}")), 3.0)
+        self.assertIsNone(retry_after_seconds(ValueError("bad json")))
+
+    def test_classification(self):
+        self.assertEqual(classify_error(RateLimitError()), "transient")
+        self.assertEqual(classify_error(asyncio.TimeoutError()), "transient")
+        self.assertEqual(classify_error(AuthenticationError()), "fatal")
+        self.assertEqual(classify_error(ValueError("schema mismatch")), "output")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, {"AUDIT_RETRY_BASE_DELAY": "0.001"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_opens_after_consecutive_failures_then_probes(self):
+        breaker = CircuitBreaker("gemini", failure_threshold=2, reset_timeout=0.05)
+
+        async def failing():
+            raise RateLimitError()
+
+        with self.assertRaises(ProviderUnavailable):
+            asyncio.run(acall_with_retries(failing, breaker, "test", max_attempts=5))
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())  # half-open probe
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_timeout_and_long_retry_after_fail_fast(self):
+        async def slow():
+            await asyncio.sleep(1)
+
+        async def throttled():
+            raise RateLimitError(retry_after="120")
+
+        start = time.perf_counter()
+        with self.assertRaises(Exception):
+            asyncio.run(acall_with_retries(slow, CircuitBreaker("a"), "slow", max_attempts=2, timeout=0.05))
+        with self.assertRaises(ProviderUnavailable):
+            asyncio.run(acall_with_retries(throttled, CircuitBreaker("b"), "throttled", max_attempts=3))
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_rate_limiter_wait_is_not_timed(self):
+        class SlowLimiter:
+            async def aacquire(self):
+                await asyncio.sleep(0.1)
+
+        async def fast():
+            return "ok"
+
+        breaker = CircuitBreaker("c")
+        result = asyncio.run(
+            acall_with_retries(fast, breaker, "queued", max_attempts=1, timeout=0.05, rate_limiter=SlowLimiter())
+        )
+        self.assertEqual((result, breaker.failures), ("ok", 0))
+
+    def test_cancelled_probe_reopens_the_circuit(self):
+        breaker = CircuitBreaker("d", failure_threshold=1, reset_timeout=0.05)
+        breaker.trip()
+        time.sleep(0.06)
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        async def cancelled_probe():
+            await asyncio.wait_for(acall_with_retries(hang, breaker, "probe", max_attempts=1, timeout=5), 0.05)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(cancelled_probe())
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())  # a new probe is let through
+
+
+class TestJudgeFailover(unittest.TestCase):
+    def setUp(self):
+        reset_circuit_breakers()
+        self.addCleanup(reset_circuit_breakers)
+        env = patch.dict(os.environ, {
+            "AUDIT_LLM_CACHE": "0", "AUDIT_RETRY_BASE_DELAY": "0.001", "AUDIT_BREAKER_FAILURES": "3",
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.9)
+        dimensions = [{"id": f"dim_{i}", "name": f"Dimension {i}"} for i in range(6)]
+        self.state = {
+            "rubric_dimensions": dimensions,
+            "evidences": {d["id"]: [evidence] for d in dimensions},
+            "opinions": [],
+        }
+
+    def test_rate_limited_provider_fails_over(self):
+        primary, backup = FlakyLLM(RateLimitError()), FlakyLLM()
+        providers = [("primary", primary), ("backup", backup)]
+        with patch.object(judges, "_judge_providers", return_value=providers):
+            opinions = judges.get_judge_node("TechLead", judges.TECH_LEAD_PROMPT)(self.state)["opinions"]
+
+        self.assertTrue(all("Backup answer" in o.argument for o in opinions))
+        # The breaker opened after 3 failures, so later dimensions skipped the primary
+        self.assertLess(primary.calls, 6 * judges.MAX_RETRIES)
+
+    def test_provider_clients_do_not_retry_on_their_own(self):
+        env = {"OPENAI_API_KEY": "sk-test", "GOOGLE_API_KEY": "test-key", "AUDIT_LLM_TIMEOUT": "20"}
+        with patch.dict(os.environ, env):
+            for provider in ("openai", "gemini"):
+                model = judges._build_llm(provider)
+                self.assertEqual(model.max_retries, 0)
+                timeout = getattr(model, "request_timeout", None) or model.timeout
+                self.assertEqual(timeout, 20.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.response_cache import ResponseCache, fingerprint
+from src.tools.vision_tools import ImageRecord, VisionInspector
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "responses.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_miss_and_persistence(self):
+        cache = ResponseCache("vision", path=self.path)
+        key = fingerprint("sha", "model", "v1")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {"analysis": "Flow Diagram"})
+
+        reopened = ResponseCache("vision", path=self.path)
+        self.assertEqual(reopened.get(key), {"analysis": "Flow Diagram"})
+        self.assertEqual((cache.misses, reopened.hits), (1, 1))
+        # Namespaces are isolated
+        self.assertIsNone(ResponseCache("judge", path=self.path).get(key))
+
+    def test_ttl_and_lru_eviction(self):
+        cache = ResponseCache("vision", path=self.path, ttl=0.05, max_entries=2)
+        cache.put("a", 1)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("a"))
+
+        cache.ttl = 60
+        for key in ("a", "b", "c"):
+            cache.put(key, key)
+            time.sleep(0.01)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "c")
+
+    def test_vision_analysis_served_from_cache(self):
+        cache = ResponseCache("vision", path=self.path)
+        llm = MagicMock()
+        llm.invoke.return_value.content = "Flow Diagram with fan-out."
+        image = ImageRecord(data=b"not decodable", ext="png", page=1, xref=3, width=1, height=1)
+
+        with patch.dict(os.environ, {"GOOGLE_API_KEY": "test-key"}), \
+                patch("src.tools.vision_tools.get_vision_cache", return_value=cache), \
+                patch("src.tools.vision_tools._build_vision_llm", return_value=llm):
+            first = VisionInspector.analyze_diagram(image)
+            second = VisionInspector.analyze_diagram(image)
+
+        self.assertEqual(first, second)
+        self.assertEqual(llm.invoke.call_count, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.fake_llm import FakeChatModel
+from src.llm_usage import get_usage_ledger, reset_usage_ledger
+from src.nodes import judges
+from src.resilience import reset_circuit_breakers
+from src.state import Evidence, JudicialOpinion, JudicialOpinionBatch
+from src.structured_repair import RepairFailed, extract_json, repair_opinion, repair_structured
+
+
+class TestRepair(unittest.TestCase):
+    def test_extracts_json_from_fences_and_prose(self):
+        text = 'Here is my ruling:\n```json\n{"score": 4, "tags": ["a"]}\n```\nThanks.'
+        self.assertEqual(extract_json(text), {"score": 4, "tags": ["a"]})
+        self.assertEqual(extract_json('[E1] is cited. {"score": 2} trailing'), {"score": 2})
+        with self.assertRaises(RepairFailed):
+            extract_json("I cannot rule on this.")
+
+    def test_coerces_fields_and_fills_context(self):
+        opinion = repair_opinion(
+            {"judge": "Tech Lead", "score": "7/5", "reasoning": "Solid [E1].", "cited_evidence": "E1, E3"},
+            judge="Defense",
+            criterion_id="dim_0",
+        )
+        self.assertEqual(
+            (opinion.judge, opinion.criterion_id, opinion.score, opinion.argument, opinion.cited_evidence),
+            ("TechLead", "dim_0", 5, "Solid [E1].", ["E1", "E3"]),
+        )
+        self.assertEqual(repair_opinion({"judge": "judge", "score": 0, "argument": "x"}, "Defense", "d").judge, "Defense")
+        self.assertEqual(repair_opinion({"score": 3.6, "argument": "x", "source": "fallback"}, "Defense", "d").source, "llm")
+
+    def test_unrepairable_opinions(self):
+        for data in ({"score": 3}, {"argument": "x"}, {"score": "high", "argument": "x"}, ["not", "an", "object"]):
+            with self.assertRaises(RepairFailed):
+                repair_opinion(data, judge="Defense", criterion_id="d")
+        with self.assertRaises(RepairFailed):
+            repair_opinion({"score": 3, "argument": "x"}, judge=None, criterion_id="d")
+
+    def test_batch_drops_only_unrepairable_opinions(self):
+        raw = AIMessage(content='{"opinions": [{"criterion_id": "a", "score": 9, "argument": "x"}, {"score": 2, "argument": "y"}]}')
+        batch = repair_structured(raw, JudicialOpinionBatch, judge="Prosecutor")
+        self.assertEqual([(o.criterion_id, o.score) for o in batch.opinions], [("a", 5)])
+
+    def test_tool_call_arguments_are_repaired(self):
+        raw = AIMessage(content="", tool_calls=[{"name": "JudicialOpinion", "args": {"score": 6, "argument": "x"}, "id": "1"}])
+        self.assertEqual(repair_structured(raw, JudicialOpinion, "Prosecutor", "d").score, 5)
+
+
+class TestJudgeRepair(unittest.TestCase):
+    def setUp(self):
+        reset_usage_ledger()
+        self.addCleanup(reset_circuit_breakers)
+        evidence = Evidence(goal="g", found=True, location="src/graph.py", rationale="r", confidence=0.7)
+        self.state = {
+            "rubric_dimensions": [{"id": "dim_0", "name": "Dimension 0"}],
+            "evidences": {"dim_0": [evidence]},
+            "opinions": [],
+        }
+
+    def test_malformed_answer_is_repaired_without_a_second_call(self):
+        model = FakeChatModel(model_name="fake-judge", malformed_rate=1.0)
+        with patch.dict(os.environ, {"AUDIT_LLM_CACHE": "0"}), patch.object(judges, "llm", model):
+            (opinion,) = judges.get_judge_node("TechLead", judges.TECH_LEAD_PROMPT)(self.state)["opinions"]
+
+        (record,) = get_usage_ledger().records
+        self.assertEqual((record.status, record.attempts, record.repairs), ("ok", 1, 1))
+        self.assertEqual((opinion.judge, opinion.criterion_id, opinion.source), ("TechLead", "dim_0", "llm"))
+        self.assertEqual(get_usage_ledger().summary()["by_model"]["fake/fake-judge"]["repairs"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
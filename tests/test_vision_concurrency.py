@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.batching import pack_batches
+from src.state import DiagramBatch, DiagramClassification
+from src.tools.vision_tools import ImageRecord, VisionInspector, prepare_for_upload
+
+
+class FakeVisionLLM:
+    """Answers batch requests with one classification per image, optionally dropping some."""
+
+    def __init__(self, drop=(), fail_batches=False):
+        self.drop = set(drop)
+        self.fail_batches = fail_batches
+        self.batch_calls = 0
+        self.single_calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def _occupy(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+    def with_structured_output(self, schema):
+        return SimpleNamespace(ainvoke=self._abatch)
+
+    async def _abatch(self, messages, config=None):
+        self.batch_calls += 1
+        await self._occupy()
+        if self.fail_batches:
+            raise RuntimeError("schema validation failed")
+        count = sum(part["type"] == "image_url" for part in messages[0].content)
+        return DiagramBatch(classifications=[
+            DiagramClassification(
+                image_index=i, diagram_type="Flow Diagram", fan_out_fan_in=True,
+                components=["Detectives"], data_flow="left to right", summary=f"Batch result {i}.",
+            )
+            for i in range(1, count + 1) if i not in self.drop
+        ])
+
+    async def ainvoke(self, messages, config=None):
+        self.single_calls += 1
+        await self._occupy()
+        return SimpleNamespace(content="Single result.")
+
+
+def _images(count):
+    return [
+        ImageRecord(data=bytes([i]) * 100, ext="png", page=1, xref=i + 1, width=1, height=1, index=i + 1)
+        for i in range(count)
+    ]
+
+
+class TestVisionConcurrency(unittest.TestCase):
+    def test_bounded_concurrent_fan_out(self):
+        in_flight = 0
+        peak = 0
+
+        async def fake_analyze(image_path):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return f"analysis of {image_path}"
+
+        paths = [f"img{i}.png" for i in range(8)]
+        with patch.dict(os.environ, {"AUDIT_VISION_CACHE": "0"}), \
+                patch.object(VisionInspector, "aanalyze_diagram", side_effect=fake_analyze):
+            start = time.perf_counter()
+            results = asyncio.run(VisionInspector.aanalyze_diagrams(paths, concurrency=4))
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(results, [f"analysis of {p}" for p in paths])
+        self.assertEqual(peak, 4)
+        # Two waves of 0.05s rather than eight serial calls
+        self.assertLess(elapsed, 0.3)
+
+
+class TestVisionBatching(unittest.TestCase):
+    def _run(self, llm, images, **kwargs):
+        with patch.dict(os.environ, {"GOOGLE_API_KEY": "test-key", "AUDIT_VISION_CACHE": "0"}), \
+                patch("src.tools.vision_tools._build_vision_llm", return_value=llm):
+            return asyncio.run(VisionInspector.aanalyze_diagrams(images, **kwargs))
+
+    def test_pack_batches_by_count_and_bytes(self):
+        sizes = [10, 10, 10, 50, 10]
+        batches = pack_batches(sizes, lambda size: size, max_count=2, max_size=40)
+        self.assertEqual(batches, [[10, 10], [10], [50], [10]])
+
+    def test_images_share_requests(self):
+        llm = FakeVisionLLM()
+        results = self._run(llm, _images(8), batch_size=4)
+        self.assertEqual(llm.batch_calls, 2)
+        self.assertEqual(llm.single_calls, 0)
+        self.assertTrue(all(r.startswith("Flow Diagram. Fan-out/fan-in parallelism: yes") for r in results))
+        self.assertIn("Batch result 4.", results[3])
+
+    def test_omitted_and_failed_batches_fall_back_per_image(self):
+        llm = FakeVisionLLM(drop={2})
+        results = self._run(llm, _images(3), batch_size=3)
+        self.assertEqual(results[1], "Single result.")
+        self.assertIn("Batch result 3.", results[2])
+
+        llm = FakeVisionLLM(fail_batches=True)
+        results = self._run(llm, _images(3), batch_size=3)
+        self.assertEqual((llm.batch_calls, llm.single_calls), (1, 3))
+        self.assertEqual(results, ["Single result."] * 3)
+
+    def test_fallbacks_respect_the_concurrency_limit(self):
+        llm = FakeVisionLLM(fail_batches=True)
+        results = self._run(llm, _images(8), batch_size=4, concurrency=2)
+        self.assertEqual((llm.batch_calls, llm.single_calls), (2, 8))
+        self.assertEqual(results, ["Single result."] * 8)
+        self.assertEqual(llm.peak, 2)
+
+    def test_uploads_are_prepared_off_the_event_loop_and_logged_per_image(self):
+        threads = set()
+
+        def _prepare(image):
+            threads.add(threading.get_ident())
+            return prepare_for_upload(image)
+
+        with patch("src.tools.vision_tools.prepare_for_upload", side_effect=_prepare), \
+                self.assertLogs("src.tools.vision_tools", level="INFO") as logs:
+            self._run(FakeVisionLLM(), _images(3), batch_size=3)
+
+        self.assertNotIn(threading.get_ident(), threads)
+        uploads = [line for line in logs.output if "Vision upload" in line]
+        self.assertEqual(len(uploads), 3)
+        self.assertIn("page1_img2.png: 100 -> 100 bytes", uploads[1])
+        self.assertIn("batch of 3", uploads[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import fitz
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.nodes.detectives import vision_inspector_node
+from src.tools.diagram_labels import NodeVocabulary, infer_fan_out_fan_in, labels_in_region, vocabulary_from_rubric
+from src.tools.diagram_scorer import caption_proximity, rank_diagram_candidates
+from src.tools.image_ops import dhash, group_duplicate_images, hamming
+from src.tools.pdf_session import close_pdf_sessions
+from src.tools.vision_tools import ImageRecord, prepare_for_upload, spilled_images, vision_page_section
+
+
+def _record(data: bytes = b"\x89PNG fake", page: int = 1, xref: int = 7) -> ImageRecord:
+    return ImageRecord(data=data, ext="png", page=page, xref=xref, width=10, height=10)
+
+
+def _diagram_png(variant: int = 0, zoom: float = 1.0) -> bytes:
+    """Renders a small box-and-arrow drawing to PNG bytes."""
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=120)
+    if variant == 0:
+        page.draw_rect(fitz.Rect(10, 10, 80, 60), color=(0, 0, 0), width=3)
+        page.draw_line((80, 35), (180, 35), color=(0, 0, 0), width=3)
+    else:
+        page.draw_circle((100, 60), 40, color=(0, 0, 0), fill=(0, 0, 0))
+    data = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).tobytes("png")
+    doc.close()
+    return data
+
+
+def _photo_png() -> bytes:
+    """Noisy colour gradient standing in for a photograph."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:120, 0:200]
+    pixels = np.stack([x / 200 * 255, y / 120 * 255, (x + y) / 320 * 255], -1) + rng.normal(0, 25, (120, 200, 3))
+    return fitz.Pixmap(fitz.csRGB, 200, 120, pixels.clip(0, 255).astype(np.uint8).tobytes(), 0).tobytes("png")
+
+
+class TestImageRecords(unittest.TestCase):
+    def test_base64_encoded_once(self):
+        image = _record()
+        self.assertTrue(image.data_url.startswith("data:image/png;base64,"))
+        self.assertIs(image.base64, image.base64)
+        self.assertEqual(image.name, "page1_img1.png")
+
+    def test_spill_is_cleaned_up(self):
+        with spilled_images([_record(), _record(page=2)]) as paths:
+            self.assertTrue(all(os.path.exists(p) for p in paths))
+            spill_dir = os.path.dirname(paths[0])
+        self.assertFalse(os.path.exists(spill_dir))
+
+
+class TestImageDeduplication(unittest.TestCase):
+    def test_rescaled_copy_is_near_duplicate(self):
+        self.assertLessEqual(hamming(dhash(_diagram_png(zoom=1.0)), dhash(_diagram_png(zoom=1.5))), 6)
+        self.assertGreater(hamming(dhash(_diagram_png(0)), dhash(_diagram_png(1))), 6)
+
+    def test_grouping_by_xref_then_hash(self):
+        logo_p1 = _record(_diagram_png(0), page=1, xref=5)
+        logo_p2 = _record(_diagram_png(0), page=2, xref=5)
+        logo_rescaled = _record(_diagram_png(0, zoom=1.5), page=3, xref=9)
+        other = _record(_diagram_png(1), page=3, xref=11)
+
+        groups = group_duplicate_images([logo_p1, logo_p2, logo_rescaled, other])
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(groups[0], [logo_p1, logo_p2, logo_rescaled])
+        self.assertEqual(groups[1], [other])
+
+
+class TestDiagramRanking(unittest.TestCase):
+    def test_diagram_outranks_photo(self):
+        photo = _record(_photo_png(), xref=1)
+        diagram = _record(_diagram_png(0), xref=2)
+        selected, scores = rank_diagram_candidates([photo, diagram], threshold=0.6, top_k=0)
+        self.assertEqual(selected, [diagram])
+        self.assertGreater(scores[id(diagram)], scores[id(photo)])
+
+    def test_top_k_and_caption_proximity(self):
+        plain = _record(_diagram_png(0), page=1, xref=1)
+        captioned = _record(_diagram_png(0), page=2, xref=2)
+        captioned.rects = [(50, 100, 250, 220)]
+        spans = {2: [{"text": "Figure 2: Architecture overview", "bbox": (50, 225, 250, 240)}]}
+
+        self.assertGreater(caption_proximity(captioned.rects, spans[2]), 0.9)
+        selected, _ = rank_diagram_candidates([plain, captioned], spans, threshold=0.0, top_k=1)
+        self.assertEqual(selected, [captioned])
+
+
+def _span(text, x, y):
+    return {"text": text, "bbox": (x, y, x + 80, y + 12)}
+
+
+class TestTextLayerLabels(unittest.TestCase):
+    def test_row_of_detectives_over_aggregator_is_fan_out(self):
+        spans = [
+            _span("RepoInvestigator", 100, 100), _span("Doc Analyst", 250, 102),
+            _span("vision_inspector", 400, 100), _span("EvidenceAggregator", 250, 200),
+            _span("Outside the figure", 250, 600),
+        ]
+        labels = labels_in_region(spans, [(90, 90, 500, 230)])
+        self.assertEqual(len(labels), 4)
+        topology = infer_fan_out_fan_in(labels)
+        self.assertEqual(topology["aggregator"], "EvidenceAggregator")
+        self.assertEqual(topology["direction"], "top to bottom")
+
+    def test_labels_without_aggregator_are_inconclusive(self):
+        labels = labels_in_region([_span("Prosecutor", 100, 100), _span("Defense", 300, 100)], [(0, 0, 500, 300)])
+        self.assertIsNone(infer_fan_out_fan_in(labels))
+        self.assertIsNone(infer_fan_out_fan_in([]))
+
+    def test_node_names_come_from_the_rubric(self):
+        rubric = [{
+            "forensic_instruction": "Verify that Scouts (Crawler, Reader) run in parallel.",
+            "success_pattern": "START -> [Scouts in parallel] -> Merger -> END",
+            "failure_pattern": "Crawler -> Reader -> Judge -> End",
+        }]
+        vocabulary = vocabulary_from_rubric(rubric)
+        self.assertEqual(vocabulary, NodeVocabulary({"scout": ("Crawler", "Reader")}, ("Merger",)))
+        self.assertIsNone(vocabulary_from_rubric([{"success_pattern": "A -> B"}]))
+
+        spans = [_span("Crawler", 100, 100), _span("Reader", 300, 100), _span("Merger", 200, 200)]
+        self.assertEqual(labels_in_region(spans, [(0, 0, 500, 300)]), [])
+        topology = infer_fan_out_fan_in(labels_in_region(spans, [(0, 0, 500, 300)], vocabulary=vocabulary))
+        self.assertEqual((topology["role"], topology["aggregator"]), ("scout", "Merger"))
+
+    def test_labelled_vector_diagram_needs_no_vision_call(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "report.pdf")
+            doc = fitz.open()
+            page = doc.new_page()
+            for x, name in ((60, "RepoInvestigator"), (230, "DocAnalyst"), (400, "VisionInspector")):
+                page.draw_rect(fitz.Rect(x, 300, x + 150, 340))
+                page.insert_text((x + 5, 325), name, fontsize=10)
+                page.draw_line((x + 75, 340), (305, 420))
+            page.draw_rect(fitz.Rect(230, 420, 380, 460))
+            page.insert_text((235, 445), "EvidenceAggregator", fontsize=10)
+            doc.save(pdf_path)
+            doc.close()
+
+            env = {"AUDIT_CACHE_DIR": tmp, "GOOGLE_API_KEY": "", "OPENAI_API_KEY": ""}
+            with patch.dict(os.environ, env), \
+                    patch("src.tools.vision_tools.VisionInspector.aanalyze_diagrams") as vision_call:
+                vision_call.return_value = []
+                evidence = vision_inspector_node({"pdf_path": pdf_path})["evidences"]["swarm_visual"][0]
+            close_pdf_sessions()
+
+        self.assertIn("(text layer)", evidence.content)
+        self.assertIn("Fan-out/fan-in parallelism: yes", evidence.content)
+        vision_call.assert_called_once_with([])
+
+
+class TestVisionPageCache(unittest.TestCase):
+    def test_section_is_keyed_by_model_and_prompt_version(self):
+        with patch.dict(os.environ, {"GOOGLE_API_KEY": "k", "AUDIT_LLM_BACKEND": "", "AUDIT_VISION_CACHE": "1"}):
+            self.assertEqual(vision_page_section(), "vision-gemini-gemini-1.5-flash-v2")
+            with patch.dict(os.environ, {"AUDIT_VISION_CACHE": "0"}):
+                self.assertIsNone(vision_page_section())
+        with patch.dict(os.environ, {"AUDIT_LLM_BACKEND": "fake"}):
+            self.assertIsNone(vision_page_section())
+
+    def test_threshold_skips_are_reused(self):
+        async def _analyze(images):
+            return ["Flow Diagram." for _ in images]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "report.pdf")
+            doc = fitz.open()
+            doc.new_page().insert_image(fitz.Rect(72, 72, 272, 192), stream=_photo_png())
+            doc.save(pdf_path)
+            doc.close()
+
+            env = {
+                "AUDIT_CACHE_DIR": tmp, "GOOGLE_API_KEY": "k", "AUDIT_LLM_BACKEND": "",
+                "AUDIT_VISION_CACHE": "1", "AUDIT_VISION_TOP_K": "0",
+            }
+            with patch.dict(os.environ, env), \
+                    patch("src.tools.vision_tools.VisionInspector.aanalyze_diagrams", side_effect=_analyze):
+                first = vision_inspector_node({"pdf_path": pdf_path})["evidences"]["swarm_visual"][0]
+                close_pdf_sessions()
+                second = vision_inspector_node({"pdf_path": pdf_path})["evidences"]["swarm_visual"][0]
+                close_pdf_sessions()
+
+        self.assertIn("Not sent for vision analysis", first.content)
+        self.assertIn("(cached)", second.content)
+        self.assertIn("1 page(s) reused", second.rationale)
+
+
+class TestUploadPreprocessing(unittest.TestCase):
+    def test_large_diagram_is_downscaled(self):
+        original = _record(_diagram_png(0, zoom=10.0))
+        upload = prepare_for_upload(original, max_dim=512)
+        self.assertLessEqual(max(upload.width, upload.height), 512)
+        self.assertLess(len(upload.data), len(original.data))
+        self.assertIn(upload.ext, ("png", "jpeg"))
+        self.assertEqual((upload.page, upload.xref), (original.page, original.xref))
+
+    def test_undecodable_image_is_uploaded_as_is(self):
+        original = _record(b"not an image")
+        self.assertIs(prepare_for_upload(original), original)
+
+
+if __name__ == "__main__":
+    unittest.main()